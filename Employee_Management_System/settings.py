@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     "main.apps.MainConfig",
     "rest_framework",
     "rest_framework.authtoken",
+    "django_filters",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -44,13 +45,70 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "main.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "main.pagination.IdCursorPagination",
     "PAGE_SIZE": 100,
 }
 
+# In-process cache of token -> (user id, role, is_active) used by
+# main.authentication.CachedTokenAuthentication. Invalidation is immediate in the
+# process that made the change; other workers see it after at most TTL seconds.
+TOKEN_CACHE = {
+    "MAX_ENTRIES": 10000,
+    "TTL": 60,
+}
+
+# Serialize the Company/Department/Employee lists straight from values_list()
+# rows (main.fast_serializers) instead of model instances and ModelSerializer.
+# The responses are identical either way.
+FAST_LIST_SERIALIZATION = True
+
+# Cache backend of the Company/Department response cache (main.cache). Any Django
+# cache alias works; use a shared backend (file-based, Redis, Memcached) to share
+# entries between workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+RESPONSE_CACHE = {
+    "ALIAS": "default",
+    "TIMEOUT": 300,
+}
+
+# Background jobs (main.jobs), e.g. `DELETE /company/<id>/?background=true`. Their
+# state is kept in this cache alias for TIMEOUT seconds; use a shared backend to
+# poll a job from any worker. EAGER runs jobs inline.
+BACKGROUND_JOBS = {
+    "ALIAS": "default",
+    "TIMEOUT": 86400,
+    "EAGER": False,
+}
+
+# Per-request instrumentation (main.timing). SAMPLE_RATE is the share of requests
+# (0 to 1) whose SQL queries and database, auth, serializer and view times are
+# recorded, sent in a Server-Timing header and logged as JSON on `main.timing`.
+# Identical SQL run REPEATED_QUERY_THRESHOLD times in one request is logged as a
+# warning (N+1 queries). 0 turns it off.
+REQUEST_TIMING = {
+    "SAMPLE_RATE": 0.0,
+    "REPEATED_QUERY_THRESHOLD": 5,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "main.timing": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 
 AUTH_USER_MODEL = "main.UserAccounts"
 
@@ -62,6 +120,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Last, so its `view` timer covers the view and the rendering only.
+    "main.timing.RequestTimingMiddleware",
 ]
 
 ROOT_URLCONF = "Employee_Management_System.urls"
@@ -90,8 +150,20 @@ WSGI_APPLICATION = "Employee_Management_System.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # Django's sqlite3 backend plus WAL/pragmas, BEGIN IMMEDIATE and busy retries.
+        "ENGINE": "main.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "timeout": 5,  # seconds to wait for a lock
+            "transaction_mode": "IMMEDIATE",
+            "busy_retries": 5,
+            "busy_backoff": 0.05,
+            # Per-connection pragmas default to DEFAULT_PRAGMAS of the backend
+            # (WAL, synchronous=NORMAL, ...); override single ones with
+            # "pragmas": {"cache_size": -64000}.
+        },
     }
 }
 
@@ -0,0 +1,80 @@
+"""
+Headcount analytics over the HeadcountSummary table.
+
+Pivots are computed with one GROUP BY query over the summary rows, which the
+Employee signals keep up to date in the same transaction as every Employee
+write, so a dashboard read costs O(companies x stages) rows whatever the number
+of employees.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+from django.db.models import Sum
+from .models import Employee, HeadcountSummary
+
+######################################################################
+
+
+######################################################################
+######################### A N A L Y T I C S ##########################
+######################################################################
+
+STAGES = [stage for stage, _ in Employee.stages]
+
+# Grouping name mapped to the summary columns it groups by and their output keys.
+GROUPINGS = {
+    "company": [
+        ("department__company_id", "company_id"),
+        ("department__company__company_name", "company"),
+    ],
+    "department": [
+        ("department__company_id", "company_id"),
+        ("department__company__company_name", "company"),
+        ("department_id", "department_id"),
+        ("department__department_name", "department"),
+    ],
+}
+
+
+def headcount_pivot(group_by="company", company_id=None):
+    """
+    Count the Employees per status stage for each company or department.
+
+    Args:
+        group_by (str, optional): Either "company" or "department". Defaults to "company".
+        company_id (int, optional): Only count this Company. Defaults to all of them.
+
+    Returns:
+        tuple: The rows, one per group in id order with a `counts` dict holding
+        every stage and a `total`, and the totals per stage over all the rows.
+    """
+    columns = GROUPINGS[group_by]
+    paths = [path for path, _ in columns]
+    summary = HeadcountSummary.objects.filter(count__gt=0)
+    if company_id is not None:
+        summary = summary.filter(department__company_id=company_id)
+
+    rows, totals = {}, dict.fromkeys(STAGES, 0)
+    for values in (
+        summary.values(*paths, "status")
+        .annotate(headcount=Sum("count"))
+        .order_by(*paths)
+    ):
+        key = tuple(values[path] for path in paths)
+        if key not in rows:
+            rows[key] = {
+                **{name: values[path] for path, name in columns},
+                "counts": dict.fromkeys(STAGES, 0),
+                "total": 0,
+            }
+        row = rows[key]
+        row["counts"][values["status"]] = values["headcount"]
+        row["total"] += values["headcount"]
+        totals[values["status"]] += values["headcount"]
+    return list(rows.values()), totals
+
+
+######################################################################
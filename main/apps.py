@@ -4,7 +4,10 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "main"
-    
-    def ready(self) :
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
         from . import signals
+        from .timing import instrument_connection
 
+        connection_created.connect(instrument_connection)
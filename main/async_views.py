@@ -0,0 +1,239 @@
+"""
+Async (ASGI) read-only variants of the Company, Department and Employee views.
+
+DRF's APIView is synchronous, so these are plain Django class-based views with
+async handlers. They authenticate with `CachedTokenAuthentication.aauthenticate`,
+run the same permission classes, filters and cursor pagination as the sync views,
+query with the async ORM, and render the same JSON bodies. Under an ASGI server
+(e.g. uvicorn) a request waiting on the database does not hold a worker thread.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from .authentication import CachedTokenAuthentication
+from .fast_serializers import ValuesListSerializer, fast_list_serialization
+from .filters import DepartmentFilter, EmployeeFilter, FilteredListMixin
+from .pagination import IdCursorPagination
+from .permissions import IsAdminUser, IsManagerUser, IsEmployeeUser
+from .models import Company, Department, Employee
+from .serializers import CompanySerializer, DepartmentSerializer, EmployeeSerializer
+
+######################################################################
+
+
+######################################################################
+###################### A S Y N C   V I E W S #########################
+######################################################################
+
+
+class AsyncAPIView(FilteredListMixin, View):
+    """
+    Base async view with token authentication, permission checks and JSON rendering.
+
+    Subclasses set `queryset`, `serializer_class` and `list_key`, and may
+    override `get_queryset`, which receives the requested sparse fieldset.
+    """
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = IdCursorPagination
+    filter_backends = []
+    http_method_names = ["get", "head", "options"]
+
+    queryset = None
+    serializer_class = None
+    list_key = "results"
+
+    def get_queryset(self, fields=None):
+        return self.queryset.all()
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=None):
+        """
+        Render a body the way DRF's JSONRenderer does.
+
+        Args:
+            data: The body.
+            status_code (int, optional): The HTTP status code. Defaults to 200.
+            headers (dict, optional): Extra response headers.
+
+        Returns:
+            HttpResponse: The JSON response.
+        """
+        return HttpResponse(
+            JSONRenderer().render(data),
+            status=status_code,
+            content_type="application/json",
+            headers=headers,
+        )
+
+    async def perform_authentication(self, request):
+        """
+        Set `request.user` and `request.auth` from the first authenticator that accepts the request.
+
+        Args:
+            request (Request): The HTTP request.
+        """
+        for authentication_class in self.authentication_classes:
+            result = await authentication_class().aauthenticate(request)
+            if result is not None:
+                request.user, request.auth = result
+                return
+        request.user, request.auth = AnonymousUser(), None
+
+    def check_permissions(self, request):
+        """
+        Run the permission classes, as DRF's APIView does.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Raises:
+            NotAuthenticated: If the request is anonymous and a permission fails.
+            PermissionDenied: If a permission fails.
+        """
+        for permission_class in self.permission_classes:
+            permission = permission_class()
+            if not permission.has_permission(request, self):
+                if request.auth is None and not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    def handle_exception(self, exc):
+        """
+        Turn an API exception into the error response DRF would send.
+
+        Args:
+            exc (APIException): The exception.
+
+        Returns:
+            HttpResponse: The error response.
+        """
+        headers = {}
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            exc.status_code = status.HTTP_401_UNAUTHORIZED
+            headers["WWW-Authenticate"] = CachedTokenAuthentication.keyword
+        if isinstance(exc.detail, (list, dict)):
+            return self.render(exc.detail, exc.status_code, headers)
+        return self.render({"detail": exc.detail}, exc.status_code, headers)
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        self.request = request
+        try:
+            await self.perform_authentication(request)
+            self.check_permissions(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            return self.handle_exception(exceptions.NotFound(*exc.args))
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    async def get(self, request, pk=None):
+        """
+        Retrieve a single instance or a page of instances, ordered by id.
+
+        Args:
+            request (Request): The HTTP request.
+            pk (int, optional): The primary key of the instance to retrieve. Defaults to None.
+
+        Query parameters:
+            fields, exclude (str, optional): Comma-separated fields to include or leave out.
+
+        Returns:
+            HttpResponse: HTTP response containing the instance or the page.
+        """
+        fields = self.serializer_class.requested_fields(request)
+        queryset = self.serializer_class.prune_queryset(
+            self.get_queryset(fields), fields, getattr(self, "ordering_fields", ())
+        )
+        if pk:
+            try:
+                instance = await queryset.aget(pk=pk)
+            except queryset.model.DoesNotExist:
+                raise Http404(
+                    f"No {queryset.model._meta.object_name} matches the given query."
+                )
+            return self.render(self.serializer_class(instance, fields=fields).data)
+
+        queryset = self.filter_queryset(queryset)
+        paginator = self.pagination_class()
+        if fast_list_serialization():
+            values = ValuesListSerializer(self.serializer_class, fields)
+            queryset = values.queryset(queryset, getattr(self, "ordering_fields", ()))
+            page = await paginator.apaginate_queryset(queryset, request, view=self)
+            data = values.serialize(page)
+        else:
+            page = await paginator.apaginate_queryset(queryset, request, view=self)
+            data = self.serializer_class(page, many=True, fields=fields).data
+        return self.render(paginator.get_paginated_response(data, self.list_key).data)
+
+
+class AsyncCompanyView(AsyncAPIView):
+    """
+    Async list and retrieve of Company instances.
+
+    URL endpoints:
+    - List all companies: /async/company/
+    - Retrieve a single company: /async/company/{id}/
+    """
+
+    queryset = Company.objects.all()
+    serializer_class = CompanySerializer
+    list_key = "Companies"
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+
+class AsyncDepartmentView(AsyncAPIView):
+    """
+    Async list and retrieve of Department instances.
+
+    URL endpoints:
+    - List all departments: /async/department/
+    - Retrieve a single department: /async/department/{id}/
+    """
+
+    queryset = Department.objects.select_related("company")
+    serializer_class = DepartmentSerializer
+    list_key = "Departments"
+    filter_backends = FilteredListMixin.filter_backends
+    filterset_class = DepartmentFilter
+    ordering_fields = ["id", "department_name"]
+    permission_classes = [IsAuthenticated, IsManagerUser | IsAdminUser]
+
+
+class AsyncEmployeeView(AsyncAPIView):
+    """
+    Async list and retrieve of Employee instances.
+
+    URL endpoints:
+    - List all employees: /async/employee/
+    - Retrieve a single employee: /async/employee/{id}/
+    """
+
+    queryset = Employee.objects.select_related("company", "department")
+    serializer_class = EmployeeSerializer
+    list_key = "Employees"
+    filter_backends = FilteredListMixin.filter_backends
+    filterset_class = EmployeeFilter
+    ordering_fields = ["id", "name", "hired_on"]
+    permission_classes = [IsAuthenticated, IsEmployeeUser]
+
+    def get_queryset(self, fields=None):
+        if fields is None or "days_employed" in fields:
+            return self.queryset.with_days_employed()
+        return self.queryset.all()
+
+
+######################################################################
@@ -0,0 +1,266 @@
+"""
+Authentication classes for the application.
+
+This module includes a drop-in replacement for DRF's TokenAuthentication that
+keeps a bounded in-process LRU+TTL cache of token -> (user id, role, is_active),
+so authenticated requests do not hit the database on every call. The same class
+authenticates the async views with the async ORM. Token lookups are timed as
+`auth` on the sampled requests (see `main.timing`).
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+from .models import UserAccounts
+from .timing import timed
+
+######################################################################
+
+
+######################################################################
+################### A U T H E N T I C A T I O N ######################
+######################################################################
+
+
+class TokenCache:
+    """
+    Thread-safe LRU cache of token keys with a time-to-live.
+
+    Entries are evicted least-recently-used first once `max_entries` is reached,
+    and expire `ttl` seconds after they were stored.
+    """
+
+    def __init__(self, max_entries=10000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up a token.
+
+        Args:
+            key (str): The token key.
+
+        Returns:
+            tuple | None: `(user_id, role, is_active)`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, user_id, role, is_active):
+        """
+        Store a token, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (str): The token key.
+            user_id (int): The primary key of the token's user.
+            role (str): The role of the user.
+            is_active (bool): Whether the user is active.
+        """
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + self.ttl,
+                (user_id, role, is_active),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Drop a token.
+
+        Args:
+            key (str): The token key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        """
+        Drop every token of a user.
+
+        Args:
+            user_id (int): The primary key of the user.
+        """
+        with self._lock:
+            for key in [
+                key for key, (_, entry) in self._entries.items() if entry[0] == user_id
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Drop every token and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """
+        Report the cache counters.
+
+        Returns:
+            dict: Hits, misses, hit ratio, current size and configuration.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+
+token_cache = TokenCache(
+    max_entries=getattr(settings, "TOKEN_CACHE", {}).get("MAX_ENTRIES", 10000),
+    ttl=getattr(settings, "TOKEN_CACHE", {}).get("TTL", 60),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that serves repeated tokens from `token_cache`.
+
+    On a hit, the user is rebuilt from the cached id, role and is_active with
+    every other field deferred, so no query is made unless a view reads one of
+    them. Entries are dropped by the signal handlers as soon as a user is saved
+    or deleted or a token is created or deleted in this process; other worker
+    processes pick the change up once the entry's TTL runs out.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Authenticate a token key, from the cache when possible.
+
+        Args:
+            key (str): The token key.
+
+        Returns:
+            tuple: The user and the token.
+
+        Raises:
+            AuthenticationFailed: If the token is invalid or the user is inactive.
+        """
+        with timed("auth"):
+            cached = token_cache.get(key)
+            if cached is None:
+                user, token = super().authenticate_credentials(key)
+                token_cache.set(key, user.pk, user.role, user.is_active)
+                return user, token
+            return self.cached_credentials(key, cached)
+
+    async def aauthenticate(self, request):
+        """
+        Authenticate a request from its `Authorization: Token <key>` header, for async views.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Returns:
+            tuple: The user and the token, or None if no token was given.
+
+        Raises:
+            AuthenticationFailed: If the header is malformed or the token is invalid.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            msg = _("Invalid token header. No credentials provided.")
+            raise exceptions.AuthenticationFailed(msg)
+        if len(auth) > 2:
+            msg = _("Invalid token header. Token string should not contain spaces.")
+            raise exceptions.AuthenticationFailed(msg)
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            msg = _(
+                "Invalid token header. Token string should not contain invalid characters."
+            )
+            raise exceptions.AuthenticationFailed(msg)
+        with timed("auth"):
+            return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        """
+        Authenticate a token key with the async ORM, from the cache when possible.
+
+        Args:
+            key (str): The token key.
+
+        Returns:
+            tuple: The user and the token.
+
+        Raises:
+            AuthenticationFailed: If the token is invalid or the user is inactive.
+        """
+        cached = token_cache.get(key)
+        if cached is not None:
+            return self.cached_credentials(key, cached)
+        try:
+            token = await Token.objects.select_related("user").aget(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        user = token.user
+        token_cache.set(key, user.pk, user.role, user.is_active)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return user, token
+
+    def cached_credentials(self, key, cached):
+        """
+        Rebuild the user and the token of a cache hit without a query.
+
+        Args:
+            key (str): The token key.
+            cached (tuple): The cached `(user_id, role, is_active)`.
+
+        Returns:
+            tuple: The user and the token.
+
+        Raises:
+            AuthenticationFailed: If the user is inactive.
+        """
+        user_id, role, is_active = cached
+        if not is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        user = UserAccounts.from_db(
+            router.db_for_read(UserAccounts),
+            ["id", "role", "is_active"],
+            [user_id, role, is_active],
+        )
+        token = Token.from_db(
+            router.db_for_read(Token), ["key", "user_id"], [key, user_id]
+        )
+        return user, token
+
+
+######################################################################
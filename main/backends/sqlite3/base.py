@@ -0,0 +1,139 @@
+"""
+SQLite database backend tuned for several concurrent worker processes.
+
+A drop-in wrapper around Django's sqlite3 backend (`ENGINE: "main.backends.sqlite3"`)
+that, through `DATABASES[...]["OPTIONS"]`:
+
+- applies connection pragmas (`pragmas`, merged over `DEFAULT_PRAGMAS`: WAL
+  journal, `synchronous=NORMAL`, a larger page cache, memory-mapped reads and
+  in-memory temp tables) to every new connection;
+- starts transactions with `BEGIN IMMEDIATE` when `transaction_mode` is
+  "IMMEDIATE", so a transaction that reads and then writes waits for the write
+  lock up front (honouring the `timeout` busy timeout) instead of failing with
+  "database is locked" when it tries to upgrade its lock;
+- retries statements that fail with SQLITE_BUSY/SQLITE_LOCKED outside of a
+  transaction, including the `BEGIN` itself, up to `busy_retries` times with
+  exponential backoff starting at `busy_backoff` seconds. Statements inside a
+  transaction are never retried, as only the whole transaction could be.
+
+Combine it with `CONN_MAX_AGE` to keep connections (and their page cache) open
+across requests.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import random
+import sqlite3
+import time
+from django.db.backends.sqlite3 import base
+
+######################################################################
+
+
+######################################################################
+########################## B A C K E N D #############################
+######################################################################
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -20000,  # KiB, i.e. 20 MB per connection
+    "mmap_size": 134217728,  # 128 MB
+    "temp_store": "MEMORY",
+}
+
+BUSY_ERROR_CODES = {sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED}
+
+
+def is_busy_error(error):
+    """
+    Tell whether an OperationalError means the database was busy or locked.
+
+    Args:
+        error (OperationalError): The sqlite3 error.
+
+    Returns:
+        bool: True for SQLITE_BUSY and SQLITE_LOCKED, including their extended codes.
+    """
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in BUSY_ERROR_CODES
+    return "locked" in str(error) or "busy" in str(error)
+
+
+class RetryingCursorWrapper(base.SQLiteCursorWrapper):
+    """
+    Cursor that retries autocommit statements failing with SQLITE_BUSY.
+    """
+
+    busy_retries = 0
+    busy_backoff = 0.05
+    max_backoff = 1.0
+
+    def _retry(self, method, *args):
+        attempt = 0
+        while True:
+            try:
+                return method(*args)
+            except sqlite3.OperationalError as error:
+                if (
+                    attempt >= self.busy_retries
+                    or self.connection.in_transaction
+                    or not is_busy_error(error)
+                ):
+                    raise
+                delay = min(self.busy_backoff * 2**attempt, self.max_backoff)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        if self.busy_retries:
+            param_list = list(param_list)  # A generator could not be replayed.
+        return self._retry(super().executemany, query, param_list)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    sqlite3 DatabaseWrapper with pragmas, immediate transactions and busy retries.
+    """
+
+    def get_connection_params(self):
+        """
+        Split this backend's options from the ones passed to `sqlite3.connect`.
+
+        Returns:
+            dict: The `sqlite3.connect` keyword arguments.
+        """
+        kwargs = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **kwargs.pop("pragmas", {})}
+        self.transaction_mode = kwargs.pop("transaction_mode", None)
+        self.busy_retries = kwargs.pop("busy_retries", 0)
+        self.busy_backoff = kwargs.pop("busy_backoff", 0.05)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.busy_retries = self.busy_retries
+        cursor.busy_backoff = self.busy_backoff
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
+        else:
+            super()._start_transaction_under_autocommit()
+
+
+######################################################################
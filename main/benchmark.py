@@ -0,0 +1,600 @@
+"""
+In-process benchmark of the `main/` endpoints and the counter signal paths.
+
+Every route of `main/urls.py` has at least one Operation. An Operation
+prepares its requests up front, e.g. by creating the rows a DELETE removes or
+by building unique create payloads, so that only the request itself is timed.
+The requests go through the test client with token authentication, i.e. the
+whole middleware, authentication, view and serializer stack minus the HTTP
+server. The signal operations save Employees through the ORM.
+
+For each Operation, `run_operation` reports ops/sec, p50/p95/p99 latencies
+and the average number of SQL queries per request.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import math
+import time
+import uuid
+from datetime import date
+from collections import namedtuple
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from rest_framework.authtoken.models import Token
+from .cache import response_cache
+from .jobs import start_job
+from .models import Company, Department, Employee, UserAccounts
+
+######################################################################
+
+
+######################################################################
+######################## B E N C H M A R K ###########################
+######################################################################
+
+# `route` is the URL name in main/urls.py; `prepare(context, count)` returns
+# `count` callables, each doing one request (or ORM write) and returning the
+# response (or None). Requests are made as a user with `role`. Operations that
+# hash a password run at most `max_iterations` times, as each hash is slow on
+# purpose.
+Operation = namedtuple(
+    "Operation",
+    ["name", "route", "prepare", "role", "max_iterations"],
+    defaults=["ADMIN", None],
+)
+
+
+class BenchmarkContext:
+    """
+    The client, user and seeded rows shared by the Operations.
+    """
+
+    password = "bench-password"
+
+    def __init__(self):
+        self.clients = {}
+        for role in ("ADMIN", "EMPLOYEE"):
+            name = f"bench-{role.lower()}-{uuid.uuid4().hex[:8]}"
+            user = UserAccounts.objects.create_user(
+                username=name,
+                email=f"{name}@example.com",
+                role=role,
+                password=self.password,
+            )
+            token, _ = Token.objects.get_or_create(user=user)
+            self.clients[role] = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+            if role == "ADMIN":
+                self.admin = user
+        self.client = self.clients["ADMIN"]
+        self.company_ids = list(Company.objects.values_list("pk", flat=True))
+        self.departments = list(
+            Department.objects.values_list(
+                "pk", "department_name", "company__company_name"
+            )
+        )
+        self.employee_ids = list(
+            Employee.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        self.counter = 0
+
+    def unique(self):
+        """
+        Return a number no other payload of this run has used.
+        """
+        self.counter += 1
+        return self.counter
+
+    def pick(self, rows, i):
+        """
+        Spread the requests of an Operation over the seeded rows.
+        """
+        return rows[(i * 7919) % len(rows)]
+
+    def get(self, path):
+        return lambda: self.client.get(path)
+
+    def send(self, method, path, data):
+        request = getattr(self.client, method)
+        return lambda: request(path, data, content_type="application/json")
+
+    def employee_payload(self, i, department=None):
+        _, department_name, company_name = department or self.pick(self.departments, i)
+        n = self.unique()
+        return {
+            "company": company_name,
+            "department": department_name,
+            "status": "HIRED",
+            "name": f"Bench Employee {n}",
+            "email": f"bench{n}-{uuid.uuid4().hex[:6]}@example.com",
+            "mobile_number": "+123456789",
+            "address": "1 Bench Street",
+            "designation": "Engineer",
+            "hired_on": "2024-01-01",
+        }
+
+    def new_company(self):
+        return Company.objects.create(
+            company_name=f"Bench Company {self.unique()} {uuid.uuid4().hex[:6]}"
+        )
+
+    def new_employees(self, count, status="HIRED"):
+        """
+        Create Employees (through the signals) for the Operations that remove or change them.
+        """
+        department_id, _, _ = self.departments[0]
+        department = Department.objects.select_related("company").get(pk=department_id)
+        employees = []
+        for i in range(count):
+            payload = self.employee_payload(i, self.departments[0])
+            del payload["company"], payload["department"]
+            payload["status"] = status
+            payload["hired_on"] = date(2024, 1, 1) if status == "HIRED" else None
+            employees.append(
+                Employee.objects.create(
+                    company=department.company, department=department, **payload
+                )
+            )
+        return employees
+
+
+def _get(path):
+    def prepare(context, count):
+        return [context.get(path(context, i)) for i in range(count)]
+
+    return prepare
+
+
+def _company_create(context, count):
+    return [
+        context.send(
+            "post",
+            "/main/company/",
+            {
+                "company_name": f"Bench Company {context.unique()} {uuid.uuid4().hex[:6]}"
+            },
+        )
+        for _ in range(count)
+    ]
+
+
+def _company_update(context, count):
+    company = context.new_company()
+    return [
+        context.send(
+            "put",
+            f"/main/company/{company.pk}/",
+            {
+                "company_name": f"Bench Company {context.unique()} {uuid.uuid4().hex[:6]}"
+            },
+        )
+        for _ in range(count)
+    ]
+
+
+def _company_delete(context, count):
+    companies = [context.new_company() for _ in range(count)]
+    return [
+        lambda pk=company.pk: context.client.delete(f"/main/company/{pk}/")
+        for company in companies
+    ]
+
+
+def _department_create(context, count):
+    company = context.new_company()
+    return [
+        context.send(
+            "post",
+            "/main/department/",
+            {
+                "company": company.company_name,
+                "department_name": f"Department {context.unique()}",
+            },
+        )
+        for _ in range(count)
+    ]
+
+
+def _department_update(context, count):
+    company = context.new_company()
+    department = Department.objects.create(company=company, department_name="Bench")
+    return [
+        context.send(
+            "put",
+            f"/main/department/{department.pk}/",
+            {
+                "company": company.company_name,
+                "department_name": f"{company.company_name}_Bench {context.unique()}",
+            },
+        )
+        for _ in range(count)
+    ]
+
+
+def _department_delete(context, count):
+    company = context.new_company()
+    departments = [
+        Department.objects.create(company=company, department_name=f"Bench {i}")
+        for i in range(count)
+    ]
+    return [
+        lambda pk=department.pk: context.client.delete(f"/main/department/{pk}/")
+        for department in departments
+    ]
+
+
+def _employee_create(context, count):
+    return [
+        context.send("post", "/main/employee/", context.employee_payload(i))
+        for i in range(count)
+    ]
+
+
+def _employee_update(context, count):
+    employee = context.new_employees(1)[0]
+    calls = []
+    for i in range(count):
+        payload = context.employee_payload(i, context.pick(context.departments[:2], i))
+        payload["email"] = employee.email
+        calls.append(context.send("put", f"/main/employee/{employee.pk}/", payload))
+    return calls
+
+
+def _employee_patch(context, count):
+    employee = context.new_employees(1)[0]
+    return [
+        context.send(
+            "patch",
+            f"/main/employee/{employee.pk}/",
+            {"designation": f"Engineer {context.unique()}"},
+        )
+        for _ in range(count)
+    ]
+
+
+def _employee_bulk_patch(context, count):
+    employees = context.new_employees(10)
+    return [
+        context.send(
+            "patch",
+            "/main/employee/",
+            [
+                {"id": employee.pk, "designation": f"Engineer {context.unique()}"}
+                for employee in employees
+            ],
+        )
+        for _ in range(count)
+    ]
+
+
+def _employee_delete(context, count):
+    employees = context.new_employees(count)
+    return [
+        lambda pk=employee.pk: context.client.delete(f"/main/employee/{pk}/")
+        for employee in employees
+    ]
+
+
+def _employee_import(context, count):
+    calls = []
+    for i in range(count):
+        payload = context.employee_payload(i)
+        line = ",".join(
+            payload[field]
+            for field in (
+                "company",
+                "department",
+                "status",
+                "name",
+                "email",
+                "mobile_number",
+                "address",
+                "designation",
+                "hired_on",
+            )
+        )
+        body = (
+            "company,department,status,name,email,mobile_number,address,"
+            f"designation,hired_on\n{line}\n"
+        )
+        calls.append(
+            lambda body=body: context.client.post(
+                "/main/employee/import/", body, content_type="text/csv"
+            )
+        )
+    return calls
+
+
+def _employee_transition(context, count):
+    calls = []
+    for _ in range(count):
+        employees = context.new_employees(5, status="INTERVIEW_SCHEDULED")
+        calls.append(
+            context.send(
+                "post",
+                "/main/employee/transition/",
+                {"ids": [e.pk for e in employees], "status": "NOT_ACCEPTED"},
+            )
+        )
+    return calls
+
+
+def _employee_export(context, count):
+    def export(i):
+        company_id = context.pick(context.company_ids, i)
+        response = context.client.get(f"/main/employee/export/?company={company_id}")
+        b"".join(
+            response.streaming_content if response.streaming else [response.content]
+        )
+        return response
+
+    return [lambda i=i: export(i) for i in range(count)]
+
+
+def _user_fields(context):
+    name = f"bench-user-{context.unique()}-{uuid.uuid4().hex[:6]}"
+    return {"username": name, "email": f"{name}@example.com", "role": "EMPLOYEE"}
+
+
+def _user_create(context, count):
+    return [
+        context.send(
+            "post",
+            "/main/user/",
+            {**_user_fields(context), "password": context.password},
+        )
+        for _ in range(count)
+    ]
+
+
+def _user_delete(context, count):
+    users = [UserAccounts.objects.create(**_user_fields(context)) for _ in range(count)]
+    return [
+        lambda pk=user.pk: context.client.delete(f"/main/user/{pk}/") for user in users
+    ]
+
+
+def _token(context, count):
+    client = Client()  # Unauthenticated, as when obtaining a token.
+    data = {"username": context.admin.username, "password": context.password}
+    return [lambda: client.post("/main/token/", data) for _ in range(count)]
+
+
+def _job_detail(context, count):
+    job_id = start_job("bench", lambda progress: None)
+    return [context.get(f"/main/jobs/{job_id}/") for _ in range(count)]
+
+
+def _signal_create(context, count):
+    department_id, _, _ = context.departments[0]
+    department = Department.objects.select_related("company").get(pk=department_id)
+    calls = []
+    for i in range(count):
+        payload = context.employee_payload(i, context.departments[0])
+        del payload["company"], payload["department"]
+        payload["hired_on"] = date(2024, 1, 1)
+        calls.append(
+            lambda payload=payload: Employee.objects.create(
+                company=department.company, department=department, **payload
+            )
+        )
+    return calls
+
+
+def _signal_move(context, count):
+    employee = context.new_employees(1)[0]
+    departments = list(
+        Department.objects.filter(company=employee.company).order_by("pk")[:2]
+    )
+
+    def move(i):
+        employee.department = departments[i % len(departments)]
+        employee.save()
+
+    return [lambda i=i: move(i) for i in range(count)]
+
+
+def _signal_delete(context, count):
+    return [employee.delete for employee in context.new_employees(count)]
+
+
+OPERATIONS = [
+    Operation("token", "api_token_auth", _token, max_iterations=20),
+    Operation("user list", "user-list", _get(lambda c, i: "/main/user/")),
+    Operation(
+        "user detail",
+        "user-detail",
+        _get(lambda c, i: f"/main/user/{c.admin.pk}/"),
+    ),
+    Operation("user create", "user-list", _user_create, max_iterations=20),
+    Operation("user delete", "user-detail", _user_delete),
+    Operation("company list", "company-list", _get(lambda c, i: "/main/company/")),
+    Operation(
+        "company detail",
+        "company-detail",
+        _get(lambda c, i: f"/main/company/{c.pick(c.company_ids, i)}/"),
+    ),
+    Operation("company create", "company-list", _company_create),
+    Operation("company update", "company-detail", _company_update),
+    Operation("company delete", "company-detail", _company_delete),
+    Operation(
+        "department list",
+        "department-list",
+        _get(lambda c, i: "/main/department/"),
+    ),
+    Operation(
+        "department detail",
+        "department-detail",
+        _get(lambda c, i: f"/main/department/{c.pick(c.departments, i)[0]}/"),
+    ),
+    Operation("department create", "department-list", _department_create),
+    Operation("department update", "department-detail", _department_update),
+    Operation("department delete", "department-detail", _department_delete),
+    Operation(
+        "employee list",
+        "employee-list",
+        _get(lambda c, i: "/main/employee/"),
+        role="EMPLOYEE",
+    ),
+    Operation(
+        "employee list filtered",
+        "employee-list",
+        _get(
+            lambda c, i: f"/main/employee/?company={c.pick(c.company_ids, i)}"
+            "&status=HIRED&ordering=-hired_on"
+        ),
+        role="EMPLOYEE",
+    ),
+    Operation(
+        "employee detail",
+        "employee-detail",
+        _get(lambda c, i: f"/main/employee/{c.pick(c.employee_ids, i)}/"),
+        role="EMPLOYEE",
+    ),
+    Operation("employee create", "employee-list", _employee_create),
+    Operation("employee update", "employee-detail", _employee_update),
+    Operation("employee patch", "employee-detail", _employee_patch),
+    Operation("employee bulk patch", "employee-list", _employee_bulk_patch),
+    Operation("employee delete", "employee-detail", _employee_delete),
+    Operation("employee import", "employee-import", _employee_import),
+    Operation("employee export", "employee-export", _employee_export),
+    Operation(
+        "employee search",
+        "employee-search",
+        _get(lambda c, i: f"/main/employee/search/?q=an&page={i % 3 + 1}"),
+        role="EMPLOYEE",
+    ),
+    Operation("employee transition", "employee-transition", _employee_transition),
+    Operation("stats", "stats", _get(lambda c, i: "/main/stats/")),
+    Operation("job detail", "job-detail", _job_detail),
+    Operation(
+        "headcount",
+        "analytics-headcount",
+        _get(
+            lambda c, i: "/main/analytics/headcount/?group_by="
+            + ("company", "department")[i % 2]
+        ),
+    ),
+    Operation(
+        "async company list",
+        "async-company-list",
+        _get(lambda c, i: "/main/async/company/"),
+    ),
+    Operation(
+        "async company detail",
+        "async-company-detail",
+        _get(lambda c, i: f"/main/async/company/{c.pick(c.company_ids, i)}/"),
+    ),
+    Operation(
+        "async department list",
+        "async-department-list",
+        _get(lambda c, i: "/main/async/department/"),
+    ),
+    Operation(
+        "async department detail",
+        "async-department-detail",
+        _get(lambda c, i: f"/main/async/department/{c.pick(c.departments, i)[0]}/"),
+    ),
+    Operation(
+        "async employee list",
+        "async-employee-list",
+        _get(lambda c, i: "/main/async/employee/"),
+        role="EMPLOYEE",
+    ),
+    Operation(
+        "async employee detail",
+        "async-employee-detail",
+        _get(lambda c, i: f"/main/async/employee/{c.pick(c.employee_ids, i)}/"),
+        role="EMPLOYEE",
+    ),
+    Operation("signal employee create", None, _signal_create),
+    Operation("signal employee move", None, _signal_move),
+    Operation("signal employee delete", None, _signal_delete),
+]
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries, without the DEBUG query log.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of sorted values.
+
+    Args:
+        values (list): The sorted values.
+        fraction (float): The percentile, between 0 and 1.
+
+    Returns:
+        float: The value, or 0.0 if there are none.
+    """
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def run_operation(operation, context, iterations, warmup=0, cold=False):
+    """
+    Time the requests of an Operation one after another.
+
+    Args:
+        operation (Operation): The Operation.
+        context (BenchmarkContext): The shared client and rows.
+        iterations (int): Number of timed requests.
+        warmup (int, optional): Number of untimed requests first. Defaults to 0.
+        cold (bool, optional): Clear the response cache before every request.
+            Defaults to False.
+
+    Returns:
+        dict: ops/sec, p50/p95/p99 latencies in milliseconds, queries per
+        request and the number of error (4xx/5xx) responses.
+    """
+    if operation.max_iterations is not None:
+        iterations = min(iterations, operation.max_iterations)
+        warmup = min(warmup, 1)
+    context.client = context.clients[operation.role]
+    calls = operation.prepare(context, warmup + iterations)
+    for call in calls[:warmup]:
+        call()
+
+    counter, latencies, errors, elapsed = QueryCounter(), [], 0, 0.0
+    cache = caches[response_cache.alias]
+    with connection.execute_wrapper(counter):
+        for call in calls[warmup:]:
+            if cold:
+                cache.clear()
+            start = time.perf_counter()
+            response = call()
+            latency = time.perf_counter() - start
+            elapsed += latency
+            latencies.append(latency * 1000)
+            if getattr(response, "status_code", 200) >= 400:
+                errors += 1
+    latencies.sort()
+    return {
+        "name": operation.name,
+        "route": operation.route,
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "queries": round(counter.count / iterations, 2) if iterations else 0.0,
+        "errors": errors,
+    }
+
+
+######################################################################
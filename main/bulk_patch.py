@@ -0,0 +1,141 @@
+"""
+Bulk partial updates (PATCH) of Employees.
+
+Each row is validated on its own with EmployeeSerializer, rows of the same
+batch setting the same unique value (e.g. email) are rejected, and only the
+changed fields are applied. Rows are then grouped by their set of changed
+fields and every group is written with `bulk_update()`, i.e. a few batched
+UPDATE statements instead of one per row. The Company/Department counters and
+headcounts are adjusted once per parent and stage for the rows that changed
+company, department or status.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.utils import timezone
+from .cache import bump_versions
+from .counters import adjust_company, adjust_department, adjust_headcount
+from .models import Employee
+from .serializers import EmployeeSerializer
+
+######################################################################
+
+
+######################################################################
+######################### B U L K   P A T C H ########################
+######################################################################
+
+MAX_PATCH_ROWS = 1000
+UNIQUE_FIELDS = [
+    field.name
+    for field in Employee._meta.concrete_fields
+    if field.unique and not field.primary_key
+]
+
+
+def validate_patches(rows):
+    """
+    Validate a bulk PATCH body against the stored Employees.
+
+    Args:
+        rows (list): One dict per Employee, with its `id` and the fields to change.
+
+    Returns:
+        tuple: A list of `(serializer, instance)` pairs, and one
+        `{"id": pk, "errors": {...}}` entry per invalid row.
+    """
+    ids = [row.get("id") if isinstance(row, dict) else None for row in rows]
+    instances = Employee.objects.select_related("company", "department").in_bulk(
+        [pk for pk in ids if isinstance(pk, int)]
+    )
+    valid, errors, seen = {}, {}, set()
+    for index, (pk, row) in enumerate(zip(ids, rows)):
+        if not isinstance(pk, int) or pk in seen:
+            errors[index] = {"id": ["A unique employee id is required."]}
+            continue
+        seen.add(pk)
+        if pk not in instances:
+            errors[index] = {"id": ["Employee not found."]}
+            continue
+        serializer = EmployeeSerializer(instances[pk], data=row, partial=True)
+        if serializer.is_valid():
+            valid[index] = (serializer, instances[pk])
+        else:
+            errors[index] = serializer.errors
+
+    # The serializers check the unique fields against the stored rows only, so
+    # two rows of the batch setting the same value would both pass.
+    claims = defaultdict(list)
+    for index, (serializer, _) in valid.items():
+        for field in UNIQUE_FIELDS:
+            if field in serializer.validated_data:
+                claims[field, serializer.validated_data[field]].append(index)
+    for (field, _), indexes in claims.items():
+        if len(indexes) > 1:
+            for index in indexes:
+                valid.pop(index, None)
+                errors.setdefault(index, {})[field] = [
+                    f"Another row of this request sets the same {field}."
+                ]
+    return list(valid.values()), [
+        {"id": ids[index], "errors": errors[index]} for index in sorted(errors)
+    ]
+
+
+def bulk_patch_employees(valid):
+    """
+    Apply validated partial updates with batched UPDATEs, in one transaction.
+
+    Args:
+        valid (list): `(serializer, instance)` pairs as returned by `validate_patches`.
+
+    Returns:
+        list: The ids of the Employees that changed.
+    """
+    groups, updated = defaultdict(list), []
+    departments, companies, headcounts = Counter(), Counter(), Counter()
+    now = timezone.now()
+    for serializer, instance in valid:
+        before = (instance.company_id, instance.department_id, instance.status)
+        changed = serializer.apply_changes(instance, serializer.validated_data)
+        if not changed:
+            continue
+        fields = {*changed, "updated_at"}
+        instance.updated_at = now
+        if fields & {"status", "hired_on"}:
+            instance.days_employed = instance.calculate_days_employed()
+            fields.add("days_employed")
+        groups[frozenset(fields)].append(instance)
+        updated.append(instance.pk)
+
+        after = (instance.company_id, instance.department_id, instance.status)
+        if before != after:
+            companies[before[0]] -= 1
+            companies[after[0]] += 1
+            departments[before[1]] -= 1
+            departments[after[1]] += 1
+            headcounts[before[1:]] -= 1
+            headcounts[after[1:]] += 1
+
+    with transaction.atomic():
+        for fields, instances in groups.items():
+            Employee.objects.bulk_update(instances, sorted(fields), batch_size=500)
+        for company_id, delta in companies.items():
+            adjust_company(company_id, no_of_employees=delta)
+        for department_id, delta in departments.items():
+            adjust_department(department_id, no_of_employees=delta)
+        for (department_id, status), delta in headcounts.items():
+            adjust_headcount(department_id, status, delta)
+        if headcounts:
+            bump_versions("employee", "department", "company")
+        elif groups:
+            bump_versions("employee")
+    return updated
+
+
+######################################################################
@@ -0,0 +1,226 @@
+"""
+Versioned response cache for the read-heavy Company and Department endpoints.
+
+Each collection (company, department, employee) has a version token in the
+CollectionVersion table that is replaced in the same transaction as every write
+to it. Cached responses are keyed by endpoint, parameters, role and the current
+tokens, so a committed write makes every older entry unreachable and readers
+never see data older than the last committed write. Reading the tokens costs
+one small indexed query.
+
+The cache backend is any Django cache alias, set with `RESPONSE_CACHE["ALIAS"]`
+(locmem, file-based, Redis, ...).
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import functools
+import hashlib
+import secrets
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.response import Response
+from .models import CollectionVersion
+
+######################################################################
+
+
+######################################################################
+############################ C A C H E ###############################
+######################################################################
+
+COLLECTIONS = ("company", "department", "employee")
+
+
+def bump_versions(*names):
+    """
+    Replace the version token of the given collections.
+
+    Must be called inside the transaction of the write, which is the case for
+    the signal handlers; bulk writes that bypass the signals call it directly.
+
+    Args:
+        *names (str): The collection names, e.g. "employee".
+    """
+    # One UPDATE for all of them: the tokens only need to differ from their own
+    # previous values, so the collections can share the new one.
+    changes = {"version": secrets.randbits(62), "updated_at": timezone.now()}
+    if CollectionVersion.objects.filter(name__in=names).update(**changes) < len(
+        set(names)
+    ):
+        for name in names:
+            CollectionVersion.objects.update_or_create(name=name, defaults=changes)
+
+
+def read_versions(names=COLLECTIONS, request=None):
+    """
+    Read the current version tokens and last write time of the given collections.
+
+    When a request is given, the result is remembered on it so the response
+    cache and the conditional GET handling share a single query.
+
+    Args:
+        names (iterable, optional): The collection names. Defaults to all of them.
+        request (Request, optional): The HTTP request to remember the result on.
+
+    Returns:
+        tuple: The tokens, in the order of `names`, and the latest `updated_at` (or None).
+    """
+    names = tuple(names)
+    memo = getattr(request, "_collection_versions", None) if request else None
+    if memo is not None and names in memo:
+        return memo[names]
+
+    rows = {
+        name: (version, updated_at)
+        for name, version, updated_at in CollectionVersion.objects.filter(
+            name__in=names
+        ).values_list("name", "version", "updated_at")
+    }
+    versions = tuple(rows.get(name, (0, None))[0] for name in names)
+    last_modified = max(
+        (updated_at for _, updated_at in rows.values() if updated_at), default=None
+    )
+    if request is not None:
+        if memo is None:
+            memo = request._collection_versions = {}
+        memo[names] = (versions, last_modified)
+    return versions, last_modified
+
+
+def get_versions(names=COLLECTIONS, request=None):
+    """
+    Read the current version tokens of the given collections.
+
+    Args:
+        names (iterable, optional): The collection names. Defaults to all of them.
+        request (Request, optional): The HTTP request to remember the result on.
+
+    Returns:
+        tuple: The tokens, in the order of `names`.
+    """
+    return read_versions(names, request)[0]
+
+
+class ResponseCache:
+    """
+    Cache of serialized response bodies stored in a Django cache backend.
+
+    Hit and miss counters are kept per process.
+    """
+
+    def __init__(self, alias="default", timeout=300):
+        self.alias = alias
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def make_key(self, endpoint, request, kwargs, versions):
+        """
+        Build the cache key of a request.
+
+        Args:
+            endpoint (str): The endpoint name.
+            request (Request): The HTTP request.
+            kwargs (dict): The URL keyword arguments.
+            versions (tuple): The collection version tokens.
+
+        Returns:
+            str: The cache key.
+        """
+        parts = [
+            endpoint,
+            request.get_host(),
+            getattr(request.user, "role", ""),
+            repr(sorted(kwargs.items())),
+            repr(sorted(request.query_params.lists())),
+            repr(versions),
+        ]
+        digest = hashlib.sha256("\n".join(parts).encode()).hexdigest()
+        return f"main:response:{endpoint}:{digest}"
+
+    def get(self, key):
+        data = self.backend.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key, data):
+        self.backend.set(key, data, self.timeout)
+
+    def clear(self):
+        """
+        Reset the counters. Entries are left to expire, as older keys are unreachable.
+        """
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """
+        Report the cache counters.
+
+        Returns:
+            dict: Hits, misses, hit ratio and configuration.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "alias": self.alias,
+                "timeout": self.timeout,
+            }
+
+
+response_cache = ResponseCache(
+    alias=getattr(settings, "RESPONSE_CACHE", {}).get("ALIAS", "default"),
+    timeout=getattr(settings, "RESPONSE_CACHE", {}).get("TIMEOUT", 300),
+)
+
+
+def cached_get(endpoint, collections=COLLECTIONS):
+    """
+    Decorate an APIView `get` method so its successful responses are cached.
+
+    Args:
+        endpoint (str): The endpoint name used in the cache key.
+        collections (iterable, optional): The collections the response depends on. Defaults to all of them.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(get):
+        @functools.wraps(get)
+        def wrapper(view, request, *args, **kwargs):
+            key = response_cache.make_key(
+                endpoint, request, kwargs, get_versions(collections, request)
+            )
+            data = response_cache.get(key)
+            if data is not None:
+                return Response(data, status=200)
+            response = get(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                response_cache.set(key, response.data)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+######################################################################
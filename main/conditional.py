@@ -0,0 +1,130 @@
+"""
+Conditional GET (ETag / Last-Modified) support for the API views.
+
+Responses get a strong ETag built from a cheap fingerprint of the data they
+depend on, so a client that sends it back in `If-None-Match` gets a 304 Not
+Modified without the view querying or serializing anything:
+
+- List responses are fingerprinted with the collection version tokens (one small
+  indexed query, shared with the response cache).
+- Detail responses are fingerprinted with the `updated_at` of the row and of the
+  related rows it renders (one single-row query).
+
+Employee responses also depend on the current date, because `days_employed` is
+computed at read time.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import datetime
+import functools
+import hashlib
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .cache import COLLECTIONS, read_versions
+
+######################################################################
+
+
+######################################################################
+###################### C O N D I T I O N A L #########################
+######################################################################
+
+
+def _fingerprint(request, model, fields, collections, kwargs):
+    """
+    Read the fingerprint and last write time of the data behind a request.
+
+    Args:
+        request (Request): The HTTP request.
+        model (type): The model of detail responses, or None for list-only views.
+        fields (tuple): The `updated_at` paths read for a detail response.
+        collections (tuple): The collections a list response depends on.
+        kwargs (dict): The URL keyword arguments.
+
+    Returns:
+        tuple: The fingerprint parts and the last write time, or None if the row does not exist.
+    """
+    pk = next((value for value in kwargs.values() if value is not None), None)
+    if model is not None and pk is not None:
+        row = model.objects.filter(pk=pk).values_list(*fields).first()
+        if row is None:
+            return None
+        stamps = [stamp for stamp in row if stamp is not None]
+        return (
+            tuple(stamp.isoformat() for stamp in stamps),
+            max(stamps, default=None),
+        )
+    return read_versions(collections, request)
+
+
+def conditional_get(
+    endpoint, model=None, fields=("updated_at",), collections=COLLECTIONS, daily=False
+):
+    """
+    Decorate an APIView `get` method with ETag and Last-Modified handling.
+
+    Args:
+        endpoint (str): The endpoint name used in the ETag.
+        model (type, optional): The model of detail responses. Defaults to None (list only).
+        fields (tuple, optional): The `updated_at` paths of the row and the related rows it renders.
+        collections (tuple, optional): The collections list responses depend on. Defaults to all of them.
+        daily (bool, optional): Whether the response also changes at midnight (UTC). Defaults to False.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(get):
+        @functools.wraps(get)
+        def wrapper(view, request, *args, **kwargs):
+            fingerprint = _fingerprint(request, model, fields, collections, kwargs)
+            if fingerprint is None:
+                return get(view, request, *args, **kwargs)  # Let the view 404.
+            parts, last_modified = fingerprint
+            if daily:
+                today = timezone.now().date()
+                midnight = datetime.datetime.combine(
+                    today, datetime.time.min, tzinfo=datetime.timezone.utc
+                )
+                parts += (today.isoformat(),)
+                last_modified = max(last_modified or midnight, midnight)
+
+            digest = hashlib.sha256(
+                "\n".join(
+                    [
+                        endpoint,
+                        request.get_host(),
+                        getattr(request.user, "role", ""),
+                        getattr(request, "accepted_media_type", "") or "",
+                        repr(sorted(kwargs.items())),
+                        repr(sorted(request.query_params.lists())),
+                        repr(parts),
+                    ]
+                ).encode()
+            ).hexdigest()
+            etag = f'"{digest[:40]}"'
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = get(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+######################################################################
@@ -0,0 +1,181 @@
+"""
+Helpers for maintaining the denormalized counters on Company and Department,
+and the per department and status headcounts of HeadcountSummary.
+
+Every helper issues a single UPDATE that increments the counter columns in the
+database (`SET col = col + delta`), so concurrent writers never lose an
+increment and the rest of the row is left untouched. Bulk paths that bypass
+the signals recompute the counters of the parents they touched instead.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Company, Department, Employee, HeadcountSummary
+
+######################################################################
+
+
+######################################################################
+######################### C O U N T E R S ############################
+######################################################################
+
+
+def _increments(**deltas):
+    """
+    Build the `update()` keyword arguments for the non-zero counter deltas.
+
+    Args:
+        **deltas: Counter field names mapped to the amount to add.
+
+    Returns:
+        dict: Field names mapped to `F(field) + delta` expressions, plus the
+        new `updated_at` if any counter changes.
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes:
+        changes["updated_at"] = timezone.now()
+    return changes
+
+
+def adjust_company(company_id, no_of_deps=0, no_of_employees=0):
+    """
+    Atomically add the given deltas to a Company's counters.
+
+    Args:
+        company_id (int): The primary key of the Company.
+        no_of_deps (int, optional): Amount to add to `no_of_deps`. Defaults to 0.
+        no_of_employees (int, optional): Amount to add to `no_of_employees`. Defaults to 0.
+    """
+    changes = _increments(no_of_deps=no_of_deps, no_of_employees=no_of_employees)
+    if changes:
+        Company.objects.filter(pk=company_id).update(**changes)
+
+
+def adjust_department(department_id, no_of_employees=0):
+    """
+    Atomically add the given delta to a Department's employee counter.
+
+    Args:
+        department_id (int): The primary key of the Department.
+        no_of_employees (int, optional): Amount to add to `no_of_employees`. Defaults to 0.
+    """
+    changes = _increments(no_of_employees=no_of_employees)
+    if changes:
+        Department.objects.filter(pk=department_id).update(**changes)
+
+
+def adjust_headcount(department_id, status, delta):
+    """
+    Atomically add a delta to the headcount of a department and status, creating its row if needed.
+
+    Args:
+        department_id (int): The primary key of the Department.
+        status (str): The Employee status stage.
+        delta (int): Amount to add to the count.
+    """
+    if not delta:
+        return
+    rows = HeadcountSummary.objects.filter(department_id=department_id, status=status)
+    if rows.update(count=F("count") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            HeadcountSummary.objects.create(
+                department_id=department_id, status=status, count=delta
+            )
+    except IntegrityError:  # Created concurrently since the UPDATE.
+        rows.update(count=F("count") + delta)
+
+
+def recount_headcounts(department_ids):
+    """
+    Recompute the headcounts of the given Departments from the Employee table.
+
+    Args:
+        department_ids (iterable): Primary keys of the Departments to recount.
+    """
+    department_ids = list(department_ids)
+    HeadcountSummary.objects.filter(department_id__in=department_ids).delete()
+    HeadcountSummary.objects.bulk_create(
+        HeadcountSummary(
+            department_id=row["department_id"],
+            status=row["status"],
+            count=row["count"],
+        )
+        for row in Employee.objects.filter(department_id__in=department_ids)
+        .order_by()
+        .values("department_id", "status")
+        .annotate(count=Count("pk"))
+    )
+
+
+def _employee_count(field):
+    """
+    Build a correlated subquery counting the Employees that point at the outer row.
+
+    Args:
+        field (str): The Employee foreign key to count by ("company" or "department").
+
+    Returns:
+        Coalesce: The employee count, 0 if the parent has no employees.
+    """
+    count = (
+        Employee.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(count), 0)
+
+
+def recount_departments(company_ids):
+    """
+    Recompute the department counters of the given Companies from the Department table.
+
+    Args:
+        company_ids (iterable): Primary keys of the Companies to recount.
+    """
+    count = (
+        Department.objects.filter(company=OuterRef("pk"))
+        .order_by()
+        .values("company")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Company.objects.filter(pk__in=list(company_ids)).update(
+        no_of_deps=Coalesce(Subquery(count), 0), updated_at=timezone.now()
+    )
+
+
+def recount_employees(company_ids=(), department_ids=()):
+    """
+    Recompute the employee counters of the given parents from the Employee table.
+
+    Used by bulk writes that bypass the per-row signals; each parent is recounted
+    once with a single set-based UPDATE per model, and the headcounts of the
+    Departments are rebuilt.
+
+    Args:
+        company_ids (iterable, optional): Primary keys of the Companies to recount.
+        department_ids (iterable, optional): Primary keys of the Departments to recount.
+    """
+    if department_ids:
+        Department.objects.filter(pk__in=list(department_ids)).update(
+            no_of_employees=_employee_count("department"), updated_at=timezone.now()
+        )
+        recount_headcounts(department_ids)
+    if company_ids:
+        Company.objects.filter(pk__in=list(company_ids)).update(
+            no_of_employees=_employee_count("company"), updated_at=timezone.now()
+        )
+
+
+######################################################################
@@ -0,0 +1,140 @@
+"""
+Chunked cascading deletes of Companies and Departments.
+
+Deleting a parent through the ORM cascades to its Employees in one
+transaction, with a post_delete signal per row (`Company.delete` and
+`Department.delete` make those signals skip the counters of the parents being
+deleted). For large parents, the functions here delete the Employees in
+chunks, each one its own transaction, so the background jobs and the
+`delete_company` command never hold the write lock for long and can report
+their progress. The chunks are deleted through the ORM inside the same
+`deleting` block, then the now childless parent is deleted.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+from django.db import router, transaction
+from .cache import bump_versions
+from .counters import recount_employees
+from .models import Company, Department, Employee, deleting
+
+######################################################################
+
+
+######################################################################
+########################## D E L E T I O N ###########################
+######################################################################
+
+
+def delete_employees_in_chunks(parent, queryset, chunk_size=2000, progress=None):
+    """
+    Delete Employees in chunks, one transaction per chunk.
+
+    The counter signals skip `parent`, as it is deleted next.
+
+    Args:
+        parent (Company | Department): The parent being deleted.
+        queryset (QuerySet): The Employees to delete.
+        chunk_size (int, optional): Number of Employees per chunk. Defaults to 2000.
+        progress (callable, optional): Called with `(deleted, total)` after each chunk.
+
+    Returns:
+        int: The number of deleted Employees.
+    """
+    using = router.db_for_write(Employee)
+    total, deleted = queryset.count(), 0
+    with deleting(parent):
+        while True:
+            with transaction.atomic(using=using):
+                ids = list(
+                    queryset.order_by("pk").values_list("pk", flat=True)[:chunk_size]
+                )
+                if not ids:
+                    break
+                Employee.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+            if progress is not None:
+                progress(deleted, total)
+    return deleted
+
+
+def delete_company(company_id, chunk_size=2000, progress=None):
+    """
+    Delete a Company, its Departments and its Employees.
+
+    The counters of the Company and its Departments are not maintained while
+    their Employees are deleted, as they are deleted too. If the delete fails
+    part way, they are recounted.
+
+    Args:
+        company_id (int): The primary key of the Company.
+        chunk_size (int, optional): Number of Employees per chunk. Defaults to 2000.
+        progress (callable, optional): Called with `(deleted, total)` after each chunk.
+
+    Returns:
+        int: The number of deleted Employees.
+
+    Raises:
+        Company.DoesNotExist: If the Company does not exist.
+    """
+    company = Company.objects.get(pk=company_id)
+    try:
+        deleted = delete_employees_in_chunks(
+            company,
+            Employee.objects.filter(company_id=company_id),
+            chunk_size,
+            progress,
+        )
+        company.delete()
+    except Exception:
+        with transaction.atomic():
+            recount_employees(
+                [company_id],
+                Department.objects.filter(company_id=company_id).values_list(
+                    "pk", flat=True
+                ),
+            )
+            bump_versions("department", "company")
+        raise
+    return deleted
+
+
+def delete_department(department_id, chunk_size=2000, progress=None):
+    """
+    Delete a Department and its Employees.
+
+    The Department's own counters are not maintained while its Employees are
+    deleted; the Company's employee count is adjusted with each chunk.
+
+    Args:
+        department_id (int): The primary key of the Department.
+        chunk_size (int, optional): Number of Employees per chunk. Defaults to 2000.
+        progress (callable, optional): Called with `(deleted, total)` after each chunk.
+
+    Returns:
+        int: The number of deleted Employees.
+
+    Raises:
+        Department.DoesNotExist: If the Department does not exist.
+    """
+    department = Department.objects.get(pk=department_id)
+    try:
+        deleted = delete_employees_in_chunks(
+            department,
+            Employee.objects.filter(department_id=department_id),
+            chunk_size,
+            progress,
+        )
+        department.delete()
+    except Exception:
+        with transaction.atomic():
+            recount_employees(department_ids=[department_id])
+            bump_versions("department")
+        raise
+    return deleted
+
+
+######################################################################
@@ -0,0 +1,189 @@
+"""
+Streaming export of Employee rows as NDJSON or CSV.
+
+Rows are read with `values_list()` in chunks (a server-side cursor where the
+database supports one), with the company and department names taken from a
+join, and are encoded and optionally gzip-compressed block by block, so memory
+stays flat regardless of the number of exported rows.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import csv
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Employee
+
+######################################################################
+
+
+######################################################################
+######################### E X P O R T E R ############################
+######################################################################
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Output keys, in the order used by EmployeeSerializer, mapped to ORM paths.
+EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("company", "company__company_name"),
+    ("department", "department__department_name"),
+    ("status", "status"),
+    ("name", "name"),
+    ("email", "email"),
+    ("mobile_number", "mobile_number"),
+    ("address", "address"),
+    ("designation", "designation"),
+    ("hired_on", "hired_on"),
+    ("days_employed", "current_days_employed"),
+]
+
+
+class _Echo:
+    """
+    File-like object whose `write` returns the value, for use with `csv.writer`.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_columns(columns=None):
+    """
+    Select the exported columns.
+
+    Args:
+        columns (list, optional): The output keys to export. Defaults to all of them.
+
+    Returns:
+        list: `(key, ORM path)` pairs, in `EXPORT_COLUMNS` order.
+    """
+    if columns is None:
+        return EXPORT_COLUMNS
+    return [(key, path) for key, path in EXPORT_COLUMNS if key in columns]
+
+
+def export_rows(queryset=None, chunk_size=2000, columns=None):
+    """
+    Iterate the exported Employee rows as tuples, in id order.
+
+    Only the selected columns are read, so unexported relations are not joined.
+
+    Args:
+        queryset (QuerySet, optional): The Employees to export. Defaults to all of them.
+        chunk_size (int, optional): Number of rows fetched from the cursor at a time. Defaults to 2000.
+        columns (list, optional): The output keys to export. Defaults to all of them.
+
+    Returns:
+        iterator: One tuple per row, in `EXPORT_COLUMNS` order.
+    """
+    if queryset is None:
+        queryset = Employee.objects.all()
+    return (
+        queryset.with_days_employed()
+        .order_by("id")
+        .values_list(*[path for _, path in export_columns(columns)])
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _blocks(lines, block_size):
+    """
+    Join encoded lines into blocks so the response is written in large pieces.
+
+    Args:
+        lines (iterable): The encoded lines.
+        block_size (int): Number of lines per block.
+
+    Yields:
+        str: The joined block.
+    """
+    block = []
+    for line in lines:
+        block.append(line)
+        if len(block) >= block_size:
+            yield "".join(block)
+            block = []
+    if block:
+        yield "".join(block)
+
+
+def ndjson_lines(rows, columns=None):
+    """
+    Encode rows as JSON Lines.
+
+    Args:
+        rows (iterable): Row tuples in `EXPORT_COLUMNS` order.
+        columns (list, optional): The exported output keys. Defaults to all of them.
+
+    Yields:
+        str: One JSON object per row, newline terminated.
+    """
+    keys = [key for key, _ in export_columns(columns)]
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(keys, row))) + "\n"
+
+
+def csv_lines(rows, columns=None):
+    """
+    Encode rows as CSV with a header row.
+
+    Args:
+        rows (iterable): Row tuples in `EXPORT_COLUMNS` order.
+        columns (list, optional): The exported output keys. Defaults to all of them.
+
+    Yields:
+        str: One CSV line per row, the header first.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow([key for key, _ in export_columns(columns)])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def gzip_blocks(blocks, level=6):
+    """
+    Gzip-compress a stream of text blocks.
+
+    Args:
+        blocks (iterable): The text blocks.
+        level (int, optional): The zlib compression level. Defaults to 6.
+
+    Yields:
+        bytes: The compressed stream, in pieces.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    for block in blocks:
+        data = compressor.compress(block.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_employees(
+    output="ndjson", compress=False, queryset=None, chunk_size=2000, columns=None
+):
+    """
+    Stream the Employees as NDJSON or CSV.
+
+    Args:
+        output (str, optional): Either "ndjson" or "csv". Defaults to "ndjson".
+        compress (bool, optional): Whether to gzip the stream. Defaults to False.
+        queryset (QuerySet, optional): The Employees to export. Defaults to all of them.
+        chunk_size (int, optional): Number of rows fetched and written at a time. Defaults to 2000.
+        columns (list, optional): The output keys to export. Defaults to all of them.
+
+    Returns:
+        iterator: The encoded stream, as str blocks or gzip bytes.
+    """
+    encode = csv_lines if output == "csv" else ndjson_lines
+    rows = export_rows(queryset, chunk_size, columns)
+    blocks = _blocks(encode(rows, columns), chunk_size)
+    return gzip_blocks(blocks) if compress else blocks
+
+
+######################################################################
@@ -0,0 +1,136 @@
+"""
+Filtering and ordering of the list endpoints.
+
+Filters are django-filter FilterSets and ordering is DRF's OrderingFilter, both
+applied in SQL before the cursor pagination, so a filtered page is a single
+query served by the Employee indexes, e.g. (company, status). Invalid filter
+values are rejected with HTTP 400.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import datetime
+from django.utils import timezone
+from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
+from .models import Department, Employee
+
+######################################################################
+
+
+######################################################################
+########################### F I L T E R S ############################
+######################################################################
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter that breaks ties on `id`, so cursor pages never skip or repeat rows.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and ordering[-1].lstrip("-") != "id":
+            ordering = [*ordering, "-id" if ordering[0].startswith("-") else "id"]
+        return ordering
+
+
+class FilteredListMixin:
+    """
+    Apply the view's `filter_backends` to a queryset, as GenericAPIView does.
+    """
+
+    filter_backends = [filters.DjangoFilterBackend, StableOrderingFilter]
+
+    def filter_queryset(self, queryset):
+        """
+        Filter and order a queryset with the view's filter backends.
+
+        Args:
+            queryset (QuerySet): The rows to filter.
+
+        Returns:
+            QuerySet: The filtered rows.
+
+        Raises:
+            ValidationError: If a filter value is invalid.
+        """
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+
+class EmployeeFilter(filters.FilterSet):
+    """
+    Filters of the employee list.
+
+    Query parameters:
+        status: One or more statuses (`?status=HIRED&status=NOT_ACCEPTED`).
+        company, department: The company or department name.
+        company_id, department_id: The company or department id.
+        designation: The exact designation.
+        hired_on_after, hired_on_before: Hire date range (inclusive).
+        days_employed_min, days_employed_max: Days employed range (inclusive); HIRED employees only.
+    """
+
+    status = filters.MultipleChoiceFilter(choices=Employee.stages)
+    company = filters.CharFilter(field_name="company__company_name")
+    company_id = filters.NumberFilter(field_name="company_id")
+    department = filters.CharFilter(field_name="department__department_name")
+    department_id = filters.NumberFilter(field_name="department_id")
+    designation = filters.CharFilter(field_name="designation")
+    hired_on = filters.DateFromToRangeFilter(field_name="hired_on")
+    days_employed = filters.RangeFilter(method="filter_days_employed")
+
+    class Meta:
+        model = Employee
+        fields = []
+
+    def filter_days_employed(self, queryset, name, value):
+        """
+        Turn a days employed range into a hire date range, so it can use the (status, hired_on) index.
+
+        Args:
+            queryset (QuerySet): The employees.
+            name (str): The filter name.
+            value (slice): The range, with `start` and/or `stop` set.
+
+        Returns:
+            QuerySet: The HIRED employees within the range.
+        """
+        today = timezone.now().date()  # UTC, like DaysSince on SQLite
+        queryset = queryset.filter(status="HIRED", hired_on__isnull=False)
+        if value.start is not None:
+            queryset = queryset.filter(
+                hired_on__lte=today - datetime.timedelta(days=int(value.start))
+            )
+        if value.stop is not None:
+            queryset = queryset.filter(
+                hired_on__gte=today - datetime.timedelta(days=int(value.stop))
+            )
+        return queryset
+
+
+class DepartmentFilter(filters.FilterSet):
+    """
+    Filters of the department list.
+
+    Query parameters:
+        company: The company name.
+        company_id: The company id.
+        no_of_employees_min, no_of_employees_max: Employee count range (inclusive).
+    """
+
+    company = filters.CharFilter(field_name="company__company_name")
+    company_id = filters.NumberFilter(field_name="company_id")
+    no_of_employees = filters.RangeFilter(field_name="no_of_employees")
+
+    class Meta:
+        model = Department
+        fields = []
+
+
+######################################################################
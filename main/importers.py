@@ -0,0 +1,292 @@
+"""
+Bulk import of Employee rows from CSV or JSON Lines input.
+
+The input is streamed and processed in chunks. Company and department names are
+resolved once per chunk into an in-memory map, each row is validated on its own
+so errors can be reported per row, valid rows are inserted with `bulk_create`
+(no per-row signals), and the Company/Department counters are recomputed once
+per affected parent at the end instead.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import csv
+import json
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from .cache import bump_versions
+from .counters import recount_employees
+from .models import Company, Department, Employee
+
+######################################################################
+
+
+######################################################################
+######################### I M P O R T E R ############################
+######################################################################
+
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_FIELDS = [
+    "company",
+    "department",
+    "status",
+    "name",
+    "email",
+    "mobile_number",
+    "address",
+    "designation",
+    "hired_on",
+]
+# Rows per INSERT statement.
+BATCH_SIZE = 500
+
+
+def read_rows(lines, input_format):
+    """
+    Lazily parse the input into one dict per row.
+
+    Args:
+        lines (iterable): The input, one line per item, as bytes or str.
+        input_format (str): Either "csv" (with a header row) or "jsonl".
+
+    Yields:
+        dict | Exception: The parsed row, or the error if the line could not be
+        parsed or one of its `IMPORT_FIELDS` is not a string (or null).
+    """
+    lines = (
+        line.decode("utf-8-sig") if isinstance(line, bytes) else line for line in lines
+    )
+    if input_format == "csv":
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield error
+            continue
+        if not isinstance(row, dict):
+            yield ValueError("Expected a JSON object.")
+            continue
+        invalid = {
+            field: ["Expected a string."]
+            for field in IMPORT_FIELDS
+            if row.get(field) is not None and not isinstance(row[field], str)
+        }
+        yield ValidationError(invalid) if invalid else row
+
+
+class EmployeeImporter:
+    """
+    Import Employees in chunks and collect a per-row report.
+
+    Attributes:
+        created (int): Number of rows inserted.
+        errors (list): One `{"row": n, "errors": {...}}` entry per rejected row.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.errors = []
+        self.companies = {}
+        self.departments = {}
+        self.company_ids = set()
+        self.department_ids = set()
+
+    def run(self, rows):
+        """
+        Import every row, then recount the counters of the touched parents.
+
+        Args:
+            rows (iterable): Parsed rows as returned by `read_rows`.
+
+        Returns:
+            dict: The import report.
+        """
+        rows = iter(rows)
+        row_number = 0
+        try:
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                self.import_chunk(chunk, first_row=row_number + 1)
+                row_number += len(chunk)
+        finally:
+            with transaction.atomic():
+                recount_employees(self.company_ids, self.department_ids)
+                if self.created:
+                    bump_versions("employee", "department", "company")
+        return self.report()
+
+    def report(self):
+        """
+        Summarize the import.
+
+        Returns:
+            dict: Counts of created and failed rows plus the per-row errors.
+        """
+        return {
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def resolve_names(self, chunk):
+        """
+        Load the companies and departments named in the chunk that are not mapped yet.
+
+        Args:
+            chunk (list): The parsed rows of the chunk.
+        """
+        rows = [row for row in chunk if isinstance(row, dict)]
+        company_names = {row.get("company") for row in rows} - set(self.companies)
+        department_names = {row.get("department") for row in rows} - set(
+            self.departments
+        )
+        if company_names:
+            self.companies.update(
+                Company.objects.filter(company_name__in=company_names).values_list(
+                    "company_name", "id"
+                )
+            )
+        if department_names:
+            for name, pk, company_id in Department.objects.filter(
+                department_name__in=department_names
+            ).values_list("department_name", "id", "company_id"):
+                self.departments[name] = (pk, company_id)
+
+    def build_employee(self, row):
+        """
+        Validate a row and build the matching unsaved Employee.
+
+        Columns other than `IMPORT_FIELDS` (such as `id` in an export) are ignored.
+
+        Args:
+            row (dict): The parsed row.
+
+        Returns:
+            Employee: The validated Employee.
+
+        Raises:
+            ValidationError: If the row is invalid.
+        """
+        errors = {}
+        company_id = self.companies.get(row.get("company"))
+        if company_id is None:
+            errors["company"] = ["Unknown company."]
+        department_id, department_company_id = self.departments.get(
+            row.get("department"), (None, None)
+        )
+        if department_id is None:
+            errors["department"] = ["Unknown department."]
+        elif company_id is not None and department_company_id != company_id:
+            errors["department"] = [
+                "The department does not belong to the given company."
+            ]
+
+        employee = Employee(
+            company_id=company_id,
+            department_id=department_id,
+            **{
+                field: row.get(field) or ("" if field != "hired_on" else None)
+                for field in IMPORT_FIELDS[2:]
+            },
+        )
+        try:
+            employee.full_clean(
+                exclude=["company", "department", "days_employed"],
+                validate_unique=False,
+            )
+        except ValidationError as error:
+            for field, messages in error.message_dict.items():
+                field = "non_field_errors" if field == "__all__" else field
+                errors.setdefault(field, []).extend(messages)
+        if "hired_on" not in errors:
+            employee.days_employed = employee.calculate_days_employed()
+            if employee.days_employed is not None and employee.days_employed < 0:
+                errors["hired_on"] = ["The hire date cannot be in the future."]
+        if errors:
+            raise ValidationError(errors)
+        return employee
+
+    def import_chunk(self, chunk, first_row):
+        """
+        Validate and insert one chunk of rows in a single transaction.
+
+        Args:
+            chunk (list): The parsed rows of the chunk.
+            first_row (int): The 1-based row number of the first row in the chunk.
+        """
+        self.resolve_names(chunk)
+        emails = {row.get("email") for row in chunk if isinstance(row, dict)}
+        taken = set(
+            Employee.objects.filter(email__in=emails).values_list("email", flat=True)
+        )
+
+        employees, rows = [], []
+        for row_number, row in enumerate(chunk, start=first_row):
+            if isinstance(row, ValidationError):
+                self.errors.append({"row": row_number, "errors": row.message_dict})
+                continue
+            if isinstance(row, Exception):
+                self.errors.append(
+                    {"row": row_number, "errors": {"non_field_errors": [str(row)]}}
+                )
+                continue
+            try:
+                employee = self.build_employee(row)
+                if employee.email in taken:
+                    raise ValidationError(
+                        {"email": ["Employee with this Email already exists."]}
+                    )
+            except ValidationError as error:
+                self.errors.append({"row": row_number, "errors": error.message_dict})
+                continue
+            taken.add(employee.email)
+            employees.append(employee)
+            rows.append(row_number)
+
+        if not employees:
+            return
+        try:
+            with transaction.atomic():
+                Employee.objects.bulk_create(employees, batch_size=BATCH_SIZE)
+        except IntegrityError as error:
+            # Every row was validated above, including the computed
+            # days_employed, so only a concurrent writer taking one of the
+            # emails gets here; reject the whole chunk.
+            self.errors.extend(
+                {"row": row_number, "errors": {"non_field_errors": [str(error)]}}
+                for row_number in rows
+            )
+            return
+        self.created += len(employees)
+        self.company_ids.update(employee.company_id for employee in employees)
+        self.department_ids.update(employee.department_id for employee in employees)
+
+
+def import_employees(lines, input_format="csv", chunk_size=1000):
+    """
+    Import Employees from CSV or JSON Lines input.
+
+    Args:
+        lines (iterable): The input, one line per item, as bytes or str.
+        input_format (str, optional): Either "csv" or "jsonl". Defaults to "csv".
+        chunk_size (int, optional): Number of rows validated and inserted at once. Defaults to 1000.
+
+    Returns:
+        dict: Counts of created and failed rows plus the per-row errors.
+    """
+    importer = EmployeeImporter(chunk_size=chunk_size)
+    return importer.run(read_rows(lines, input_format))
+
+
+######################################################################
@@ -0,0 +1,99 @@
+"""
+Background jobs with progress reporting.
+
+A job runs a function in a daemon thread of the worker process and stores its
+state (status, progress, result or error) in a Django cache, so any worker
+sharing the cache backend can report it. The cache alias and the time states
+are kept are set with `BACKGROUND_JOBS`; with `"EAGER": True` jobs run inline,
+e.g. in tests.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import threading
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+######################################################################
+
+
+######################################################################
+############################# J O B S ################################
+######################################################################
+
+
+def job_settings():
+    return {
+        "ALIAS": "default",
+        "TIMEOUT": 86400,
+        "EAGER": False,
+        **getattr(settings, "BACKGROUND_JOBS", {}),
+    }
+
+
+def _store(job_id, state):
+    config = job_settings()
+    caches[config["ALIAS"]].set(f"main:job:{job_id}", state, config["TIMEOUT"])
+
+
+def get_job(job_id):
+    """
+    Read the state of a job.
+
+    Args:
+        job_id (str): The job id.
+
+    Returns:
+        dict | None: The job state, or None if the job is unknown or expired.
+    """
+    return caches[job_settings()["ALIAS"]].get(f"main:job:{job_id}")
+
+
+def start_job(name, function, *args, **kwargs):
+    """
+    Run `function(*args, progress=..., **kwargs)` in the background.
+
+    The function reports its progress by calling `progress(done, total)`; its
+    return value is stored as the job result.
+
+    Args:
+        name (str): The job name, e.g. "delete_company".
+        function (callable): The function to run.
+        *args: Positional arguments of the function.
+        **kwargs: Keyword arguments of the function.
+
+    Returns:
+        str: The job id.
+    """
+    job_id = uuid.uuid4().hex
+    state = {"id": job_id, "name": name, "status": "pending", "done": 0, "total": None}
+    _store(job_id, state)
+
+    def progress(done, total):
+        state.update(status="running", done=done, total=total)
+        _store(job_id, state)
+
+    def run():
+        try:
+            state["result"] = function(*args, progress=progress, **kwargs)
+            state["status"] = "succeeded"
+        except Exception as error:
+            state.update(status="failed", error=str(error))
+        finally:
+            _store(job_id, state)
+            if not job_settings()["EAGER"]:
+                connections.close_all()  # The thread's own connections.
+
+    if job_settings()["EAGER"]:
+        run()
+    else:
+        threading.Thread(target=run, name=f"job-{job_id}", daemon=True).start()
+    return job_id
+
+
+######################################################################
@@ -0,0 +1,199 @@
+"""
+Management command for benchmarking every `main/` endpoint and the signal paths.
+
+Creates a throwaway database (a temporary file, migrated like a test
+database), seeds it with a deterministic dataset, then drives every route of
+`main/urls.py` in-process through the test client, plus the Employee save and
+delete signal paths through the ORM. Reports ops/sec, p50/p95/p99 latency and
+queries per operation, and writes the results as JSON for comparing runs
+across releases. See `main.benchmark`.
+
+Usage:
+    python manage.py bench
+    python manage.py bench --companies 50 --employees 200 --iterations 500
+    python manage.py bench --only employee --output after.json --compare before.json
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import json
+import os
+import platform
+import tempfile
+import time
+import django
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import get_resolver
+from django.utils import timezone
+from main.benchmark import OPERATIONS, BenchmarkContext, run_operation
+from main.seeding import seed_dataset
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every main/ endpoint in-process against a throwaway seeded database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=10)
+        parser.add_argument(
+            "--departments",
+            type=int,
+            default=5,
+            help="Average departments per company.",
+        )
+        parser.add_argument(
+            "--employees",
+            type=int,
+            default=100,
+            help="Average employees per department.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            default=[],
+            help="Only run the operations whose name contains one of these words.",
+        )
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Clear the response cache before every request.",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--compare", help="Print the ops/sec change against a previous JSON file."
+        )
+
+    def handle(self, *args, **options):
+        operations = [
+            operation
+            for operation in OPERATIONS
+            if not options["only"]
+            or any(word in operation.name for word in options["only"])
+        ]
+        if not operations:
+            raise CommandError("No operation matches --only.")
+        previous = {}
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                previous = {row["name"]: row for row in json.load(file)["results"]}
+
+        directory = tempfile.mkdtemp(prefix="bench-")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(
+            directory, "bench.sqlite3"
+        )
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            started = time.perf_counter()
+            departments = options["companies"] * options["departments"]
+            dataset = seed_dataset(
+                options["companies"],
+                departments,
+                departments * options["employees"],
+                seed=options["seed"],
+            )
+            self.stdout.write(
+                f"Seeded {dataset['companies']} companies, {dataset['departments']} "
+                f"departments and {dataset['employees']} employees in "
+                f"{time.perf_counter() - started:.2f}s."
+            )
+            for cache in caches.all():
+                cache.clear()
+            context = BenchmarkContext()
+            results = self.run(operations, context, options, previous)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            os.rmdir(directory)
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(
+                    {
+                        "created_at": timezone.now().isoformat(),
+                        "python": platform.python_version(),
+                        "django": django.get_version(),
+                        "database": connection.vendor,
+                        "sqlite": getattr(connection.Database, "sqlite_version", None),
+                        "dataset": dataset,
+                        "options": {
+                            name: options[name]
+                            for name in ("seed", "iterations", "warmup", "cold")
+                        },
+                        "results": results,
+                    },
+                    file,
+                    indent=2,
+                )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+    def run(self, operations, context, options, previous):
+        """
+        Run the operations and print a line per operation.
+
+        Returns:
+            list: The result dicts of `run_operation`.
+        """
+        self.check_coverage()
+        self.stdout.write(
+            f"{'operation':<26} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'queries':>8} {'errors':>6}"
+            + (f" {'vs prev':>8}" if previous else "")
+        )
+        results = []
+        for operation in operations:
+            result = run_operation(
+                operation,
+                context,
+                options["iterations"],
+                options["warmup"],
+                cold=options["cold"],
+            )
+            results.append(result)
+            line = (
+                f"{result['name']:<26} {result['ops_per_sec']:>9.1f} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                f"{result['p99_ms']:>8.2f} {result['queries']:>8.1f} "
+                f"{result['errors']:>6}"
+            )
+            before = previous.get(result["name"])
+            if before and before["ops_per_sec"]:
+                change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+                line += f" {change:>+8.1%}"
+            self.stdout.write(line)
+            self.stdout.flush()
+        return results
+
+    def check_coverage(self):
+        """
+        Warn about the routes of main/urls.py that no operation covers.
+        """
+        routes = {
+            name
+            for name in get_resolver("main.urls").reverse_dict
+            if isinstance(name, str)
+        }
+        missing = routes - {operation.route for operation in OPERATIONS}
+        if missing:
+            self.stderr.write(
+                self.style.WARNING(f"No operation for: {', '.join(sorted(missing))}")
+            )
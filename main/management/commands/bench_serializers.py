@@ -0,0 +1,139 @@
+"""
+Management command for benchmarking the list serialization paths.
+
+Creates throwaway Companies, Departments and Employees inside a transaction
+that is rolled back at the end, then serializes and renders them as the list
+endpoints do, once with the ModelSerializers and once with
+`ValuesListSerializer`, and reports rows/sec for both. The two renderings are
+compared byte for byte.
+
+Usage:
+    python manage.py bench_serializers
+    python manage.py bench_serializers --rows 20000 --repeat 5
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from main.fast_serializers import ValuesListSerializer
+from main.models import Company, Department, Employee
+from main.serializers import (
+    CompanySerializer,
+    DepartmentSerializer,
+    EmployeeSerializer,
+)
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+def create_rows(rows):
+    """
+    Bulk create `rows` Companies, Departments and Employees.
+
+    Args:
+        rows (int): Number of rows per model.
+
+    Returns:
+        dict: The benchmarked querysets, keyed by serializer class.
+    """
+    companies = Company.objects.bulk_create(
+        Company(company_name=f"Bench Company {i}") for i in range(rows)
+    )
+    departments = Department.objects.bulk_create(
+        Department(company=companies[i], department_name=f"Bench Company {i}_Dept")
+        for i in range(rows)
+    )
+    employees = Employee.objects.bulk_create(
+        Employee(
+            company=companies[i],
+            department=departments[i],
+            status="HIRED",
+            name=f"Bench Employee {i}",
+            email=f"bench{i}@example.com",
+            mobile_number="+123456789",
+            address="Street 1",
+            designation="Engineer",
+            hired_on=date(2024, 1, 1),
+        )
+        for i in range(rows)
+    )
+    return {
+        CompanySerializer: Company.objects.filter(pk__in=[c.pk for c in companies]),
+        DepartmentSerializer: Department.objects.select_related("company").filter(
+            pk__gte=departments[0].pk
+        ),
+        EmployeeSerializer: Employee.objects.select_related("company", "department")
+        .with_days_employed()
+        .filter(pk__gte=employees[0].pk),
+    }
+
+
+def best_time(function, repeat):
+    """
+    Run a function several times.
+
+    Args:
+        function (callable): The function to time.
+        repeat (int): Number of runs.
+
+    Returns:
+        tuple: The fastest run in seconds and the last result.
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of the ModelSerializer and values_list() list serialization paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        renderer = JSONRenderer()
+
+        self.stdout.write(
+            f"{'serializer':>20} {'model rows/s':>13} {'values rows/s':>14} {'speedup':>8}"
+        )
+        with transaction.atomic():
+            for serializer_class, queryset in create_rows(rows).items():
+                queryset = queryset.order_by("id")
+                values = ValuesListSerializer(serializer_class)
+
+                def model_path():
+                    return renderer.render(serializer_class(queryset, many=True).data)
+
+                def values_path():
+                    return renderer.render(
+                        values.serialize(values.queryset(queryset.all()))
+                    )
+
+                model_seconds, expected = best_time(model_path, repeat)
+                values_seconds, output = best_time(values_path, repeat)
+                if output != expected:
+                    raise CommandError(
+                        f"{serializer_class.__name__}: the outputs differ."
+                    )
+                self.stdout.write(
+                    f"{serializer_class.__name__:>20} {rows / model_seconds:>13.0f} "
+                    f"{rows / values_seconds:>14.0f} {model_seconds / values_seconds:>7.1f}x"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,57 @@
+"""
+Management command for deleting a large Company (or Department) in chunks.
+
+Deletes the Employees in chunks, one transaction per chunk, printing the
+progress, then the Company with its Departments. See `main.deletion`.
+
+Usage:
+    python manage.py delete_company 42
+    python manage.py delete_company 7 --department --chunk-size 5000
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import time
+from django.core.management.base import BaseCommand, CommandError
+from main.deletion import delete_company, delete_department
+from main.models import Company, Department
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+class Command(BaseCommand):
+    help = "Delete a Company (or Department) and its employees in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("id", type=int)
+        parser.add_argument(
+            "--department",
+            action="store_true",
+            help="Delete the Department with this id instead of a Company.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def progress(self, done, total):
+        self.stdout.write(f"Deleted {done}/{total} employees")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        delete = delete_department if options["department"] else delete_company
+        try:
+            deleted = delete(
+                options["id"], options["chunk_size"], progress=self.progress
+            )
+        except (Company.DoesNotExist, Department.DoesNotExist) as error:
+            raise CommandError(str(error))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} employees in {elapsed:.2f}s.")
+        )
@@ -0,0 +1,77 @@
+"""
+Management command for importing Employees in bulk from a CSV or JSON Lines file.
+
+Usage:
+    python manage.py import_employees employees.csv
+    python manage.py import_employees employees.jsonl --chunk-size 5000
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import time
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from main.importers import IMPORT_FORMATS, import_employees
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+class Command(BaseCommand):
+    help = "Import Employees in bulk from a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the CSV or JSON Lines file.")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows validated and inserted per transaction.",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=20,
+            help="Number of row errors to print.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        input_format = options["format"] or {"ndjson": "jsonl"}.get(
+            path.suffix.lstrip(".").lower(), path.suffix.lstrip(".").lower()
+        )
+        if input_format not in IMPORT_FORMATS:
+            raise CommandError(
+                f"Cannot tell the format of {path}; pass --format {'|'.join(IMPORT_FORMATS)}."
+            )
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist.")
+
+        started = time.perf_counter()
+        with path.open("rb") as lines:
+            report = import_employees(
+                lines, input_format, chunk_size=options["chunk_size"]
+            )
+        elapsed = time.perf_counter() - started
+
+        for error in report["errors"][: options["max_errors"]]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        rows = report["created"] + report["failed"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {report['created']} employees, {report['failed']} rows failed "
+                f"in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)."
+            )
+        )
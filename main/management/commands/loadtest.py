@@ -0,0 +1,182 @@
+"""
+Management command for load testing a running deployment of the API.
+
+Opens N concurrent keep-alive HTTP/1.1 clients with asyncio against a URL for a
+fixed duration and reports requests/sec, p50/p99 latency and errors for each
+concurrency level, so the WSGI (gunicorn) and ASGI (uvicorn) deployments can be
+compared on the same endpoints:
+
+    gunicorn Employee_Management_System.wsgi -w 4 --threads 8 -b 127.0.0.1:8000
+    uvicorn Employee_Management_System.asgi:application --workers 4 --port 8001
+
+Usage:
+    python manage.py loadtest http://127.0.0.1:8000/main/employee/ --token KEY
+    python manage.py loadtest http://127.0.0.1:8001/main/async/employee/ --token KEY \
+        --concurrency 100 500 1000 --duration 10
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import asyncio
+import time
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+async def read_response(reader):
+    """
+    Read one HTTP/1.1 response, handling Content-Length and chunked bodies.
+
+    Args:
+        reader (StreamReader): The connection's reader.
+
+    Returns:
+        tuple: The status code and whether the connection can be reused.
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status_code = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.read()
+        return status_code, False
+    return status_code, headers.get("connection") != "close"
+
+
+async def client(url, request, deadline, latencies, errors):
+    """
+    Send requests on one keep-alive connection until the deadline.
+
+    Args:
+        url (SplitResult): The target URL.
+        request (bytes): The raw HTTP request.
+        deadline (float): The `perf_counter` time to stop at.
+        latencies (list): Receives the latency of every successful request, in seconds.
+        errors (list): Receives one entry per failed request.
+    """
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(
+                    url.hostname, url.port or 80
+                )
+            started = time.perf_counter()
+            writer.write(request)
+            status_code, keep_alive = await read_response(reader)
+            if status_code >= 400:
+                errors.append(status_code)
+            else:
+                latencies.append(time.perf_counter() - started)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as error:
+            errors.append(type(error).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_level(url, request, concurrency, duration):
+    """
+    Run `concurrency` clients for `duration` seconds.
+
+    Returns:
+        tuple: The latencies of the successful requests and the errors.
+    """
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *[client(url, request, deadline, latencies, errors) for _ in range(concurrency)]
+    )
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Measure requests/sec and p99 latency of a running server at several concurrency levels."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "url", help="The URL to request, e.g. http://127.0.0.1:8000/main/employee/."
+        )
+        parser.add_argument(
+            "--token", help="The API token sent in the Authorization header."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[100, 500, 1000],
+            help="The numbers of concurrent clients to test.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds per concurrency level.",
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme != "http" or not url.hostname:
+            raise CommandError("Only plain http:// URLs are supported.")
+        target = url.path or "/"
+        if url.query:
+            target += "?" + url.query
+        headers = [
+            f"GET {target} HTTP/1.1",
+            f"Host: {url.netloc}",
+            "Accept: application/json",
+            "Connection: keep-alive",
+        ]
+        if options["token"]:
+            headers.append(f"Authorization: Token {options['token']}")
+        request = ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1")
+
+        self.stdout.write(
+            f"{'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}"
+        )
+        for concurrency in options["concurrency"]:
+            latencies, errors = asyncio.run(
+                run_level(url, request, concurrency, options["duration"])
+            )
+            latencies.sort()
+            self.stdout.write(
+                f"{concurrency:>8} {len(latencies):>9} {len(errors):>7} "
+                f"{len(latencies) / options['duration']:>9.1f} "
+                f"{percentile(latencies, 0.5) * 1000:>8.1f} "
+                f"{percentile(latencies, 0.99) * 1000:>8.1f}"
+            )
@@ -0,0 +1,40 @@
+"""
+Management command for rebuilding the employee full-text search index.
+
+The index is kept in sync by database triggers, so this is only needed after
+restoring a backup, editing the database by hand or changing the tokenizer.
+
+Usage:
+    python manage.py rebuild_search_index
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import time
+from django.core.management.base import BaseCommand
+from main.models import Employee
+from main.search import rebuild_index
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+class Command(BaseCommand):
+    help = "Rebuild the employee full-text search index from the employee table."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rebuild_index()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {Employee.objects.count()} employees in {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,89 @@
+"""
+Management command for auditing and repairing the denormalized counters.
+
+Compares `Company.no_of_deps`, `Company.no_of_employees`,
+`Department.no_of_employees` and the headcounts with grouped counts of their
+children, prints every discrepancy, and recounts the discrepant parents in
+chunked UPDATEs. Each run is recorded in CountReconciliation; `--incremental` only
+checks the parents touched since the start of the last repairing run. See
+`main.reconcile`.
+
+Usage:
+    python manage.py reconcile_counts
+    python manage.py reconcile_counts --dry-run
+    python manage.py reconcile_counts --incremental --chunk-size 1000
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from main.models import CountReconciliation
+from main.reconcile import audit_counts, repair_counts
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+class Command(BaseCommand):
+    help = "Audit the Company and Department counters and repair the wrong ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the discrepancies without repairing them.",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only check the parents touched since the last repairing run.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        started, started_at = time.perf_counter(), timezone.now()
+        since = None
+        if options["incremental"]:
+            last = CountReconciliation.objects.filter(dry_run=False).first()
+            since = last.started_at if last is not None else None
+            self.stdout.write(
+                f"Checking the parents touched since {since:%Y-%m-%d %H:%M:%S}."
+                if since is not None
+                else "No previous run, checking every parent."
+            )
+
+        checked, discrepancies = audit_counts(since)
+        for discrepancy in discrepancies:
+            self.stdout.write(
+                f"{discrepancy.model} {discrepancy.pk} {discrepancy.field}: "
+                f"stored {discrepancy.stored}, actual {discrepancy.actual}"
+            )
+        fixed = 0
+        if not options["dry_run"]:
+            fixed = repair_counts(discrepancies, options["chunk_size"])
+        CountReconciliation.objects.create(
+            started_at=started_at,
+            incremental=since is not None,
+            dry_run=options["dry_run"],
+            checked=checked,
+            discrepancies=len(discrepancies),
+            fixed=fixed,
+        )
+
+        elapsed = time.perf_counter() - started
+        style = self.style.WARNING if len(discrepancies) > fixed else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f"Checked {checked} counters in {elapsed:.2f}s: "
+                f"{len(discrepancies)} discrepancies, {fixed} fixed."
+            )
+        )
@@ -0,0 +1,76 @@
+"""
+Management command for refreshing the stored `Employee.days_employed` values.
+
+The API computes days employed at query time, so this is only needed by
+consumers that read the stored column directly. Every HIRED employee is
+refreshed with one set-based UPDATE per id range, without firing any signals.
+
+Usage:
+    python manage.py refresh_days_employed
+    python manage.py refresh_days_employed --chunk-size 50000
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+from main.cache import bump_versions
+from main.models import DaysSince, Employee
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+class Command(BaseCommand):
+    help = "Refresh the stored days_employed of every HIRED employee."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Width of the id range updated per statement.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        days = DaysSince("hired_on")
+        stale = Employee.objects.filter(status="HIRED", hired_on__isnull=False).filter(
+            Q(days_employed__isnull=True) | ~Q(days_employed=days)
+        )
+        bounds = Employee.objects.aggregate(first=Min("id"), last=Max("id"))
+
+        started = time.perf_counter()
+        updated = 0
+        if bounds["first"] is not None:
+            for start in range(bounds["first"], bounds["last"] + 1, chunk_size):
+                chunk_started = time.perf_counter()
+                with transaction.atomic():
+                    count = stale.filter(
+                        id__gte=start, id__lt=start + chunk_size
+                    ).update(days_employed=days, updated_at=timezone.now())
+                    if count:
+                        bump_versions("employee")
+                updated += count
+                if options["verbosity"] > 1:
+                    self.stdout.write(
+                        f"ids {start}-{start + chunk_size - 1}: {count} rows "
+                        f"in {time.perf_counter() - chunk_started:.3f}s"
+                    )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed days_employed on {updated} employees in {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,96 @@
+"""
+Management command for generating a large synthetic dataset.
+
+Creates Companies, Departments and Employees with skewed department sizes,
+realistic status and hire date distributions, and the counters and headcounts
+set once at the end. The same arguments always produce the same data. The
+Employee rows are generated by worker processes and inserted in large chunks
+without the per-row signals. See `main.seeding`.
+
+Usage:
+    python manage.py seed --employees 1000000
+    python manage.py seed --companies 500 --departments 5000 --employees 2000000 \
+        --workers 4 --seed 42
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from main.models import Company
+from main.seeding import seed_dataset
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+
+class Command(BaseCommand):
+    help = "Generate a deterministic synthetic dataset of companies, departments and employees."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=100)
+        parser.add_argument("--departments", type=int, default=1000)
+        parser.add_argument("--employees", type=int, default=100000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help="Processes generating the employee rows.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=20000,
+            help="Number of employees generated and inserted per chunk.",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="Seed",
+            help="Prefix of the company names, to seed several datasets side by side.",
+        )
+
+    def progress(self, done, total):
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            f"Inserted {done}/{total} employees ({done / elapsed:.0f} rows/s)"
+        )
+
+    def handle(self, *args, **options):
+        if options["companies"] < 1:
+            raise CommandError("--companies must be at least 1.")
+        if Company.objects.filter(
+            company_name__startswith=f"{options['prefix']} Company "
+        ).exists():
+            raise CommandError(
+                f"Companies named '{options['prefix']} Company ...' already exist; "
+                "pass another --prefix."
+            )
+
+        self.started = time.perf_counter()
+        dataset = seed_dataset(
+            options["companies"],
+            options["departments"],
+            options["employees"],
+            seed=options["seed"],
+            prefix=options["prefix"],
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            progress=self.progress,
+        )
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {dataset['companies']} companies, {dataset['departments']} "
+                f"departments and {dataset['employees']} employees in {elapsed:.2f}s "
+                f"({dataset['employees'] / elapsed:.0f} employees/s)."
+            )
+        )
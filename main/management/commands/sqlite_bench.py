@@ -0,0 +1,160 @@
+"""
+Management command for benchmarking SQLite read/write throughput under concurrency.
+
+Runs N writer and M reader processes (like gunicorn workers) against a
+throwaway database file, once per connection profile, and reports throughput
+and "database is locked" errors:
+
+- default: Django's stock sqlite3 backend (rollback journal, deferred BEGIN).
+- tuned: `main.backends.sqlite3` with the OPTIONS of `DATABASES["default"]`
+  (WAL and pragmas, BEGIN IMMEDIATE, busy retries).
+
+Each write is a transaction that reads and then inserts, the pattern of the
+counter signals. The application database is never touched.
+
+Usage:
+    python manage.py sqlite_bench
+    python manage.py sqlite_bench --writers 8 --readers 8 --duration 10
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+######################################################################
+
+
+######################################################################
+########################## C O M M A N D #############################
+######################################################################
+
+ALIAS = "sqlite_bench"
+
+
+def get_profiles():
+    """
+    Build the compared database settings.
+
+    Returns:
+        dict: Profile names mapped to partial DATABASES entries.
+    """
+    default = settings.DATABASES["default"]
+    if default["ENGINE"] == "main.backends.sqlite3":
+        options = default.get("OPTIONS", {})
+    else:
+        options = {"timeout": 5, "transaction_mode": "IMMEDIATE", "busy_retries": 5}
+    return {
+        "default": {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {}},
+        "tuned": {"ENGINE": "main.backends.sqlite3", "OPTIONS": options},
+    }
+
+
+def run_worker(role, number, database, duration, results):
+    """
+    Write or read in a loop until the duration has passed, then report the counts.
+
+    Args:
+        role (str): Either "writer" or "reader".
+        number (int): The worker number.
+        database (dict): The DATABASES entry to connect with.
+        duration (float): Seconds to run for.
+        results (Queue): Receives `(role, operations, errors)`.
+    """
+    # configure_settings() fills in the defaults and insists on a "default" entry.
+    configured = connections.configure_settings({"default": {}, ALIAS: database})
+    connections.settings[ALIAS] = configured[ALIAS]
+    connection = connections[ALIAS]
+    operations = errors = 0
+    deadline = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                if role == "writer":
+                    with transaction.atomic(using=ALIAS), connection.cursor() as cursor:
+                        cursor.execute(
+                            "SELECT COUNT(*) FROM bench WHERE worker = %s", [number]
+                        )
+                        cursor.execute(
+                            "INSERT INTO bench (worker, value) VALUES (%s, %s)",
+                            [number, "x" * 100],
+                        )
+                else:
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            "SELECT id, worker, value FROM bench ORDER BY id DESC LIMIT 50"
+                        )
+                        cursor.fetchall()
+                operations += 1
+            except OperationalError:
+                errors += 1
+        connection.close()
+    finally:
+        results.put((role, operations, errors))
+
+
+class Command(BaseCommand):
+    help = "Compare SQLite read/write throughput of the stock and tuned backends with concurrent workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument(
+            "--duration", type=float, default=5.0, help="Seconds per profile."
+        )
+
+    def handle(self, *args, **options):
+        duration = options["duration"]
+        context = multiprocessing.get_context("fork")
+        connections.close_all()
+
+        self.stdout.write(
+            f"{'profile':>8} {'writes/s':>9} {'w errors':>9} {'reads/s':>9} {'r errors':>9}"
+        )
+        for name, profile in get_profiles().items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "bench.sqlite3")
+                with sqlite3.connect(path) as conn:
+                    conn.execute(
+                        "CREATE TABLE bench (id INTEGER PRIMARY KEY, worker INTEGER, value TEXT)"
+                    )
+                conn.close()
+
+                results = context.Queue()
+                database = {**profile, "NAME": path}
+                workers = [
+                    context.Process(
+                        target=run_worker,
+                        args=(role, number, database, duration, results),
+                    )
+                    for role, count in (
+                        ("writer", options["writers"]),
+                        ("reader", options["readers"]),
+                    )
+                    for number in range(count)
+                ]
+                for worker in workers:
+                    worker.start()
+                totals = {"writer": [0, 0], "reader": [0, 0]}
+                for _ in workers:
+                    role, operations, errors = results.get()
+                    totals[role][0] += operations
+                    totals[role][1] += errors
+                for worker in workers:
+                    worker.join()
+
+            writes, write_errors = totals["writer"]
+            reads, read_errors = totals["reader"]
+            self.stdout.write(
+                f"{name:>8} {writes / duration:>9.1f} {write_errors:>9} "
+                f"{reads / duration:>9.1f} {read_errors:>9}"
+            )
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 01:36
+
+from django.db import migrations, models
+
+
+def create_versions(apps, schema_editor):
+    CollectionVersion = apps.get_model("main", "CollectionVersion")
+    CollectionVersion.objects.bulk_create(
+        CollectionVersion(name=name) for name in ("company", "department", "employee")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0009_useraccounts_groups_useraccounts_is_superuser_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CollectionVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=32, unique=True)),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
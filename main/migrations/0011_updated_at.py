@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-18 01:38
+
+from django.db import migrations, models
+
+
+def create_user_version(apps, schema_editor):
+    CollectionVersion = apps.get_model("main", "CollectionVersion")
+    CollectionVersion.objects.get_or_create(name="user")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0010_collectionversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="collectionversion",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="company",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="department",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="employee",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="useraccounts",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(create_user_version, migrations.RunPython.noop),
+    ]
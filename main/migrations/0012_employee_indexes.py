@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0011_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["company", "status"], name="employee_company_status"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["department", "status"], name="employee_department_status"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["status", "hired_on"], name="employee_status_hired_on"
+            ),
+        ),
+    ]
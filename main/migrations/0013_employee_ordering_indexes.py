@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0012_employee_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(fields=["name"], name="employee_name"),
+        ),
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(fields=["hired_on"], name="employee_hired_on"),
+        ),
+    ]
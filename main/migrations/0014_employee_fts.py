@@ -0,0 +1,58 @@
+# Generated by Django 5.0.6 on 2026-10-18 02:05
+
+from django.db import migrations
+
+# External-content FTS5 index over the searchable Employee columns. The triggers
+# keep it in sync with every insert, update and delete, including the raw bulk
+# import and cascade deletes that bypass the model signals.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE main_employee_fts USING fts5(
+        name, email, designation, address,
+        content='main_employee', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER main_employee_fts_insert AFTER INSERT ON main_employee BEGIN
+        INSERT INTO main_employee_fts(rowid, name, email, designation, address)
+        VALUES (new.id, new.name, new.email, new.designation, new.address);
+    END
+    """,
+    """
+    CREATE TRIGGER main_employee_fts_delete AFTER DELETE ON main_employee BEGIN
+        INSERT INTO main_employee_fts(main_employee_fts, rowid, name, email, designation, address)
+        VALUES ('delete', old.id, old.name, old.email, old.designation, old.address);
+    END
+    """,
+    """
+    CREATE TRIGGER main_employee_fts_update
+    AFTER UPDATE OF name, email, designation, address ON main_employee BEGIN
+        INSERT INTO main_employee_fts(main_employee_fts, rowid, name, email, designation, address)
+        VALUES ('delete', old.id, old.name, old.email, old.designation, old.address);
+        INSERT INTO main_employee_fts(rowid, name, email, designation, address)
+        VALUES (new.id, new.name, new.email, new.designation, new.address);
+    END
+    """,
+    # bm25 column weights: name, email, designation, address.
+    "INSERT INTO main_employee_fts(main_employee_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 1.0)')",
+    "INSERT INTO main_employee_fts(main_employee_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS main_employee_fts_update",
+    "DROP TRIGGER IF EXISTS main_employee_fts_delete",
+    "DROP TRIGGER IF EXISTS main_employee_fts_insert",
+    "DROP TABLE IF EXISTS main_employee_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0013_employee_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.0.6 on 2026-10-18 02:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_headcount_summary(apps, schema_editor):
+    Employee = apps.get_model("main", "Employee")
+    HeadcountSummary = apps.get_model("main", "HeadcountSummary")
+    HeadcountSummary.objects.bulk_create(
+        HeadcountSummary(
+            company_id=row["department__company_id"],
+            department_id=row["department_id"],
+            status=row["status"],
+            count=row["count"],
+        )
+        for row in Employee.objects.order_by()
+        .values("department__company_id", "department_id", "status")
+        .annotate(count=Count("pk"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0014_employee_fts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HeadcountSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("APPLICATION_RECEIVED", "Application Received"),
+                            ("INTERVIEW_SCHEDULED", "Interview Scheduled"),
+                            ("HIRED", "Hired"),
+                            ("NOT_ACCEPTED", "Not Accepted"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="main.company"
+                    ),
+                ),
+                (
+                    "department",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="main.department",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="headcountsummary",
+            constraint=models.UniqueConstraint(
+                fields=("department", "status"), name="headcount_department_status"
+            ),
+        ),
+        migrations.RunPython(fill_headcount_summary, migrations.RunPython.noop),
+    ]
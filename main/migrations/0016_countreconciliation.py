@@ -0,0 +1,36 @@
+# Generated by Django 5.0.6 on 2026-10-18 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0015_headcount_summary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CountReconciliation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField()),
+                ("incremental", models.BooleanField(default=False)),
+                ("dry_run", models.BooleanField(default=False)),
+                ("checked", models.PositiveIntegerField(default=0)),
+                ("discrepancies", models.PositiveIntegerField(default=0)),
+                ("fixed", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-started_at"],
+            },
+        ),
+    ]
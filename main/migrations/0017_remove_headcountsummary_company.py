@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 02:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0016_countreconciliation"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="headcountsummary",
+            name="company",
+        ),
+    ]
@@ -11,7 +11,9 @@ Author: Abdelmasry
 ######################################################################
 ########################## I M P O R T S #############################
 ######################################################################
-from django.db import models
+import contextlib
+import contextvars
+from django.db import models, transaction
 from django.core.validators import MaxValueValidator, RegexValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -28,6 +30,39 @@ from django.contrib.auth.models import (
 ########################### M O D E L S ##############################
 ######################################################################
 
+# Companies and Departments being deleted in the current context, as (model, pk)
+# pairs, so the counter signals of their cascaded children can skip them.
+_deleting = contextvars.ContextVar("deleting", default=frozenset())
+
+
+@contextlib.contextmanager
+def deleting(instance):
+    """
+    Mark a Company or Department as being deleted for the duration of the block.
+
+    Args:
+        instance (Company | Department): The parent being deleted.
+    """
+    token = _deleting.set(_deleting.get() | {(type(instance), instance.pk)})
+    try:
+        yield
+    finally:
+        _deleting.reset(token)
+
+
+def is_being_deleted(model, pk):
+    """
+    Tell whether a Company or Department is being deleted in this context.
+
+    Args:
+        model (type): Company or Department.
+        pk (int): The primary key.
+
+    Returns:
+        bool: True inside the `deleting` block of that instance.
+    """
+    return (model, pk) in _deleting.get()
+
 
 class UserAccountsManager(BaseUserManager):
     def create_user(self, username, email, role, password=None):
@@ -67,12 +102,21 @@ class UserAccounts(AbstractBaseUser, PermissionsMixin):
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = UserAccountsManager()
 
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email", "role"]
 
+    def save(self, *args, **kwargs):
+        """
+        Override the save method to save the row and the version bump of its
+        signals in one transaction.
+        """
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.username
 
@@ -87,10 +131,28 @@ class Company(models.Model):
     no_of_employees = models.PositiveIntegerField(
         default=0, validators=[MaxValueValidator(9999)]
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["id"]
 
+    def save(self, *args, **kwargs):
+        """
+        Override the save method to save the row and the version bump of its
+        signals in one transaction, so no reader sees the new row with the old
+        collection version (and a stale cached response).
+        """
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Override the delete method so the counter signals of the cascaded
+        Departments and Employees skip this Company.
+        """
+        with deleting(self):
+            return super().delete(*args, **kwargs)
+
     def __str__(self) -> str:
         return self.company_name
 
@@ -105,6 +167,7 @@ class Department(models.Model):
     no_of_employees = models.PositiveIntegerField(
         default=0, validators=[MaxValueValidator(9999)]
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["company"]
@@ -123,17 +186,70 @@ class Department(models.Model):
 
     def save(self, *args, **kwargs):
         """
-        Override the save method to ensure the department name includes the company name.
+        Override the save method to ensure the department name includes the company name,
+        and to save the row and its counter updates in one transaction.
         """
         if not self.department_name.__contains__(self.company.company_name):
             self.department_name = f"{self.company.company_name}_{self.department_name}"
 
-        super().save(*args, **kwargs)
+        # Keep the counter updates done by the signals in the same transaction.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Override the delete method so the counter signals of the cascaded
+        Employees skip this Department.
+        """
+        with deleting(self):
+            return super().delete(*args, **kwargs)
 
     def __str__(self) -> str:
         return self.department_name
 
 
+class DaysSince(models.Func):
+    """
+    Number of whole days between a date expression and today (UTC).
+    """
+
+    template = "(CURRENT_DATE - %(expressions)s)"
+    output_field = models.IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(date('now')) - julianday(%(expressions)s) AS INTEGER)",
+            **extra_context,
+        )
+
+
+class EmployeeQuerySet(models.QuerySet):
+    """
+    QuerySet for the Employee model.
+    """
+
+    def with_days_employed(self):
+        """
+        Annotate each Employee with `current_days_employed`, computed in SQL from `hired_on`.
+
+        Returns:
+            QuerySet: The annotated queryset.
+        """
+        return self.annotate(
+            current_days_employed=models.Case(
+                models.When(
+                    status="HIRED",
+                    hired_on__isnull=False,
+                    then=DaysSince("hired_on"),
+                ),
+                default=None,
+                output_field=models.IntegerField(),
+            )
+        )
+
+
 class Employee(models.Model):
     """
     Model representing an employee.
@@ -147,6 +263,13 @@ class Employee(models.Model):
         ("HIRED", "Hired"),
         ("NOT_ACCEPTED", "Not Accepted"),
     ]
+    # Stages each stage can move to through a bulk transition.
+    transitions = {
+        "APPLICATION_RECEIVED": ["INTERVIEW_SCHEDULED", "NOT_ACCEPTED"],
+        "INTERVIEW_SCHEDULED": ["HIRED", "NOT_ACCEPTED"],
+        "HIRED": [],
+        "NOT_ACCEPTED": [],
+    }
     status = models.CharField(max_length=20, choices=stages)
     name = models.CharField(max_length=64, null=False)
     email = models.CharField(max_length=64, unique=True, null=False)
@@ -166,10 +289,30 @@ class Employee(models.Model):
     hired_on = models.DateField(null=True, blank=True)  # Only if hired
     days_employed = models.PositiveIntegerField(
         null=True, blank=True
-    )  # Field to store calculated value
+    )  # Field to store calculated value, see EmployeeQuerySet.with_days_employed
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EmployeeQuerySet.as_manager()
+
+    # Fields the counters and headcounts depend on, see signals.py.
+    COUNTER_FIELDS = ("company_id", "department_id", "status")
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            # Counters and per-company/department listings filtered by status.
+            models.Index(fields=["company", "status"], name="employee_company_status"),
+            models.Index(
+                fields=["department", "status"], name="employee_department_status"
+            ),
+            # Reporting and days_employed refreshes: HIRED employees by hire date.
+            models.Index(
+                fields=["status", "hired_on"], name="employee_status_hired_on"
+            ),
+            # Whitelisted list orderings; SQLite breaks ties on the rowid (id).
+            models.Index(fields=["name"], name="employee_name"),
+            models.Index(fields=["hired_on"], name="employee_hired_on"),
+        ]
 
     def clean(self):
         """
@@ -180,15 +323,196 @@ class Employee(models.Model):
                 "A hire date must be provided if the status is 'Hired'."
             )
 
-    def save(self, *args, **kwargs):
+    def calculate_days_employed(self):
         """
-        Override the save method to calculate days employed if status is "HIRED".
+        Calculate the number of days since the hire date if status is "HIRED".
+
+        Returns:
+            int | None: The number of days employed, or None if not hired.
         """
         if self.status == "HIRED" and self.hired_on:
-            self.days_employed = (timezone.now().date() - self.hired_on).days
+            return (timezone.now().date() - self.hired_on).days
+        return None
+
+    def save(self, *args, **kwargs):
+        """
+        Override the save method to calculate days employed if status is "HIRED",
+        and to save the row and its counter updates in one transaction.
+
+        With `update_fields`, `updated_at` is always written, and `days_employed`
+        is recalculated and written when `status` or `hired_on` changes.
+        """
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.days_employed = self.calculate_days_employed()
         else:
-            self.days_employed = None
-        super().save(*args, **kwargs)
+            update_fields = {*update_fields, "updated_at"}
+            if update_fields & {"status", "hired_on"}:
+                self.days_employed = self.calculate_days_employed()
+                update_fields.add("days_employed")
+            kwargs["update_fields"] = update_fields
+
+        # Keep the counter updates done by the signals in the same transaction.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+        self.remember_values(kwargs.get("update_fields"))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the loaded field values, so changes are detected without a query.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self.remember_values(fields)
+
+    def remember_values(self, fields=None):
+        """
+        Record the current values of the given fields as their stored values.
+
+        Args:
+            fields (iterable, optional): Field names or attnames. Defaults to every
+                loaded field.
+        """
+        deferred = self.get_deferred_fields()
+        loaded = getattr(self, "_loaded_values", {})
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            if fields is None or field.name in fields or field.attname in fields:
+                loaded[field.attname] = getattr(self, field.attname)
+        self._loaded_values = loaded
+
+    def loaded_values(self, *attnames):
+        """
+        Return the values the given fields had when loaded or last saved.
+
+        Args:
+            *attnames (str): The field attnames, e.g. "company_id".
+
+        Returns:
+            tuple | None: The values, or None if one of the fields was never
+            loaded (deferred, or the instance was built in memory).
+        """
+        loaded = getattr(self, "_loaded_values", {})
+        if not all(attname in loaded for attname in attnames):
+            return None
+        return tuple(loaded[attname] for attname in attnames)
+
+    def changed_fields(self):
+        """
+        Return the loaded fields whose value changed in memory since they were loaded or saved.
+
+        Returns:
+            set: The field names.
+        """
+        loaded = getattr(self, "_loaded_values", {})
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if field.attname in loaded
+            and getattr(self, field.attname) != loaded[field.attname]
+        }
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """
+        Make the UPDATE conditional on the counter fields still holding their loaded values.
+
+        The counter signals compare the new values with the loaded ones (see
+        `handle_employee_pre_save`). If another writer changed the row since this
+        instance was loaded, the conditional UPDATE matches nothing: the stored
+        values are read for the signals instead and the row is updated
+        unconditionally.
+        """
+        expected, self._expected_counters = (
+            getattr(self, "_expected_counters", None),
+            None,
+        )
+        if expected is not None:
+            if super()._do_update(
+                base_qs.filter(**expected),
+                using,
+                pk_val,
+                values,
+                update_fields,
+                forced_update,
+            ):
+                return True
+            self._previous_counters = (
+                base_qs.filter(pk=pk_val).values_list(*self.COUNTER_FIELDS).first()
+            )
+        return super()._do_update(
+            base_qs, using, pk_val, values, update_fields, forced_update
+        )
+
+
+class HeadcountSummary(models.Model):
+    """
+    Model holding the number of Employees per department and status stage.
+
+    Maintained incrementally in the same transaction as every Employee write (see
+    `counters.adjust_headcount`), so headcount pivots are read from at most
+    departments x stages rows instead of the Employee table. The company of a
+    row is the current company of its department.
+    """
+
+    department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=Employee.stages)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["department", "status"], name="headcount_department_status"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.department_id}/{self.status}: {self.count}"
+
+
+class CountReconciliation(models.Model):
+    """
+    Model recording a run of the `reconcile_counts` command.
+
+    The start time of the last run bounds the parents an incremental run checks.
+    """
+
+    started_at = models.DateTimeField()
+    incremental = models.BooleanField(default=False)
+    dry_run = models.BooleanField(default=False)
+    checked = models.PositiveIntegerField(default=0)
+    discrepancies = models.PositiveIntegerField(default=0)
+    fixed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.started_at:%Y-%m-%d %H:%M:%S}: {self.discrepancies} discrepancies"
+        )
+
+
+class CollectionVersion(models.Model):
+    """
+    Model holding a version token per collection (Company, Department, Employee).
+
+    The token is replaced in the same transaction as every write to the
+    collection, so caches keyed on it never serve data older than the last
+    committed write.
+    """
+
+    name = models.CharField(max_length=32, unique=True, null=False)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name}@{self.version}"
 
 
 ######################################################################
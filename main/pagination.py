@@ -0,0 +1,275 @@
+"""
+Pagination classes for the list endpoints of the application.
+
+This module includes a keyset (cursor) paginator keyed on the primary key,
+which matches the default ordering of the models and keeps pages stable
+while rows are being inserted concurrently, and a page-number paginator for
+ranked search results.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    _positive_int,
+    _reverse_ordering,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+######################################################################
+
+
+######################################################################
+###################### P A G I N A T I O N ###########################
+######################################################################
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by `id`.
+
+    The next/previous links carry an opaque base64 cursor holding the last
+    seen `id`, so each page is a single `WHERE id > ? ORDER BY id LIMIT n`
+    query instead of an ever growing OFFSET. The page size defaults to
+    `REST_FRAMEWORK["PAGE_SIZE"]` and can be set by the client with
+    `?page_size=`, capped at `max_page_size`.
+
+    The page query and the page bookkeeping are split (`page_queryset` and
+    `set_page`) so async views can run the query with the async ORM through
+    `apaginate_queryset`.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        Build the query of the requested page, plus one row to detect a following page.
+
+        Args:
+            queryset (QuerySet): The rows to paginate.
+            request (Request): The HTTP request.
+            view (APIView, optional): The view being paginated. Defaults to None.
+
+        Returns:
+            QuerySet: The sliced page query, or None if pagination is disabled.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if str(current_position) != "None":  # Positions of NULL rows are "None".
+            order = self.ordering[0]
+            is_reversed = order.startswith("-")
+            order_attr = order.lstrip("-")
+            lookup = "__lt" if reverse != is_reversed else "__gt"
+            filter_query = Q(**{order_attr + lookup: current_position})
+            if reverse or is_reversed:
+                filter_query |= Q(**{order_attr + "__isnull": True})
+            queryset = queryset.filter(filter_query)
+
+        return queryset[offset : offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Record the fetched page and the positions of the next and previous pages.
+
+        Args:
+            results (list): The rows returned by the `page_queryset` query.
+
+        Returns:
+            list: The rows of the page.
+        """
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        self.page = list(results[: self.page_size])
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Fetch the requested page with the async ORM.
+
+        Args:
+            queryset (QuerySet): The rows to paginate.
+            request (Request): The HTTP request.
+            view (View, optional): The view being paginated. Defaults to None.
+
+        Returns:
+            list: The rows of the page, or None if pagination is disabled.
+        """
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor and, when paginating by id, reject positions that are not valid ids.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Returns:
+            Cursor: The decoded cursor, or None if no cursor was given.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        cursor = super().decode_cursor(request)
+        ordered_by_id = self.ordering[0].lstrip("-") in ("id", "pk")
+        if ordered_by_id and cursor is not None and cursor.position is not None:
+            if not cursor.position.isdigit():
+                raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def get_paginated_response(self, data, key="results"):
+        """
+        Build the paginated response in the shape used by the list endpoints.
+
+        Args:
+            data (list): The serialized page.
+            key (str, optional): The key holding the page in the response body. Defaults to "results".
+
+        Returns:
+            Response: HTTP response containing the page and the next/previous links.
+        """
+        return Response(
+            {
+                "status": "success",
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                key: data,
+            },
+            status=200,
+        )
+
+
+class RankedPagination(BasePagination):
+    """
+    Page-number pagination for ranked results, which have no stable cursor position.
+
+    Pages are fetched with LIMIT/OFFSET plus one extra row to detect a next page,
+    so no COUNT of all the results is ever run.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_query_param = "page"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate(self, fetch, request):
+        """
+        Fetch the requested page.
+
+        Args:
+            fetch (callable): Called with `(offset, limit)`, returns the rows.
+            request (Request): The HTTP request.
+
+        Returns:
+            list: The rows of the page.
+
+        Raises:
+            NotFound: If the page number is invalid.
+        """
+        self.request = request
+        try:
+            self.page_size = _positive_int(
+                request.query_params.get(self.page_size_query_param, self.page_size),
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+            self.page_number = _positive_int(
+                request.query_params.get(self.page_query_param, 1), strict=True
+            )
+        except ValueError:
+            raise NotFound("Invalid page.")
+        rows = fetch((self.page_number - 1) * self.page_size, self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        return rows[: self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data, key="results"):
+        return Response(
+            {
+                "status": "success",
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                key: data,
+            },
+            status=200,
+        )
+
+
+######################################################################
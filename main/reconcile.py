@@ -0,0 +1,198 @@
+"""
+Audit and repair of the denormalized counters.
+
+The true values of `Company.no_of_deps`, `Company.no_of_employees`,
+`Department.no_of_employees` and the HeadcountSummary rows are computed with
+one grouped aggregate query per counter and compared with the stored values.
+The discrepant counters are repaired with set-based recounts of their parents
+(`UPDATE ... SET col = (SELECT COUNT(*) ...)`) in chunks of ids, so the value
+written is counted when it is written: an Employee created or deleted since
+the audit is not overwritten by a stale count.
+
+An incremental audit only checks the parents written since a given time: the
+Companies and Departments whose own row, or one of whose children, has a
+newer `updated_at`. The counter helpers set `updated_at` on every change.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+from collections import namedtuple
+from django.db import transaction
+from django.db.models import Count, Q
+from .cache import bump_versions
+from .counters import recount_departments, recount_employees, recount_headcounts
+from .models import Company, Department, Employee, HeadcountSummary
+
+######################################################################
+
+
+######################################################################
+###################### R E C O N C I L E #############################
+######################################################################
+
+Discrepancy = namedtuple("Discrepancy", ["model", "pk", "field", "stored", "actual"])
+
+
+def touched_since(since):
+    """
+    Find the parents that may have changed since a given time.
+
+    Args:
+        since (datetime): The start of the window.
+
+    Returns:
+        tuple: Subqueries of the touched Company and Department ids.
+    """
+    employees = Employee.objects.filter(updated_at__gte=since)
+    departments = Department.objects.filter(
+        Q(updated_at__gte=since) | Q(pk__in=employees.values("department_id"))
+    ).values("pk")
+    companies = Company.objects.filter(
+        Q(updated_at__gte=since)
+        | Q(pk__in=employees.values("company_id"))
+        | Q(
+            pk__in=Department.objects.filter(updated_at__gte=since).values("company_id")
+        )
+    ).values("pk")
+    return companies, departments
+
+
+def _grouped_counts(queryset, field):
+    """
+    Count the rows of a queryset per value of a field, in one GROUP BY query.
+
+    Args:
+        queryset (QuerySet): The rows to count.
+        field (str): The field to group by.
+
+    Returns:
+        dict: Field values mapped to their row counts.
+    """
+    return dict(
+        queryset.order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values_list(field, "count")
+    )
+
+
+def audit_counts(since=None):
+    """
+    Compare the stored counters with the true counts.
+
+    Args:
+        since (datetime, optional): Only check the parents touched since then.
+            Defaults to checking every parent.
+
+    Returns:
+        tuple: The number of checked counters and the list of Discrepancy tuples.
+    """
+    companies, departments = Company.objects.all(), Department.objects.all()
+    if since is not None:
+        company_ids, department_ids = touched_since(since)
+        companies = companies.filter(pk__in=company_ids)
+        departments = departments.filter(pk__in=department_ids)
+
+    employees_per_department = _grouped_counts(
+        Employee.objects.filter(department__in=departments.values("pk")),
+        "department_id",
+    )
+    employees_per_company = _grouped_counts(
+        Employee.objects.filter(company__in=companies.values("pk")), "company_id"
+    )
+    departments_per_company = _grouped_counts(
+        Department.objects.filter(company__in=companies.values("pk")), "company_id"
+    )
+    headcounts = {
+        (department_id, status): count
+        for department_id, status, count in Employee.objects.filter(
+            department__in=departments.values("pk")
+        )
+        .order_by()
+        .values("department_id", "status")
+        .annotate(count=Count("pk"))
+        .values_list("department_id", "status", "count")
+    }
+    stored_headcounts = {
+        (department_id, status): count
+        for department_id, status, count in HeadcountSummary.objects.filter(
+            department__in=departments.values("pk"), count__gt=0
+        ).values_list("department_id", "status", "count")
+    }
+
+    checked, found = 0, []
+    for pk, no_of_employees in departments.order_by().values_list(
+        "pk", "no_of_employees"
+    ):
+        checked += 1
+        actual = employees_per_department.get(pk, 0)
+        if no_of_employees != actual:
+            found.append(
+                Discrepancy(
+                    "department", pk, "no_of_employees", no_of_employees, actual
+                )
+            )
+    for pk, no_of_deps, no_of_employees in companies.order_by().values_list(
+        "pk", "no_of_deps", "no_of_employees"
+    ):
+        checked += 2
+        actual = departments_per_company.get(pk, 0)
+        if no_of_deps != actual:
+            found.append(Discrepancy("company", pk, "no_of_deps", no_of_deps, actual))
+        actual = employees_per_company.get(pk, 0)
+        if no_of_employees != actual:
+            found.append(
+                Discrepancy("company", pk, "no_of_employees", no_of_employees, actual)
+            )
+    checked += len(headcounts.keys() | stored_headcounts.keys())
+    for department_id, status in sorted(headcounts.keys() | stored_headcounts.keys()):
+        stored = stored_headcounts.get((department_id, status), 0)
+        actual = headcounts.get((department_id, status), 0)
+        if stored != actual:
+            found.append(
+                Discrepancy("headcount", department_id, status, stored, actual)
+            )
+    return checked, found
+
+
+def repair_counts(discrepancies, chunk_size=500):
+    """
+    Recount the parents of the given discrepancies.
+
+    The counters are recomputed from the child tables by the UPDATEs
+    themselves rather than set to the audited values, which may be stale by
+    the time of the repair.
+
+    Args:
+        discrepancies (list): Discrepancy tuples as returned by `audit_counts`.
+        chunk_size (int, optional): Number of parents per UPDATE. Defaults to 500.
+
+    Returns:
+        int: The number of repaired counters.
+    """
+    recounts = {
+        ("department", "no_of_employees"): lambda ids: recount_employees(
+            department_ids=ids
+        ),
+        ("company", "no_of_employees"): lambda ids: recount_employees(company_ids=ids),
+        ("company", "no_of_deps"): recount_departments,
+    }
+    with transaction.atomic():
+        for (model, field), recount in recounts.items():
+            ids = sorted(
+                {d.pk for d in discrepancies if (d.model, d.field) == (model, field)}
+            )
+            for start in range(0, len(ids), chunk_size):
+                recount(ids[start : start + chunk_size])
+        ids = sorted({d.pk for d in discrepancies if d.model == "headcount"})
+        for start in range(0, len(ids), chunk_size):
+            recount_headcounts(ids[start : start + chunk_size])
+        if discrepancies:
+            bump_versions("department", "company")
+    return len(discrepancies)
+
+
+######################################################################
@@ -0,0 +1,99 @@
+"""
+Full-text search over Employees, backed by the `main_employee_fts` FTS5 index.
+
+The index mirrors `name`, `email`, `designation` and `address` and is kept in
+sync by triggers on `main_employee` (see migration 0014), so every write path,
+including the raw bulk import, updates it. Matches are ranked with bm25, name
+matches weighing the most.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import re
+from django.db import connections, router
+from .models import Employee
+
+######################################################################
+
+
+######################################################################
+############################ S E A R C H #############################
+######################################################################
+
+FTS_TABLE = "main_employee_fts"
+MAX_TERMS = 10
+# The shortest prefix stored by the index (`prefix='2 3'`, see migration 0014).
+MIN_PREFIX_LENGTH = 2
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match(query):
+    """
+    Turn a user query into an FTS5 MATCH expression.
+
+    Every word becomes a quoted term and all of them must match; the last one
+    is a prefix (`"jo"*`), as it may still be being typed. FTS5 operators and
+    quotes in the input are never interpreted.
+
+    The prefix must have at least `MIN_PREFIX_LENGTH` characters, so it is
+    read from the prefix index and a single letter, which can match a large
+    share of the table, is never ranked.
+
+    Args:
+        query (str): The user query.
+
+    Returns:
+        str: The MATCH expression.
+
+    Raises:
+        ValueError: If the query has no words or its last word is too short.
+    """
+    words = TERM_PATTERN.findall(query or "")[:MAX_TERMS]
+    if not words:
+        raise ValueError("Enter at least one word.")
+    if len(words[-1]) < MIN_PREFIX_LENGTH:
+        raise ValueError(
+            f"The last word must have at least {MIN_PREFIX_LENGTH} characters."
+        )
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+def search_employee_ids(match, offset=0, limit=100):
+    """
+    Rank the Employees matching an FTS5 expression.
+
+    Every match is scored with bm25 and only the best `offset + limit` are
+    kept, so a page never skips a better match.
+
+    Args:
+        match (str): The MATCH expression, as built by `build_match`.
+        offset (int, optional): Number of ranked results to skip. Defaults to 0.
+        limit (int, optional): Maximum number of results. Defaults to 100.
+
+    Returns:
+        list: The matching Employee ids, best match first.
+    """
+    connection = connections[router.db_for_read(Employee)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            "ORDER BY rank LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def rebuild_index():
+    """
+    Rebuild the search index from `main_employee` and merge its segments.
+    """
+    connection = connections[router.db_for_write(Employee)]
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+######################################################################
@@ -0,0 +1,405 @@
+"""
+Deterministic synthetic datasets of Companies, Departments and Employees.
+
+The dataset is planned from a seeded random generator: the number of
+departments per company and of employees per department follow a skewed
+(Pareto) distribution, as a few large parents and many small ones do in
+production. Employee rows are then generated in chunks, each from its own
+generator seeded with the dataset seed and the chunk number, so the same
+arguments always produce the same dataset however many worker processes
+generate it. Hire dates lean towards recent years and statuses follow
+STATUS_WEIGHTS.
+
+Companies and Departments are written with `bulk_create`. Employee rows are
+generated as database-ready tuples and written with one `executemany` per
+chunk, while the workers generate the next chunks.
+On SQLite, the search index and (for loads larger than the table) the
+secondary indexes are built once after the load instead of row by row. The
+per-row signals are bypassed and the counters and headcounts, known from the
+plan, are set once at the end. The whole dataset is one transaction.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import contextlib
+import multiprocessing
+import random
+from collections import Counter
+from datetime import date
+from itertools import accumulate
+from django.db import connections, router, transaction
+from django.utils import timezone
+from .cache import bump_versions
+from .models import Company, Department, Employee, HeadcountSummary
+from .search import FTS_TABLE
+
+######################################################################
+
+
+######################################################################
+########################### S E E D I N G ############################
+######################################################################
+
+# Share of the employees in each status stage.
+STATUS_WEIGHTS = {
+    "APPLICATION_RECEIVED": 15,
+    "INTERVIEW_SCHEDULED": 10,
+    "HIRED": 65,
+    "NOT_ACCEPTED": 10,
+}
+DESIGNATIONS = ["Engineer", "Analyst", "Manager", "Designer", "Accountant", "Support"]
+FIRST_NAMES = ["Ann", "Bob", "Cyrus", "Dina", "Emad", "Farah", "Gus", "Hana", "Ivan"]
+LAST_NAMES = ["Adel", "Brown", "Costa", "Dawood", "Evans", "Fahmy", "Garcia", "Hassan"]
+STREETS = ["Main Street", "Nile Road", "Park Avenue", "Station Road", "High Street"]
+# Hire dates are spread over the ten years before this date, recent ones more often.
+HIRED_BEFORE = date(2025, 1, 1)
+HIRED_WITHIN_DAYS = 3650
+# Shape of the Pareto distribution of the parent sizes; lower is more skewed.
+SIZE_SKEW = 1.5
+# The Employee columns written by `insert_rows`, in the order of the generated tuples.
+EMPLOYEE_COLUMNS = [
+    "company_id",
+    "department_id",
+    "status",
+    "name",
+    "email",
+    "mobile_number",
+    "address",
+    "designation",
+    "hired_on",
+    "days_employed",
+    "updated_at",
+]
+
+
+def split(total, parts, rng, minimum=0):
+    """
+    Split a total into skewed parts that add up to it exactly.
+
+    Args:
+        total (int): The total.
+        parts (int): Number of parts.
+        rng (Random): The seeded random generator.
+        minimum (int, optional): Smallest part. Defaults to 0.
+
+    Returns:
+        list: The parts.
+    """
+    if parts <= 0:
+        return []
+    spread = total - minimum * parts
+    weights = [rng.paretovariate(SIZE_SKEW) for _ in range(parts)]
+    scale = spread / sum(weights)
+    shares = [weight * scale for weight in weights]
+    sizes = [int(share) for share in shares]
+    # Hand out what rounding down left over to the largest remainders.
+    by_remainder = sorted(
+        range(parts), key=lambda i: shares[i] - sizes[i], reverse=True
+    )
+    for i in by_remainder[: spread - sum(sizes)]:
+        sizes[i] += 1
+    return [size + minimum for size in sizes]
+
+
+def generate_rows(task):
+    """
+    Generate the Employee rows of one chunk. Runs in the worker processes.
+
+    Args:
+        task (tuple): The chunk seed, the `updated_at` value, today's ordinal and
+            the `(company_id, department_id, count, first)` pieces of the chunk,
+            `first` being the dataset-wide index of the piece's first Employee.
+
+    Returns:
+        tuple: The rows, as tuples in EMPLOYEE_COLUMNS order, and a Counter of
+        rows per `(department_id, status)`.
+    """
+    chunk_seed, updated_at, today, pieces = task
+    rng = random.Random(chunk_seed)
+    statuses = list(STATUS_WEIGHTS)
+    cum_weights = list(accumulate(STATUS_WEIGHTS.values()))
+    hired_before = HIRED_BEFORE.toordinal()
+    rows, headcounts = [], Counter()
+    for company_id, department_id, count, first in pieces:
+        # One draw per column for the whole piece is several times faster
+        # than drawing every value of every row separately.
+        for status, n, first_name, last_name, street, designation, number in zip(
+            rng.choices(statuses, cum_weights=cum_weights, k=count),
+            range(first, first + count),
+            rng.choices(FIRST_NAMES, k=count),
+            rng.choices(LAST_NAMES, k=count),
+            rng.choices(STREETS, k=count),
+            rng.choices(DESIGNATIONS, k=count),
+            rng.choices(range(1, 999), k=count),
+        ):
+            hired_on = days_employed = None
+            if status == "HIRED":
+                hired = hired_before - int(
+                    rng.triangular(0, HIRED_WITHIN_DAYS, HIRED_WITHIN_DAYS)
+                )
+                hired_on = date.fromordinal(hired).isoformat()
+                days_employed = today - hired
+            rows.append(
+                (
+                    company_id,
+                    department_id,
+                    status,
+                    f"{first_name} {last_name}",
+                    f"{first_name}.{last_name}.{n}@company{company_id}.example.com".lower(),
+                    f"+1{10**9 + rng.getrandbits(33) % (9 * 10**9)}",
+                    f"{number} {street}",
+                    designation,
+                    hired_on,
+                    days_employed,
+                    updated_at,
+                )
+            )
+            headcounts[department_id, status] += 1
+    return rows, headcounts
+
+
+def plan_tasks(department_sizes, seed, updated_at, chunk_size):
+    """
+    Cut the Employees of every Department into chunks of about `chunk_size` rows.
+
+    Args:
+        department_sizes (list): `(company_id, department_id, count)` per Department.
+        seed (int): The dataset seed.
+        updated_at (str): The database value of `updated_at`.
+        chunk_size (int): Rows per chunk.
+
+    Yields:
+        tuple: The `generate_rows` task of each chunk.
+    """
+    today = timezone.now().date().toordinal()
+    pieces, size, first, chunk = [], 0, 0, 0
+    for company_id, department_id, count in department_sizes:
+        while count:
+            take = min(count, chunk_size - size)
+            pieces.append((company_id, department_id, take, first))
+            size, first, count = size + take, first + take, count - take
+            if size == chunk_size:
+                yield (seed * 1_000_003 + chunk, updated_at, today, pieces)
+                pieces, size, chunk = [], 0, chunk + 1
+    if pieces:
+        yield (seed * 1_000_003 + chunk, updated_at, today, pieces)
+
+
+def insert_rows(connection, rows):
+    """
+    Insert generated Employee rows with a single `executemany` and no signals.
+
+    Args:
+        connection (DatabaseWrapper): The connection to write with.
+        rows (list): Tuples in EMPLOYEE_COLUMNS order.
+    """
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(Employee._meta.db_table),
+        ", ".join(quote(column) for column in EMPLOYEE_COLUMNS),
+        ", ".join(["%s"] * len(EMPLOYEE_COLUMNS)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def set_counters(companies, departments, department_sizes, headcounts):
+    """
+    Write the counters and headcounts of a seeded dataset from its plan.
+
+    Args:
+        companies (list): The created Companies.
+        departments (list): The created Departments.
+        department_sizes (list): `(company_id, department_id, count)` per Department.
+        headcounts (Counter): Employees per `(department_id, status)`.
+    """
+    company_departments = Counter(department.company_id for department in departments)
+    company_employees = Counter()
+    for (company_id, _, count), department in zip(department_sizes, departments):
+        department.no_of_employees = count
+        company_employees[company_id] += count
+    for company in companies:
+        company.no_of_deps = company_departments[company.pk]
+        company.no_of_employees = company_employees[company.pk]
+    Department.objects.bulk_update(departments, ["no_of_employees"], batch_size=500)
+    Company.objects.bulk_update(
+        companies, ["no_of_deps", "no_of_employees"], batch_size=500
+    )
+    HeadcountSummary.objects.bulk_create(
+        (
+            HeadcountSummary(department_id=department_id, status=status, count=count)
+            for (department_id, status), count in headcounts.items()
+        ),
+        batch_size=1000,
+    )
+
+
+@contextlib.contextmanager
+def deferred_indexes(connection, rows):
+    """
+    Defer the Employee secondary indexes and search index updates during a bulk load.
+
+    On SQLite, the search index trigger is dropped for the duration of the
+    block and the new rows are indexed with one `INSERT ... SELECT` at the end,
+    with automatic segment merging paused meanwhile. If the load more than
+    doubles the table, the non-unique indexes are dropped too and rebuilt
+    afterwards, which sorts once instead of inserting row by row. Everything
+    is recreated from the stored schema. Must be used inside a transaction, so
+    the schema changes are undone if the load fails.
+
+    Args:
+        connection (DatabaseWrapper): The connection loading the rows.
+        rows (int): Number of rows about to be inserted.
+    """
+    if connection.vendor != "sqlite":
+        yield
+        return
+    table = Employee._meta.db_table
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*), MAX(id) FROM {quote(table)}")
+        existing, last_id = cursor.fetchone()
+        cursor.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = %s AND ("
+            "(type = 'index' AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%%')"
+            " OR (type = 'trigger' AND name = %s))",
+            [table, f"{FTS_TABLE}_insert"],
+        )
+        deferred = [
+            (kind, name, sql)
+            for kind, name, sql in cursor.fetchall()
+            if kind == "trigger" or rows > existing
+        ]
+        for kind, name, _ in deferred:
+            cursor.execute(f"DROP {kind.upper()} {quote(name)}")
+    yield
+    with connection.cursor() as cursor:
+        for kind, _, sql in deferred:
+            if kind == "index":
+                cursor.execute(sql)
+        if any(kind == "trigger" for kind, _, _ in deferred):
+            fts_config = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES (%s, %s)"
+            cursor.execute(fts_config, ["automerge", 0])
+            cursor.execute(fts_config, ["crisismerge", 64])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, name, email, designation, address) "
+                f"SELECT id, name, email, designation, address FROM {quote(table)} "
+                "WHERE id > %s",
+                [last_id or 0],
+            )
+            # Back to the FTS5 defaults.
+            cursor.execute(fts_config, ["automerge", 4])
+            cursor.execute(fts_config, ["crisismerge", 16])
+            for kind, _, sql in deferred:
+                if kind == "trigger":
+                    cursor.execute(sql)
+
+
+def seed_dataset(
+    companies=10,
+    departments=50,
+    employees=5000,
+    seed=0,
+    batch_size=2000,
+    prefix="Seed",
+    workers=1,
+    chunk_size=20000,
+    progress=None,
+):
+    """
+    Create a synthetic dataset and set its counters, in one transaction.
+
+    Args:
+        companies (int, optional): Number of Companies. Defaults to 10.
+        departments (int, optional): Number of Departments, at least one per
+            Company. Defaults to 50.
+        employees (int, optional): Number of Employees. Defaults to 5000.
+        seed (int, optional): The random seed. Defaults to 0.
+        batch_size (int, optional): Rows per Company/Department INSERT. Defaults to 2000.
+        prefix (str, optional): Prefix of the Company names. Defaults to "Seed".
+        workers (int, optional): Processes generating the Employee rows; 1
+            generates them in this process. Defaults to 1.
+        chunk_size (int, optional): Employee rows per generated chunk and
+            INSERT. Defaults to 20000.
+        progress (callable, optional): Called with `(inserted, total)` after each chunk.
+
+    Returns:
+        dict: The number of created Companies, Departments and Employees.
+    """
+    rng = random.Random(seed)
+    connection = connections[router.db_for_write(Employee)]
+    now = timezone.now()
+    # The workers only generate rows; this process does all the writes.
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.get_context("fork").Pool(workers)
+
+    try:
+        with transaction.atomic(using=connection.alias):
+            created_companies = Company.objects.bulk_create(
+                (
+                    Company(company_name=f"{prefix} Company {i}", updated_at=now)
+                    for i in range(companies)
+                ),
+                batch_size=batch_size,
+            )
+            created_departments = Department.objects.bulk_create(
+                (
+                    Department(
+                        company=company,
+                        department_name=f"{company.company_name}_Department {j}",
+                        updated_at=now,
+                    )
+                    for company, count in zip(
+                        created_companies,
+                        split(max(departments, companies), companies, rng, minimum=1),
+                    )
+                    for j in range(count)
+                ),
+                batch_size=batch_size,
+            )
+            department_sizes = [
+                (department.company_id, department.pk, count)
+                for department, count in zip(
+                    created_departments,
+                    split(employees, len(created_departments), rng),
+                )
+            ]
+            tasks = plan_tasks(
+                department_sizes,
+                seed,
+                connection.ops.adapt_datetimefield_value(now),
+                chunk_size,
+            )
+            chunks = (
+                pool.imap(generate_rows, tasks)
+                if pool is not None
+                else map(generate_rows, tasks)
+            )
+
+            inserted, headcounts = 0, Counter()
+            with deferred_indexes(connection, employees):
+                for rows, chunk_headcounts in chunks:
+                    insert_rows(connection, rows)
+                    inserted += len(rows)
+                    headcounts.update(chunk_headcounts)
+                    if progress is not None:
+                        progress(inserted, employees)
+            set_counters(
+                created_companies, created_departments, department_sizes, headcounts
+            )
+            bump_versions("company", "department", "employee")
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return {
+        "companies": len(created_companies),
+        "departments": len(created_departments),
+        "employees": inserted,
+    }
+
+
+######################################################################
@@ -4,14 +4,22 @@ Serializers for transforming model instances into JSON and validating incoming d
 This module includes serializers for the Company, Department, and Employee models.
 Each serializer is documented with its fields and any custom validation or save logic.
 
+Every serializer supports sparse fieldsets through `SparseFieldsMixin`: the
+`fields`/`exclude` query parameters pick the fields of the response, and
+`prune_queryset()` loads only the matching columns and joins. Their `data`,
+one instance or a list, is timed as `serializer` on the sampled requests (see
+`main.timing`).
+
 Author: Abdelmasry
 """
 
 ######################################################################
 ########################## I M P O R T S #############################
 ######################################################################
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Company, Department, Employee, UserAccounts
+from .timing import timed
 
 ######################################################################
 
@@ -21,9 +29,138 @@ from .models import Company, Department, Employee, UserAccounts
 ######################################################################
 
 
-class UserAccountsSerializer(serializers.ModelSerializer):
+class TimedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer timing its `data` as `serializer`.
+    """
+
+    @property
+    def data(self):
+        with timed("serializer"):
+            return super().data
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin that trims its fields to the requested ones.
+
+    `fields` keeps only the named fields and `exclude` drops the named ones; both
+    are lists of field names, e.g. from `?fields=id,name&exclude=name`. Method
+    fields list the model fields they read in `Meta.method_field_sources`.
+    """
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None or exclude is not None:
+            keep = set(self.sparse_field_names(fields, exclude))
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+    @property
+    def data(self):
+        with timed("serializer"):
+            return super().data
+
+    @classmethod
+    def all_field_names(cls):
+        """
+        Return the names of every field of the serializer, in output order.
+
+        Returns:
+            list: The field names.
+        """
+        return list(cls().fields)
+
+    @classmethod
+    def sparse_field_names(cls, fields=None, exclude=None):
+        """
+        Return the field names left after applying `fields` and `exclude`.
+
+        Args:
+            fields (list, optional): The fields to keep. Defaults to all of them.
+            exclude (list, optional): The fields to drop. Defaults to none.
+
+        Returns:
+            list: The field names, in output order.
+        """
+        names = cls.all_field_names()
+        if fields is not None:
+            names = [name for name in names if name in fields]
+        if exclude is not None:
+            names = [name for name in names if name not in exclude]
+        return names
+
+    @classmethod
+    def requested_fields(cls, request):
+        """
+        Read the sparse fieldset of a request.
+
+        Args:
+            request (Request): The HTTP request, with the optional comma-separated
+                `fields` and `exclude` query parameters.
+
+        Returns:
+            list: The requested field names, in output order.
+
+        Raises:
+            serializers.ValidationError: If a parameter names an unknown field.
+        """
+        known = cls.all_field_names()
+        selected = {}
+        for param in ("fields", "exclude"):
+            value = request.query_params.get(param)
+            if value is None:
+                selected[param] = None
+                continue
+            names = [name.strip() for name in value.split(",") if name.strip()]
+            unknown = [name for name in names if name not in known]
+            if unknown:
+                raise serializers.ValidationError(
+                    {param: [f"Unknown field(s): {', '.join(unknown)}."]}
+                )
+            selected[param] = names
+        return cls.sparse_field_names(selected["fields"], selected["exclude"])
+
+    @classmethod
+    def prune_queryset(cls, queryset, names, extra=()):
+        """
+        Load only the columns and joins the named fields need.
+
+        Related fields read through `SlugRelatedField` join their model and load
+        the slug column only; unrequested relations are not joined.
+
+        Args:
+            queryset (QuerySet): The rows to serialize.
+            names (list): The requested field names.
+            extra (iterable, optional): Further model fields to load, e.g. the
+                ordering fields read by the pagination cursor.
+
+        Returns:
+            QuerySet: The pruned queryset.
+        """
+        serializer = cls()
+        method_sources = getattr(cls.Meta, "method_field_sources", {})
+        columns, related = {"pk", *extra}, []
+        for name in names:
+            field = serializer.fields[name]
+            if isinstance(field, serializers.SerializerMethodField):
+                columns.update(method_sources.get(name, ()))
+            elif isinstance(field, serializers.SlugRelatedField):
+                columns.update([field.source, f"{field.source}__{field.slug_field}"])
+                related.append(field.source)
+            else:
+                columns.add(field.source)
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+
+
+class UserAccountsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = UserAccounts
+        list_serializer_class = TimedListSerializer
         fields = ["id", "username", "email", "role", "password"]
 
     def create(self, validated_data):
@@ -37,7 +174,7 @@ class UserAccountsSerializer(serializers.ModelSerializer):
         return user
 
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Company model.
     Transforms Company instances into JSON and validates incoming data.
@@ -45,7 +182,10 @@ class CompanySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Company
-        fields = "__all__"
+        list_serializer_class = TimedListSerializer
+        exclude = ["updated_at"]
+        # Maintained by the signals
+        read_only_fields = ["no_of_deps", "no_of_employees"]
 
     def create(self, validated_data):
         """
@@ -71,7 +211,7 @@ class CompanySerializer(serializers.ModelSerializer):
         return company
 
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Department model.
     Transforms Department instances into JSON and validates incoming data.
@@ -83,7 +223,9 @@ class DepartmentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Department
-        fields = "__all__"
+        list_serializer_class = TimedListSerializer
+        exclude = ["updated_at"]
+        read_only_fields = ["no_of_employees"]  # Maintained by the signals
 
     def create(self, validated_data):
         """
@@ -112,18 +254,11 @@ class DepartmentSerializer(serializers.ModelSerializer):
         instance.department_name = validated_data.get(
             "department_name", instance.department_name
         )
-        instance.company.no_of_employees += (
-            validated_data.get("no_of_employees", instance.no_of_employees)
-            - instance.no_of_employees
-        )
-        instance.no_of_employees = validated_data.get(
-            "no_of_employees", instance.no_of_employees
-        )
         instance.save()
         return instance
 
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Employee model.
     Transforms Employee instances into JSON and validates incoming data.
@@ -135,14 +270,47 @@ class EmployeeSerializer(serializers.ModelSerializer):
     department = serializers.SlugRelatedField(
         queryset=Department.objects.all(), slug_field="department_name"
     )
+    days_employed = serializers.SerializerMethodField()
 
     class Meta:
         model = Employee
-        fields = "__all__"
+        list_serializer_class = TimedListSerializer
+        fields = [
+            "id",
+            "company",
+            "department",
+            "status",
+            "name",
+            "email",
+            "mobile_number",
+            "address",
+            "designation",
+            "hired_on",
+            "days_employed",
+        ]
+        method_field_sources = {"days_employed": ["days_employed"]}
+        value_paths = {"days_employed": "current_days_employed"}
+
+    def get_days_employed(self, obj):
+        """
+        Return the days employed computed by the query, if annotated, or the stored value.
+
+        Args:
+            obj (Employee): The Employee being serialized.
+
+        Returns:
+            int | None: The number of days employed.
+        """
+        return getattr(obj, "current_days_employed", obj.days_employed)
 
     def validate(self, data):
         """
-        Custom validation to ensure that the department belongs to the given company.
+        Custom validation of the hire date and of the company and department.
+
+        A HIRED employee needs a hire date, no hire date may be in the future
+        (its days employed would be negative), and the department must belong
+        to the company. On a partial update, a missing field is taken from the
+        instance.
 
         Args:
             data (dict): The validated data.
@@ -151,11 +319,25 @@ class EmployeeSerializer(serializers.ModelSerializer):
             dict: The validated data.
 
         Raises:
-            serializers.ValidationError: If the department does not belong to the given company.
+            serializers.ValidationError: If the hire date is missing or in the
+                future, or if the department does not belong to the given company.
         """
-        company = data.get("company")
-        department = data.get("department")
-        if department.company != company:
+        status = data.get("status", getattr(self.instance, "status", None))
+        hired_on = data.get("hired_on", getattr(self.instance, "hired_on", None))
+        if hired_on is not None and hired_on > timezone.now().date():
+            raise serializers.ValidationError(
+                {"hired_on": ["The hire date cannot be in the future."]}
+            )
+        if status == "HIRED" and hired_on is None:
+            raise serializers.ValidationError(
+                {"hired_on": ["A hire date must be provided if the status is 'Hired'."]}
+            )
+
+        company = data.get("company", getattr(self.instance, "company", None))
+        department = data.get("department", getattr(self.instance, "department", None))
+        if company is None or department is None:
+            return data
+        if department.company_id != company.pk:
             raise serializers.ValidationError(
                 "The department does not belong to the given company."
             )
@@ -173,9 +355,27 @@ class EmployeeSerializer(serializers.ModelSerializer):
         """
         return Employee.objects.create(**validated_data)
 
+    def apply_changes(self, instance, validated_data):
+        """
+        Copy the validated values that differ from the instance onto it.
+
+        Args:
+            instance (Employee): The Employee instance to update.
+            validated_data (dict): Validated data for updating the Employee instance.
+
+        Returns:
+            list: The names of the changed fields.
+        """
+        changed = []
+        for field, value in validated_data.items():
+            if getattr(instance, field) != value:
+                setattr(instance, field, value)
+                changed.append(field)
+        return changed
+
     def update(self, instance, validated_data):
         """
-        Update an existing Employee instance.
+        Update an existing Employee instance, writing the changed columns only.
 
         Args:
             instance (Employee): The Employee instance to update.
@@ -184,22 +384,60 @@ class EmployeeSerializer(serializers.ModelSerializer):
         Returns:
             Employee: The updated Employee instance.
         """
-        instance.company = validated_data.get("company", instance.company)
-        instance.department = validated_data.get("department", instance.department)
-        instance.status = validated_data.get("status", instance.status)
-        instance.name = validated_data.get("name", instance.name)
-        instance.email = validated_data.get("email", instance.email)
-        instance.mobile_number = validated_data.get(
-            "mobile_number", instance.mobile_number
-        )
-        instance.address = validated_data.get("address", instance.address)
-        instance.designation = validated_data.get("designation", instance.designation)
-        instance.hired_on = validated_data.get("hired_on", instance.hired_on)
-        instance.days_employed = validated_data.get(
-            "days_employed", instance.days_employed
-        )
-        instance.save()
+        changed = self.apply_changes(instance, validated_data)
+        if changed:
+            instance.save(update_fields=changed)
         return instance
 
 
+class EmployeeTransitionSerializer(serializers.Serializer):
+    """
+    Serializer validating a bulk status transition request.
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=10000,
+    )
+    status = serializers.ChoiceField(choices=Employee.stages)
+    hired_on = serializers.DateField(required=False)
+
+    def validate_hired_on(self, value):
+        """
+        Reject hire dates in the future, whose days employed would be negative.
+
+        Args:
+            value (date): The hire date.
+
+        Returns:
+            date: The hire date.
+
+        Raises:
+            serializers.ValidationError: If the date is after today.
+        """
+        if value > timezone.now().date():
+            raise serializers.ValidationError("The hire date cannot be in the future.")
+        return value
+
+    def validate(self, data):
+        """
+        Custom validation to ensure a hire date is given when moving to "HIRED".
+
+        Args:
+            data (dict): The validated data.
+
+        Returns:
+            dict: The validated data.
+
+        Raises:
+            serializers.ValidationError: If the status is "HIRED" and no hire date is given.
+        """
+        if data["status"] == "HIRED" and not data.get("hired_on"):
+            raise serializers.ValidationError(
+                {"hired_on": ["A hire date must be provided if the status is 'Hired'."]}
+            )
+        return data
+
+
 ######################################################################
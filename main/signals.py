@@ -1,8 +1,14 @@
 """
 Signals for updating counts in Company and Department models when changes occur in related models.
 
-This module includes signals that listen to save and delete events on Department and Employee models.
-It updates the counts of departments and employees in the Company model accordingly.
+This module includes signals that listen to save and delete events on Department and Employee models,
+and on UserAccounts and Token to invalidate the cached token authentication entries.
+Every Company, Department, Employee and UserAccounts write also replaces the collection
+version tokens used by the response cache and the conditional GET handling.
+It updates the counts of departments and employees in the Company model, and the
+per department and status headcounts of HeadcountSummary, accordingly, using
+single-statement in-database increments that run in the same transaction as the
+triggering write.
 
 Author: Abdelmasry
 """
@@ -12,7 +18,11 @@ Author: Abdelmasry
 ######################################################################
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import Company, Department, Employee
+from rest_framework.authtoken.models import Token
+from .models import Company, Department, Employee, UserAccounts, is_being_deleted
+from .counters import adjust_company, adjust_department, adjust_headcount
+from .authentication import token_cache
+from .cache import bump_versions
 
 ######################################################################
 
@@ -20,71 +30,139 @@ from .models import Company, Department, Employee
 ######################################################################
 ########################## S I G N A L S #############################
 ######################################################################
+
+# Employee fields the counters and headcounts depend on.
+EMPLOYEE_COUNTER_FIELDS = {
+    "company",
+    "company_id",
+    "department",
+    "department_id",
+    "status",
+}
+
+
+def updates_counters(update_fields):
+    """
+    Tell whether an Employee save may change the counters.
+
+    Args:
+        update_fields (frozenset | None): The `update_fields` of the save.
+
+    Returns:
+        bool: False if only fields the counters do not depend on are written.
+    """
+    return update_fields is None or bool(EMPLOYEE_COUNTER_FIELDS & update_fields)
+
+
+@receiver(pre_save, sender=Department)
+def handle_department_pre_save(sender, instance, **kwargs):
+    """
+    Remember the Department's stored company and employee count before it is updated.
+
+    Args:
+        sender (type): The model class.
+        instance (Department): The actual instance being saved.
+        **kwargs: Additional keyword arguments.
+    """
+    instance._previous_counters = None
+    if instance.pk:
+        instance._previous_counters = (
+            Department.objects.filter(pk=instance.pk)
+            .values_list("company_id", "no_of_employees")
+            .first()
+        )
+
+
 @receiver(post_save, sender=Department)
 def update_department_count(sender, instance, created, **kwargs):
     """
     Update the department count and total number of employees in the Company when a Department is created or updated.
 
+    Counters are only touched when the company or the employee count actually changed.
+
     Args:
         sender (type): The model class.
         instance (Department): The actual instance being saved.
         created (bool): A boolean; True if a new record was created.
         **kwargs: Additional keyword arguments.
     """
-    company = instance.company
-    if created:
-        company.no_of_deps += 1
-        company.no_of_employees += instance.no_of_employees
-    else:
-        company.no_of_deps = Department.objects.filter(company=company).count()
-    company.save()
+    previous = getattr(instance, "_previous_counters", None)
+    if created or previous is None:
+        adjust_company(
+            instance.company_id,
+            no_of_deps=1,
+            no_of_employees=instance.no_of_employees,
+        )
+        return
+
+    previous_company_id, previous_no_of_employees = previous
+    if previous_company_id != instance.company_id:
+        adjust_company(previous_company_id, no_of_deps=-1)
+        adjust_company(instance.company_id, no_of_deps=1)
+    elif previous_no_of_employees != instance.no_of_employees:
+        adjust_company(
+            instance.company_id,
+            no_of_employees=instance.no_of_employees - previous_no_of_employees,
+        )
 
 
 @receiver(post_delete, sender=Department)
 def decrease_department_count(sender, instance, **kwargs):
     """
-    Update the department count and total number of employees in the Company when a Department is deleted.
+    Update the department count in the Company when a Department is deleted.
+
+    The Company's employee count is decreased by the post_delete handler of each
+    cascaded Employee, so only the department count is adjusted here. Nothing is
+    done if the Company is being deleted too.
 
     Args:
         sender (type): The model class.
         instance (Department): The actual instance being deleted.
         **kwargs: Additional keyword arguments.
     """
-    company = instance.company
-    company.no_of_deps -= 1
-    company.no_of_employees -= instance.no_of_employees
-    company.save()
+    if not is_being_deleted(Company, instance.company_id):
+        adjust_company(instance.company_id, no_of_deps=-1)
 
 
 @receiver(pre_save, sender=Employee)
 def handle_employee_pre_save(sender, instance, **kwargs):
     """
-    Handle changes to the Employee's company or department before saving.
-    Updates the number of employees in the old and new company and department if changed.
+    Remember the Employee's stored company, department and status before it is updated.
+
+    They are the values the instance was loaded with, so no query is needed;
+    the UPDATE is then made conditional on them still being stored (see
+    `Employee._do_update`), which catches stale instances. Instances built in
+    memory or with those fields deferred read them from the database.
+    Skipped when the save only writes fields the counters do not depend on.
 
     Args:
         sender (type): The model class.
         instance (Employee): The actual instance being saved.
         **kwargs: Additional keyword arguments.
     """
-    if instance.pk:
-        previous = Employee.objects.get(pk=instance.pk)
-        if previous.company != instance.company:
-            previous.company.no_of_employees -= 1
-            instance.company.no_of_employees += 1
-            previous.company.save()
-            instance.company.save()
-        if previous.department != instance.department:
-            previous.department.no_of_employees -= 1
-            instance.department.no_of_employees += 1
-            previous.department.save()
-            instance.department.save()
+    instance._previous_counters = instance._expected_counters = None
+    if instance.pk and updates_counters(kwargs.get("update_fields")):
+        previous = instance.loaded_values(*Employee.COUNTER_FIELDS)
+        if previous is None:
+            previous = (
+                Employee.objects.filter(pk=instance.pk)
+                .values_list(*Employee.COUNTER_FIELDS)
+                .first()
+            )
+        else:
+            instance._expected_counters = dict(zip(Employee.COUNTER_FIELDS, previous))
+        instance._previous_counters = previous
 
 
 @receiver(post_save, sender=Employee)
 def update_employee_counts(sender, instance, created, **kwargs):
     """
-    Update the employee count in the Department and Company when an Employee is created or updated.
+    Update the employee count in the Department and Company, and the headcount
+    of its department and status, when an Employee is created or updated.
+
+    On update, the old and new parents are only adjusted if the company or department
+    changed, and the headcounts if the department or status changed. Saves that
+    only write other fields are ignored.
 
     Args:
         sender (type): The model class.
@@ -92,36 +170,108 @@ def update_employee_counts(sender, instance, created, **kwargs):
         created (bool): A boolean; True if a new record was created.
         **kwargs: Additional keyword arguments.
     """
-    company = instance.company
-    department = instance.department
-    if created:
-        department.no_of_employees += 1
-        company.no_of_employees += 1
-    else:
-        department.no_of_employees = Employee.objects.filter(
-            department=department
-        ).count()
-        company.no_of_employees = Employee.objects.filter(company=company).count()
-    department.save()
-    company.save()
+    if not created and not updates_counters(kwargs.get("update_fields")):
+        return
+    previous = getattr(instance, "_previous_counters", None)
+    if created or previous is None:
+        adjust_department(instance.department_id, no_of_employees=1)
+        adjust_company(instance.company_id, no_of_employees=1)
+        adjust_headcount(instance.department_id, instance.status, 1)
+        return
+
+    previous_company_id, previous_department_id, previous_status = previous
+    if (previous_department_id, previous_status) != (
+        instance.department_id,
+        instance.status,
+    ):
+        adjust_headcount(previous_department_id, previous_status, -1)
+        adjust_headcount(instance.department_id, instance.status, 1)
+    if previous_department_id != instance.department_id:
+        adjust_department(previous_department_id, no_of_employees=-1)
+        adjust_department(instance.department_id, no_of_employees=1)
+    if previous_company_id != instance.company_id:
+        adjust_company(previous_company_id, no_of_employees=-1)
+        adjust_company(instance.company_id, no_of_employees=1)
 
 
 @receiver(post_delete, sender=Employee)
 def decrease_employee_counts(sender, instance, **kwargs):
     """
-    Update the employee count in the Department and Company when an Employee is deleted.
+    Update the employee count in the Department and Company, and the headcount of
+    its department and status, when an Employee is deleted.
+
+    The counters of a Company or Department being deleted too are left alone.
 
     Args:
         sender (type): The model class.
         instance (Employee): The actual instance being deleted.
         **kwargs: Additional keyword arguments.
     """
-    department = instance.department
-    company = instance.company
-    department.no_of_employees -= 1
-    company.no_of_employees -= 1
-    department.save()
-    company.save()
+    if is_being_deleted(Company, instance.company_id):
+        return
+    if not is_being_deleted(Department, instance.department_id):
+        adjust_department(instance.department_id, no_of_employees=-1)
+        adjust_headcount(instance.department_id, instance.status, -1)
+    adjust_company(instance.company_id, no_of_employees=-1)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=UserAccounts)
+@receiver(post_delete, sender=UserAccounts)
+def bump_collection_version(sender, instance, **kwargs):
+    """
+    Replace the version token of the written collection, in the same transaction as the write.
+
+    Employee and Department writes also change the counters of their parents, so the
+    parent collections are bumped as well.
+
+    Args:
+        sender (type): The model class.
+        instance (Company | Department | Employee | UserAccounts): The actual instance being saved or deleted.
+        **kwargs: Additional keyword arguments.
+    """
+    if sender is UserAccounts:
+        bump_versions("user")
+    elif sender is Employee:
+        bump_versions("employee", "department", "company")
+    elif sender is Department:
+        bump_versions("department", "company")
+    else:
+        bump_versions("company")
+
+
+@receiver(post_save, sender=UserAccounts)
+@receiver(post_delete, sender=UserAccounts)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """
+    Drop the cached tokens of a UserAccounts instance when it is saved (e.g. deactivated) or deleted.
+
+    Args:
+        sender (type): The model class.
+        instance (UserAccounts): The actual instance being saved or deleted.
+        **kwargs: Additional keyword arguments.
+    """
+    token_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_rotated_token(sender, instance, **kwargs):
+    """
+    Drop the cached entries of a user whose token is created or deleted (rotated).
+
+    Args:
+        sender (type): The model class.
+        instance (Token): The actual instance being saved or deleted.
+        **kwargs: Additional keyword arguments.
+    """
+    token_cache.invalidate(instance.key)
+    token_cache.invalidate_user(instance.user_id)
 
 
 ######################################################################
@@ -1,3 +1,1764 @@
-from django.test import TestCase
+import base64
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import date
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, close_old_connections, connection, connections
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .authentication import TokenCache, token_cache
+from .benchmark import OPERATIONS, BenchmarkContext, run_operation
+from .backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from .cache import bump_versions, response_cache
+from .counters import recount_employees
+from .deletion import delete_company, delete_department
+from .importers import import_employees
+from .reconcile import audit_counts, repair_counts
+from .search import build_match, search_employee_ids
+from .seeding import seed_dataset
+from .timing import RequestTimingMiddleware
+from .models import (
+    Company,
+    CountReconciliation,
+    Department,
+    Employee,
+    HeadcountSummary,
+    UserAccounts,
+)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class MainTestCase(TestCase):
+    """
+    Base test case with a helper for building companies, departments and employees.
+    """
+
+    def setUp(self):
+        self.admin = UserAccounts.objects.create_user(
+            username="admin", email="admin@mail.com", role="ADMIN", password="pw"
+        )
+        self.manager = UserAccounts.objects.create_user(
+            username="manager", email="manager@mail.com", role="MANAGER", password="pw"
+        )
+        self.employee_user = UserAccounts.objects.create_user(
+            username="employee",
+            email="employee@mail.com",
+            role="EMPLOYEE",
+            password="pw",
+        )
+        self.client = APIClient()
+
+    def login(self, user):
+        self.client.force_authenticate(user=user)
+
+    def make_company(self, name="Acme"):
+        return Company.objects.create(company_name=name)
+
+    def make_department(self, company, name="HR"):
+        return Department.objects.create(company=company, department_name=name)
+
+    def make_employees(self, company, department, count, status="HIRED", start=0):
+        return [
+            Employee.objects.create(
+                company=company,
+                department=department,
+                status=status,
+                name=f"Employee {i}",
+                email=f"employee{i}@{company.company_name}.com",
+                mobile_number="+123456789",
+                address="Street 1",
+                designation="Engineer",
+                hired_on=date(2024, 1, 1) if status == "HIRED" else None,
+            )
+            for i in range(start, start + count)
+        ]
+
+
+class CursorPaginationTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.make_employees(self.company, self.department, 5)
+        self.login(self.employee_user)
+
+    def test_pages_follow_next_cursor(self):
+        response = self.client.get("/main/employee/", {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["Employees"]), 2)
+        self.assertIsNone(response.data["previous"])
+
+        seen = [row["id"] for row in response.data["Employees"]]
+        next_url = response.data["next"]
+        while next_url:
+            response = self.client.get(next_url)
+            seen += [row["id"] for row in response.data["Employees"]]
+            next_url = response.data["next"]
+        self.assertEqual(seen, list(Employee.objects.values_list("id", flat=True)))
+
+    def test_concurrent_insert_does_not_shift_pages(self):
+        response = self.client.get("/main/employee/", {"page_size": 2})
+        first_page = [row["id"] for row in response.data["Employees"]]
+        self.make_employees(self.company, self.department, 1, start=100)
+        response = self.client.get(response.data["next"])
+        second_page = [row["id"] for row in response.data["Employees"]]
+        self.assertEqual(second_page[0], first_page[-1] + 1)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get("/main/employee/", {"page_size": 10**6})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["Employees"]), 5)
+
+    def test_invalid_cursor(self):
+        cursor = base64.b64encode(b"p=abc").decode()
+        response = self.client.get("/main/employee/", {"cursor": cursor})
+        self.assertEqual(response.status_code, 404)
+
+    def test_company_department_and_user_lists_are_paginated(self):
+        self.login(self.admin)
+        for url, key in [
+            ("/main/company/", "Companies"),
+            ("/main/user/", "Users"),
+        ]:
+            response = self.client.get(url, {"page_size": 1})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data[key]), 1)
+            self.assertIn("next", response.data)
+        response = self.client.get("/main/department/")
+        self.assertEqual(len(response.data["Departments"]), 1)
+
+
+class ListQueryCountTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+
+    def assertConstantQueries(self, url, role_user, expected):
+        self.login(role_user)
+        for total in (2, 10):
+            existing = Employee.objects.count()
+            self.make_employees(
+                self.company, self.department, total - existing, start=existing
+            )
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_employee_list_query_count_is_constant(self):
+        # collection versions (ETag) + employees
+        self.assertConstantQueries("/main/employee/", self.employee_user, 2)
+
+    def test_department_list_query_count_is_constant(self):
+        self.login(self.manager)
+        for total in (2, 10):
+            for i in range(Department.objects.count(), total):
+                self.make_department(self.make_company(f"Co{i}"), name=f"Dept{i}")
+            with self.assertNumQueries(2):  # response cache versions + departments
+                response = self.client.get("/main/department/")
+            self.assertEqual(len(response.data["Departments"]), total)
+
+    def test_employee_detail_is_a_single_query(self):
+        employee = self.make_employees(self.company, self.department, 1)[0]
+        self.login(self.employee_user)
+        with self.assertNumQueries(2):  # updated_at fingerprint (ETag) + employee
+            self.client.get(f"/main/employee/{employee.pk}/")
+
+
+class CounterSignalTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+
+    def assertCounters(self, company, no_of_deps, no_of_employees):
+        company.refresh_from_db()
+        self.assertEqual(company.no_of_deps, no_of_deps)
+        self.assertEqual(company.no_of_employees, no_of_employees)
+
+    def test_create_move_and_delete_employee(self):
+        other_company = self.make_company("Globex")
+        other_department = self.make_department(other_company, "Sales")
+        employee = self.make_employees(self.company, self.department, 1)[0]
+        self.assertCounters(self.company, 1, 1)
+
+        employee.company = other_company
+        employee.department = other_department
+        employee.save()
+        self.assertCounters(self.company, 1, 0)
+        self.assertCounters(other_company, 1, 1)
+        other_department.refresh_from_db()
+        self.assertEqual(other_department.no_of_employees, 1)
+
+        employee.delete()
+        self.assertCounters(other_company, 1, 0)
+
+    def test_update_without_fk_change_touches_no_counters(self):
+        employee = self.make_employees(self.company, self.department, 1)[0]
+        employee.designation = "Manager"
+        with CaptureQueriesContext(connection) as queries:
+            employee.save()
+        counter_updates = [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith(
+                ('UPDATE "main_company"', 'UPDATE "main_department"')
+            )
+        ]
+        self.assertEqual(counter_updates, [])
+        self.assertCounters(self.company, 1, 1)
+
+    def test_department_cascade_delete(self):
+        self.make_employees(self.company, self.department, 3)
+        self.department.delete()
+        self.assertCounters(self.company, 0, 0)
+
+    def test_update_detects_changes_without_reading_the_row(self):
+        self.make_employees(self.company, self.department, 1)
+        other_department = self.make_department(self.company, "Sales")
+        employee = Employee.objects.get()
+        employee.department = other_department
+        self.assertEqual(employee.changed_fields(), {"department"})
+        with CaptureQueriesContext(connection) as queries:
+            employee.save()
+        self.assertFalse(
+            [q for q in queries if q["sql"].startswith('SELECT "main_employee"')]
+        )
+        self.assertEqual(employee.changed_fields(), set())
+        other_department.refresh_from_db()
+        self.assertEqual(other_department.no_of_employees, 1)
+
+    def test_stale_instance_adjusts_the_stored_parents(self):
+        self.make_employees(self.company, self.department, 1)
+        sales = self.make_department(self.company, "Sales")
+        ops = self.make_department(self.company, "Ops")
+        stale = Employee.objects.get()
+        current = Employee.objects.get()
+        current.department = sales
+        current.save()
+        stale.department = ops
+        stale.save()
+        counts = dict(
+            Department.objects.values_list("department_name", "no_of_employees")
+        )
+        self.assertEqual(counts, {"Acme_HR": 0, "Acme_Sales": 0, "Acme_Ops": 1})
+        self.assertEqual(
+            dict(
+                HeadcountSummary.objects.filter(count__gt=0).values_list(
+                    "department__department_name", "count"
+                )
+            ),
+            {"Acme_Ops": 1},
+        )
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ConcurrentCounterTests(TransactionTestCase):
+    def test_parallel_writers_keep_counters_exact(self):
+        company = Company.objects.create(company_name="Acme")
+        department = Department.objects.create(company=company, department_name="HR")
+        writers, per_writer, max_attempts = 4, 10, 50
+        errors = []
+
+        def write(writer):
+            try:
+                for i in range(per_writer):
+                    for _ in range(max_attempts):
+                        try:
+                            Employee.objects.create(
+                                company=company,
+                                department=department,
+                                status="APPLICATION_RECEIVED",
+                                name=f"Employee {writer}-{i}",
+                                email=f"employee{writer}-{i}@acme.com",
+                                mobile_number="+123456789",
+                                address="Street 1",
+                                designation="Engineer",
+                            )
+                            break
+                        except OperationalError:
+                            continue  # The whole transaction rolled back; retry it.
+                    else:
+                        raise AssertionError(
+                            f"Writer {writer} still locked out after {max_attempts} attempts."
+                        )
+            except Exception as error:
+                errors.append(error)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [
+            threading.Thread(target=write, args=(n,), daemon=True)
+            for n in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+            self.assertFalse(thread.is_alive(), "A writer is still running after 60s.")
+
+        self.assertEqual(errors, [])
+        company.refresh_from_db()
+        department.refresh_from_db()
+        self.assertEqual(company.no_of_employees, writers * per_writer)
+        self.assertEqual(department.no_of_employees, writers * per_writer)
+
+
+class EmployeeImportTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.login(self.manager)
+
+    def test_csv_import_reports_row_errors_and_recounts(self):
+        body = (
+            "company,department,status,name,email,mobile_number,address,designation,hired_on\n"
+            "Acme,Acme_HR,HIRED,Ann,ann@acme.com,+123456789,Street,Dev,2024-01-01\n"
+            "Acme,Acme_HR,HIRED,Bob,bob@acme.com,+123456789,Street,Dev,\n"
+            "Acme,Nope,APPLICATION_RECEIVED,Cy,cy@acme.com,+123456789,Street,Dev,\n"
+            "Acme,Acme_HR,APPLICATION_RECEIVED,Di,di@acme.com,+123456789,Street,Dev,\n"
+            "Acme,Acme_HR,APPLICATION_RECEIVED,Ann,ann@acme.com,+123456789,Street,Dev,\n"
+        )
+        response = self.client.post(
+            "/main/employee/import/?chunk_size=2", body, content_type="text/csv"
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3, 5])
+        self.assertIn("non_field_errors", response.data["errors"][0]["errors"])
+        self.assertIn("department", response.data["errors"][1]["errors"])
+        self.assertIn("email", response.data["errors"][2]["errors"])
+
+        self.company.refresh_from_db()
+        self.department.refresh_from_db()
+        self.assertEqual(self.company.no_of_employees, 2)
+        self.assertEqual(self.department.no_of_employees, 2)
+
+    def test_future_hire_date_rejects_only_its_row(self):
+        body = (
+            "company,department,status,name,email,mobile_number,address,designation,hired_on\n"
+            "Acme,Acme_HR,HIRED,Ann,ann@acme.com,+123456789,Street,Dev,2999-01-01\n"
+            "Acme,Acme_HR,HIRED,Bob,bob@acme.com,+123456789,Street,Dev,2020-01-01\n"
+        )
+        response = self.client.post(
+            "/main/employee/import/", body, content_type="text/csv"
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "row": 1,
+                    "errors": {"hired_on": ["The hire date cannot be in the future."]},
+                }
+            ],
+        )
+        self.assertTrue(Employee.objects.filter(email="bob@acme.com").exists())
+
+    def test_jsonl_upload(self):
+        upload = SimpleUploadedFile(
+            "employees.jsonl",
+            b'{"company": "Acme", "department": "Acme_HR", "status": "APPLICATION_RECEIVED",'
+            b' "name": "Ann", "email": "ann@acme.com", "mobile_number": "+123456789",'
+            b' "address": "Street", "designation": "Dev"}\nnot json\n',
+        )
+        response = self.client.post("/main/employee/import/", {"file": upload})
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["errors"][0]["row"], 2)
+
+    def test_jsonl_rows_with_non_string_values_are_rejected(self):
+        body = (
+            '{"company": ["Acme"], "department": "Acme_HR", "status": {"x": 1},'
+            ' "name": "Ann", "email": "ann@acme.com", "mobile_number": "+123456789",'
+            ' "address": "Street", "designation": "Dev"}\n'
+            '{"company": "Acme", "department": "Acme_HR", "status": "HIRED",'
+            ' "name": "Bob", "email": "bob@acme.com", "mobile_number": "+123456789",'
+            ' "address": "Street", "designation": "Dev", "hired_on": "2020-01-01"}\n'
+        )
+        response = self.client.post(
+            "/main/employee/import/", body, content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data["created"], response.data["failed"]), (1, 1))
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "row": 1,
+                    "errors": {
+                        "company": ["Expected a string."],
+                        "status": ["Expected a string."],
+                    },
+                }
+            ],
+        )
+
+    def test_unsupported_format(self):
+        response = self.client.post(
+            "/main/employee/import/", "x", content_type="text/plain"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class EmployeeExportTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.employees = self.make_employees(self.company, self.department, 3)
+        self.login(self.admin)
+
+    def read(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_ndjson_matches_serializer_output(self):
+        response = self.client.get("/main/employee/export/")
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.login(self.employee_user)
+        listed = self.client.get("/main/employee/").json()["Employees"]
+        self.assertEqual(rows, listed)
+
+    def test_csv_and_gzip(self):
+        response = self.client.get(
+            "/main/employee/export/", {"output": "csv", "compress": "gzip"}
+        )
+        lines = gzip.decompress(self.read(response)).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "company", "department"])
+        self.assertEqual(len(lines), 4)
+        self.assertIn(",Acme,Acme_HR,HIRED,", lines[1])
+
+    def test_employee_role_cannot_export(self):
+        self.login(self.employee_user)
+        self.assertEqual(self.client.get("/main/employee/export/").status_code, 403)
+
+
+class DaysEmployedTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.employee = self.make_employees(self.company, self.department, 1)[0]
+        Employee.objects.update(days_employed=0)  # As if saved on the hire date.
+        self.expected = (timezone.now().date() - date(2024, 1, 1)).days
+
+    def test_api_computes_days_employed_at_read_time(self):
+        self.login(self.employee_user)
+        response = self.client.get("/main/employee/")
+        self.assertEqual(response.data["Employees"][0]["days_employed"], self.expected)
+        response = self.client.get(f"/main/employee/{self.employee.pk}/")
+        self.assertEqual(response.data["days_employed"], self.expected)
+
+    def test_refresh_command_updates_stored_values(self):
+        self.make_employees(
+            self.company, self.department, 1, status="APPLICATION_RECEIVED", start=1
+        )
+        out = StringIO()
+        call_command("refresh_days_employed", stdout=out)
+        self.assertIn("on 1 employees", out.getvalue())
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.days_employed, self.expected)
+
+
+class CachedTokenAuthenticationTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.token = Token.objects.create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_second_request_skips_token_lookup(self):
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self.client.get("/main/stats/").status_code, 200)
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get("/main/stats/")
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 0)
+        self.assertEqual(response.data["token_cache"]["hits"], 1)
+        self.assertEqual(response.data["token_cache"]["misses"], 1)
+
+    def test_deleting_user_invalidates_token(self):
+        other = Token.objects.create(user=self.manager)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {other.key}")
+        self.assertEqual(self.client.get("/main/department/").status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.assertEqual(
+            self.client.delete(f"/main/user/{self.manager.pk}/").status_code, 204
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {other.key}")
+        self.assertEqual(self.client.get("/main/department/").status_code, 401)
+
+    def test_deactivation_and_rotation_invalidate_token(self):
+        self.client.get("/main/stats/")
+        self.token.delete()
+        self.assertEqual(self.client.get("/main/stats/").status_code, 401)
+
+        token = Token.objects.create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get("/main/stats/")
+        self.admin.is_active = False
+        self.admin.save()
+        self.assertEqual(self.client.get("/main/stats/").status_code, 401)
+
+    def test_lru_eviction(self):
+        cache = TokenCache(max_entries=2, ttl=60)
+        cache.set("a", 1, "ADMIN", True)
+        cache.set("b", 2, "ADMIN", True)
+        cache.get("a")
+        cache.set("c", 3, "ADMIN", True)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), (1, "ADMIN", True))
+
+
+class ResponseCacheTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        response_cache.clear()
+        self.company = self.make_company()
+        self.login(self.admin)
+
+    def test_repeated_list_is_served_from_cache(self):
+        with self.assertNumQueries(2):  # versions + companies
+            first = self.client.get("/main/company/")
+        with self.assertNumQueries(1):  # versions only
+            second = self.client.get("/main/company/")
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(response_cache.stats()["hits"], 1)
+
+    def test_write_invalidates_cached_responses(self):
+        self.client.get(f"/main/company/{self.company.pk}/")
+        self.make_department(self.company)
+        response = self.client.get(f"/main/company/{self.company.pk}/")
+        self.assertEqual(response.data["no_of_deps"], 1)
+
+        self.login(self.manager)
+        department = self.client.get("/main/department/").data["Departments"][0]
+        Company.objects.filter(pk=self.company.pk).update(company_name="Renamed")
+        bump_versions("company")
+        response = self.client.get("/main/department/")
+        self.assertNotEqual(response.data["Departments"][0], department)
+        self.assertEqual(response.data["Departments"][0]["company"], "Renamed")
+
+    def test_saves_roll_back_with_a_failed_version_bump(self):
+        with mock.patch("main.signals.bump_versions", side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                Company.objects.create(company_name="Globex")
+            with self.assertRaises(OperationalError):
+                UserAccounts.objects.create_user(
+                    username="other",
+                    email="other@mail.com",
+                    role="ADMIN",
+                    password="pw",
+                )
+        self.assertFalse(Company.objects.filter(company_name="Globex").exists())
+        self.assertFalse(UserAccounts.objects.filter(username="other").exists())
+
+    def test_cache_is_keyed_by_parameters(self):
+        self.make_company("Globex")
+        self.assertEqual(
+            len(self.client.get("/main/company/", {"page_size": 1}).data["Companies"]),
+            1,
+        )
+        self.assertEqual(len(self.client.get("/main/company/").data["Companies"]), 2)
+
+
+class ConditionalGetTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.employee = self.make_employees(self.company, self.department, 1)[0]
+
+    def test_matching_etag_returns_304_after_one_query(self):
+        self.login(self.employee_user)
+        for url in ("/main/employee/", f"/main/employee/{self.employee.pk}/"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response["ETag"].startswith('"'))
+            self.assertIn("Last-Modified", response)
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+
+    def test_write_changes_etag(self):
+        self.login(self.admin)
+        list_etag = self.client.get("/main/company/")["ETag"]
+        detail_url = f"/main/company/{self.company.pk}/"
+        detail_etag = self.client.get(detail_url)["ETag"]
+        self.make_company("Globex")
+        self.assertEqual(self.client.get(detail_url)["ETag"], detail_etag)
+
+        self.make_department(self.company, name="Sales")
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["no_of_deps"], 2)
+        response = self.client.get("/main/company/", HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["Companies"]), 2)
+
+    def test_related_rename_changes_employee_etag(self):
+        self.login(self.employee_user)
+        url = f"/main/employee/{self.employee.pk}/"
+        etag = self.client.get(url)["ETag"]
+        self.department.department_name = "Renamed"
+        self.department.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["department"].endswith("Renamed"))
+
+    def test_missing_row_is_still_404(self):
+        self.login(self.employee_user)
+        response = self.client.get("/main/employee/999/", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response)
+
+
+class AsyncViewTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.employees = self.make_employees(self.company, self.department, 3)
+        self.headers = {
+            "Authorization": f"Token {Token.objects.create(user=self.employee_user)}"
+        }
+
+    async def test_list_and_detail_match_sync_views(self):
+        self.login(self.employee_user)
+        for path in ("employee/?page_size=2", f"employee/{self.employees[0].pk}/"):
+            response = await self.async_client.get(
+                f"/main/async/{path}", headers=self.headers
+            )
+            self.assertEqual(response.status_code, 200)
+            expected = await sync_to_async(self.client.get)(f"/main/{path}")
+            self.assertEqual(
+                response.json(),
+                json.loads(
+                    expected.content.decode().replace(
+                        "/main/employee/", "/main/async/employee/"
+                    )
+                ),
+            )
+
+    async def test_next_cursor_reaches_every_row(self):
+        url, ids = "/main/async/employee/?page_size=2", []
+        while url:
+            body = (await self.async_client.get(url, headers=self.headers)).json()
+            ids += [row["id"] for row in body["Employees"]]
+            url = body["next"]
+        self.assertEqual(ids, [employee.pk for employee in self.employees])
+
+    async def test_errors(self):
+        response = await self.async_client.get("/main/async/employee/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+        response = await self.async_client.get(
+            "/main/async/employee/", headers={"Authorization": "Token invalid"}
+        )
+        self.assertEqual(response.json(), {"detail": "Invalid token."})
+        response = await self.async_client.get(
+            "/main/async/company/", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 403)
+        response = await self.async_client.get(
+            "/main/async/employee/999/", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.delete(
+            f"/main/async/employee/{self.employees[0].pk}/", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 405)
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "test.sqlite3")
+
+    def make_wrapper(self, **options):
+        settings_dict = connections.configure_settings(
+            {
+                "default": {},
+                "tuned": {
+                    "ENGINE": "main.backends.sqlite3",
+                    "NAME": self.path,
+                    "OPTIONS": options,
+                },
+            }
+        )["tuned"]
+        wrapper = SQLiteDatabaseWrapper(settings_dict, alias="tuned")
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_pragmas_and_immediate_transactions(self):
+        wrapper = self.make_wrapper(transaction_mode="IMMEDIATE")
+        with wrapper.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+        with CaptureQueriesContext(wrapper) as queries:
+            wrapper._start_transaction_under_autocommit()
+        self.assertEqual(queries[0]["sql"], "BEGIN IMMEDIATE")
+        self.assertTrue(wrapper.connection.in_transaction)
+
+    def test_busy_statement_is_retried_outside_transactions(self):
+        wrapper = self.make_wrapper(timeout=0, busy_retries=8, busy_backoff=0.02)
+        with wrapper.cursor() as cursor:
+            cursor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+
+        locker = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self.addCleanup(locker.close)
+        locker.execute("BEGIN EXCLUSIVE")
+        threading.Timer(0.1, locker.execute, ["COMMIT"]).start()
+        with wrapper.cursor() as cursor:
+            cursor.execute("INSERT INTO t (id) VALUES (1)")
+
+        locker.execute("BEGIN EXCLUSIVE")
+        self.addCleanup(locker.execute, "COMMIT")
+        wrapper.settings_dict["OPTIONS"]["busy_retries"] = 0
+        wrapper.close()
+        with self.assertRaises(OperationalError):
+            with wrapper.cursor() as cursor:
+                cursor.execute("INSERT INTO t (id) VALUES (2)")
+
+
+class QueryPlanTests(MainTestCase):
+    """
+    Run EXPLAIN QUERY PLAN on every query the views, signals and bulk paths issue,
+    and fail on full table scans. A scan in index order that stops at a LIMIT
+    (a cursor page) is allowed.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.other = self.make_department(self.company, name="Sales")
+        self.employees = self.make_employees(self.company, self.department, 3)
+
+    def full_scans(self, queries):
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query["sql"]
+                if not sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                    continue
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+                paged = " LIMIT " in sql and not any(
+                    "TEMP B-TREE FOR ORDER BY" in detail for detail in plan
+                )
+                scans += [
+                    (detail, sql)
+                    for detail in plan
+                    if detail.startswith("SCAN ")
+                    and " USING " not in detail
+                    and not paged
+                ]
+        return scans
+
+    def assertIndexed(self, run):
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        self.assertGreater(len(queries), 0)
+        self.assertEqual(self.full_scans(queries), [])
+
+    def test_read_endpoints(self):
+        def run():
+            for user, urls in (
+                (self.admin, ["/main/company/", f"/main/company/{self.company.pk}/"]),
+                (self.admin, ["/main/user/", f"/main/user/{self.admin.pk}/"]),
+                (
+                    self.manager,
+                    [
+                        "/main/department/",
+                        f"/main/department/{self.department.pk}/",
+                        "/main/department/?company=Acme&ordering=department_name",
+                    ],
+                ),
+                (
+                    self.employee_user,
+                    [
+                        "/main/employee/?page_size=2",
+                        f"/main/employee/{self.employees[0].pk}/",
+                        "/main/employee/?status=HIRED&company=Acme",
+                        "/main/employee/?department_id=1&ordering=-hired_on",
+                        "/main/employee/?days_employed_min=10&ordering=name",
+                    ],
+                ),
+            ):
+                self.login(user)
+                for url in urls:
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.assertIndexed(run)
+
+    def test_export_streams_in_primary_key_order(self):
+        self.login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            b"".join(self.client.get("/main/employee/export/").streaming_content)
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + queries[-1]["sql"])
+            plan = [row[-1] for row in cursor.fetchall()]
+        # The export reads every row by design, but must not sort them in a temp table.
+        self.assertIn("SCAN main_employee", plan)
+        self.assertFalse(any("TEMP B-TREE" in detail for detail in plan))
+
+    def test_write_endpoints_and_signals(self):
+        def run():
+            self.login(self.admin)
+            employee = self.employees[0]
+            data = {
+                "company": "Acme",
+                "department": self.other.department_name,
+                "status": "HIRED",
+                "name": "Moved",
+                "email": employee.email,
+                "mobile_number": "+123456789",
+                "address": "Street 1",
+                "designation": "Engineer",
+                "hired_on": "2024-01-01",
+            }
+            response = self.client.put(
+                f"/main/employee/{employee.pk}/", data, format="json"
+            )
+            self.assertEqual(response.status_code, 200)
+            data["email"] = "new@acme.com"
+            response = self.client.post("/main/employee/", data, format="json")
+            self.assertEqual(response.status_code, 201)
+            self.client.delete(f"/main/employee/{self.employees[1].pk}/")
+            self.client.delete(f"/main/department/{self.department.pk}/")
+            self.client.delete(f"/main/company/{self.company.pk}/")
+
+        self.assertIndexed(run)
+
+    def test_bulk_paths(self):
+        def run():
+            import_employees(
+                [
+                    "company,department,status,name,email,mobile_number,address,designation,hired_on",
+                    "Acme,Acme_HR,HIRED,Ann,ann@acme.com,+123456789,Street,Dev,2024-01-01",
+                ]
+            )
+            call_command("refresh_days_employed", stdout=StringIO())
+            recount_employees([self.company.pk], [self.department.pk])
+
+        self.assertIndexed(run)
+
+
+class FilterTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.acme = self.make_company()
+        self.globex = self.make_company("Globex")
+        self.hr = self.make_department(self.acme)
+        self.ops = self.make_department(self.globex, name="Ops")
+        self.hired = self.make_employees(self.acme, self.hr, 3)
+        self.applied = self.make_employees(
+            self.acme, self.hr, 2, status="APPLICATION_RECEIVED", start=3
+        )
+        self.make_employees(self.globex, self.ops, 2, start=5)
+        self.login(self.employee_user)
+
+    def ids(self, params):
+        response = self.client.get("/main/employee/", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["Employees"]]
+
+    def test_filters(self):
+        self.assertEqual(
+            self.ids({"status": "HIRED", "company": "Acme"}),
+            [employee.pk for employee in self.hired],
+        )
+        self.assertEqual(
+            self.ids({"company_id": self.acme.pk, "status": "APPLICATION_RECEIVED"}),
+            [employee.pk for employee in self.applied],
+        )
+        self.assertEqual(len(self.ids({"department": "Globex_Ops"})), 2)
+
+        Employee.objects.filter(pk=self.hired[0].pk).update(hired_on=date(2020, 1, 1))
+        days = (timezone.now().date() - date(2024, 1, 1)).days
+        self.assertEqual(
+            len(self.ids({"days_employed_min": days, "days_employed_max": days})), 4
+        )
+        self.assertEqual(self.ids({"days_employed_min": days + 1}), [self.hired[0].pk])
+        self.assertEqual(
+            self.ids({"hired_on_before": "2020-12-31"}), [self.hired[0].pk]
+        )
+
+    def test_invalid_filter_value(self):
+        response = self.client.get("/main/employee/", {"status": "RETIRED"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.data)
+
+    def test_ordering_pages_cover_every_row_once(self):
+        Employee.objects.filter(pk__in=[e.pk for e in self.hired[:2]]).update(
+            name="Same"
+        )
+        for ordering in ("name", "-name", "hired_on", "-hired_on", "bogus"):
+            url, ids = f"/main/employee/?page_size=2&ordering={ordering}", []
+            while url:
+                body = self.client.get(url).data
+                ids += [row["id"] for row in body["Employees"]]
+                url = body["next"]
+            self.assertEqual(
+                sorted(ids), sorted(Employee.objects.values_list("id", flat=True))
+            )
+            self.assertEqual(len(ids), len(set(ids)))
+        ordered = self.ids({"ordering": "-name", "page_size": 3})
+        self.assertEqual(
+            ordered,
+            list(
+                Employee.objects.order_by("-name", "-id").values_list("id", flat=True)[
+                    :3
+                ]
+            ),
+        )
+
+    def test_filtered_page_is_one_indexed_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.ids({"status": "HIRED", "company_id": self.acme.pk})
+        self.assertEqual(len(queries), 2)  # collection versions (ETag) + page
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + queries[-1]["sql"])
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("USING INDEX employee_company_status", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class EmployeeSearchTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.ann, self.bob, self.cy = self.make_employees(
+            self.company, self.department, 3
+        )
+        Employee.objects.filter(pk=self.ann.pk).update(name="Johanna Smith")
+        Employee.objects.filter(pk=self.bob.pk).update(address="12 Johanna Street")
+        self.login(self.employee_user)
+
+    def search(self, q, **params):
+        response = self.client.get("/main/employee/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def ids(self, q):
+        return [row["id"] for row in self.search(q).data["Employees"]]
+
+    def test_prefix_match_ranked_by_column_weight(self):
+        self.assertEqual(self.ids("joh"), [self.ann.pk, self.bob.pk])
+        self.assertEqual(self.ids("johanna smi"), [self.ann.pk])
+        self.assertEqual(self.ids(self.cy.email), [self.cy.pk])
+        self.assertEqual(self.ids('"OR NEAR( jo*'), [])  # Operators are not parsed.
+
+    def test_every_match_is_ranked_across_pages(self):
+        Employee.objects.filter(pk=self.cy.pk).update(name="Johanna Jones")
+        Employee.objects.filter(pk=self.ann.pk).update(
+            name="Ann Smith", designation="Johanna"
+        )
+        pages, url = [], "/main/employee/search/?q=johanna&page_size=1"
+        while url:
+            body = self.client.get(url).data
+            pages.append([row["id"] for row in body["Employees"]])
+            url = body["next"]
+        self.assertEqual(pages[0], [self.cy.pk])  # The name match has the highest id.
+        self.assertCountEqual(sum(pages, []), [self.ann.pk, self.bob.pk, self.cy.pk])
+
+    def test_index_follows_writes(self):
+        self.cy.name = "Zelda"
+        self.cy.save()
+        self.assertEqual(self.ids("zel"), [self.cy.pk])
+        self.ann.delete()
+        self.assertEqual(self.ids("johanna"), [self.bob.pk])
+        import_employees(
+            [
+                "company,department,status,name,email,mobile_number,address,designation,hired_on",
+                "Acme,Acme_HR,HIRED,Zed Imported,zed@acme.com,+123456789,Street,Dev,2024-01-01",
+            ]
+        )
+        self.assertEqual(len(self.ids("zed")), 1)
+
+    def test_pagination_and_errors(self):
+        response = self.search("employee", page_size=2)
+        self.assertEqual(len(response.data["Employees"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["Employees"]), 1)
+        self.assertIsNone(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+        self.assertEqual(self.client.get("/main/employee/search/").status_code, 400)
+        response = self.client.get("/main/employee/search/", {"q": "johanna s"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["q"], ["The last word must have at least 2 characters."]
+        )
+        response = self.client.get("/main/employee/search/", {"q": "jo", "page": 0})
+        self.assertEqual(response.status_code, 404)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO main_employee_fts(main_employee_fts) VALUES ('delete-all')"
+            )
+        self.assertEqual(self.ids("johanna"), [])
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 3 employees", out.getvalue())
+        self.assertEqual(self.ids("johanna"), [self.ann.pk, self.bob.pk])
+
+
+class SparseFieldsTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.employees = self.make_employees(self.company, self.department, 3)
+        self.login(self.employee_user)
+        self.headers = {
+            "Authorization": f"Token {Token.objects.create(user=self.employee_user)}"
+        }
+
+    def get_with_sql(self, path, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        employee_sql = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "main_employee"' in query["sql"]
+            and "updated_at" not in query["sql"]
+        ]
+        return response, employee_sql[-1]
+
+    def test_fields_trim_output_and_sql(self):
+        response, sql = self.get_with_sql(
+            "/main/employee/", {"fields": "id,name,status"}
+        )
+        self.assertEqual(list(response.data["Employees"][0]), ["id", "status", "name"])
+        self.assertNotIn("JOIN", sql)
+        self.assertNotIn('"address"', sql)
+        self.assertNotIn("days_employed", sql)
+
+        response, sql = self.get_with_sql(
+            f"/main/employee/{self.employees[0].pk}/", {"fields": "id,department"}
+        )
+        self.assertEqual(
+            response.data, {"id": self.employees[0].pk, "department": "Acme_HR"}
+        )
+        self.assertIn('JOIN "main_department"', sql)
+        self.assertNotIn('"main_company"', sql)
+
+    def test_exclude_and_ordering(self):
+        response, sql = self.get_with_sql(
+            "/main/employee/",
+            {"exclude": "address,mobile_number", "ordering": "-name", "page_size": 2},
+        )
+        row = response.data["Employees"][0]
+        self.assertNotIn("address", row)
+        self.assertEqual(row["days_employed"], self.employees[2].days_employed)
+        self.assertEqual(row["company"], "Acme")
+        self.assertNotIn('"mobile_number"', sql)
+        with self.assertNumQueries(2):  # cursor reads `name` without a deferred load
+            self.client.get(response.data["next"])
+
+    def test_other_endpoints(self):
+        response = self.client.get(
+            "/main/employee/search/", {"q": "employee", "fields": "name"}
+        )
+        self.assertEqual(
+            [list(row) for row in response.data["Employees"]], [["name"]] * 3
+        )
+        response = self.client.get(
+            "/main/async/employee/", {"fields": "id"}, headers=self.headers
+        )
+        self.assertEqual(response.json()["Employees"][0], {"id": self.employees[0].pk})
+        self.login(self.admin)
+        response = self.client.get(
+            "/main/employee/export/", {"fields": "id,name", "output": "csv"}
+        )
+        self.assertEqual(
+            b"".join(response.streaming_content).decode().splitlines()[0], "id,name"
+        )
+        response = self.client.get("/main/company/", {"exclude": "company_name"})
+        self.assertNotIn("company_name", response.data["Companies"][0])
+
+    def test_unknown_field(self):
+        response = self.client.get("/main/employee/", {"fields": "id,salary"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"fields": ["Unknown field(s): salary."]})
+        response = self.client.get(
+            "/main/async/employee/", {"exclude": "salary"}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("exclude", response.json())
+
+
+class FastListSerializationTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.make_employees(self.company, self.department, 3)
+        self.make_employees(
+            self.company, self.department, 2, status="APPLICATION_RECEIVED", start=3
+        )
+        response_cache.clear()
+
+    def assertSameBytes(self, user, path):
+        self.login(user)
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            expected = self.client.get(path)
+        response_cache.clear()
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
+
+    def test_lists_match_model_serializers(self):
+        for path in (
+            "/main/employee/",
+            "/main/employee/?fields=name,department&ordering=-hired_on&page_size=2",
+            "/main/employee/?exclude=days_employed,company",
+        ):
+            self.assertSameBytes(self.employee_user, path)
+        self.make_company("Globex")
+        for path in (
+            "/main/department/",
+            "/main/company/?fields=company_name&page_size=1",
+        ):
+            self.assertSameBytes(self.admin, path)
+
+
+class HeadcountTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.acme = self.make_company()
+        self.globex = self.make_company("Globex")
+        self.hr = self.make_department(self.acme)
+        self.it = self.make_department(self.acme, name="IT")
+        self.ops = self.make_department(self.globex, name="Ops")
+        self.hired = self.make_employees(self.acme, self.hr, 3)
+        self.applied = self.make_employees(
+            self.acme, self.it, 2, status="APPLICATION_RECEIVED", start=3
+        )
+        self.make_employees(self.globex, self.ops, 1, start=5)
+        self.login(self.manager)
+
+    def assertSummaryMatchesEmployees(self):
+        summary = {
+            (row.department_id, row.status): row.count
+            for row in HeadcountSummary.objects.filter(count__gt=0)
+        }
+        expected = {
+            (row["department_id"], row["status"]): row["count"]
+            for row in Employee.objects.values("department_id", "status").annotate(
+                count=Count("pk")
+            )
+        }
+        self.assertEqual(summary, expected)
+
+    def test_summary_follows_employee_writes(self):
+        self.assertSummaryMatchesEmployees()
+        employee = self.applied[0]
+        employee.status = "INTERVIEW_SCHEDULED"
+        employee.save()
+        self.assertSummaryMatchesEmployees()
+        employee.department = self.hr
+        employee.save()
+        self.assertSummaryMatchesEmployees()
+        self.hired[0].delete()
+        self.assertSummaryMatchesEmployees()
+        import_employees(
+            [
+                "company,department,status,name,email,mobile_number,address,designation,hired_on",
+                "Globex,Globex_Ops,NOT_ACCEPTED,Zed,zed@globex.com,+123456789,Street,Dev,",
+            ]
+        )
+        self.assertSummaryMatchesEmployees()
+        self.it.delete()
+        self.assertSummaryMatchesEmployees()
+
+    def test_pivot_by_company_and_department(self):
+        with self.assertNumQueries(2):  # collection versions (ETag) + aggregate
+            response = self.client.get("/main/analytics/headcount/")
+        self.assertEqual(response.status_code, 200)
+        acme, globex = response.data["Headcount"]
+        self.assertEqual(acme["company"], "Acme")
+        self.assertEqual(
+            acme["counts"],
+            {
+                "APPLICATION_RECEIVED": 2,
+                "INTERVIEW_SCHEDULED": 0,
+                "HIRED": 3,
+                "NOT_ACCEPTED": 0,
+            },
+        )
+        self.assertEqual((acme["total"], globex["total"]), (5, 1))
+        self.assertEqual(response.data["totals"]["HIRED"], 4)
+
+        response = self.client.get(
+            "/main/analytics/headcount/",
+            {"group_by": "department", "company_id": self.acme.pk},
+        )
+        self.assertEqual(
+            [(row["department"], row["total"]) for row in response.data["Headcount"]],
+            [("Acme_HR", 3), ("Acme_IT", 2)],
+        )
+        response = self.client.get("/main/analytics/headcount/", {"group_by": "x"})
+        self.assertEqual(response.status_code, 400)
+        self.login(self.employee_user)
+        response = self.client.get("/main/analytics/headcount/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_pivot_follows_a_department_moved_to_another_company(self):
+        self.login(self.admin)
+        response = self.client.put(
+            f"/main/department/{self.it.pk}/",
+            {"company": "Globex", "department_name": "IT"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(audit_counts()[1], [])
+        self.login(self.manager)
+        response = self.client.get("/main/analytics/headcount/")
+        acme, globex = response.data["Headcount"]
+        self.assertEqual((acme["total"], globex["total"]), (3, 3))
+        self.assertEqual(globex["counts"]["APPLICATION_RECEIVED"], 2)
+
+
+class EmployeeTransitionTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.interviewed = self.make_employees(
+            self.company, self.department, 5, status="INTERVIEW_SCHEDULED"
+        )
+        self.hired = self.make_employees(self.company, self.department, 1, start=5)
+        self.login(self.manager)
+
+    def transition(self, ids, status, **data):
+        return self.client.post(
+            "/main/employee/transition/",
+            {"ids": ids, "status": status, **data},
+            format="json",
+        )
+
+    def headcounts(self):
+        return dict(
+            HeadcountSummary.objects.filter(count__gt=0).values_list("status", "count")
+        )
+
+    def test_batch_is_moved_with_constant_queries(self):
+        ids = [employee.pk for employee in self.interviewed]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.transition(ids[:2], "HIRED", hired_on="2024-01-01")
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(len(queries)):
+            self.transition(ids[2:], "HIRED", hired_on="2024-01-01")
+
+        employee = Employee.objects.get(pk=ids[0])
+        self.assertEqual(
+            (employee.status, employee.hired_on), ("HIRED", date(2024, 1, 1))
+        )
+        self.assertEqual(employee.days_employed, employee.calculate_days_employed())
+        self.assertEqual(self.headcounts(), {"HIRED": 6})
+        self.department.refresh_from_db()
+        self.assertEqual(self.department.no_of_employees, 6)
+
+    def test_invalid_transitions_are_reported(self):
+        ids = [self.interviewed[0].pk, self.hired[0].pk, 999999]
+        response = self.transition(ids, "NOT_ACCEPTED")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["succeeded"], [self.interviewed[0].pk])
+        self.assertEqual([entry["id"] for entry in response.data["failed"]], ids[1:])
+        self.assertEqual(
+            self.headcounts(),
+            {"INTERVIEW_SCHEDULED": 4, "NOT_ACCEPTED": 1, "HIRED": 1},
+        )
+        self.assertEqual(
+            self.transition(ids[1:], "HIRED", hired_on="2024-01-01").status_code, 400
+        )
+
+        response = self.transition([self.interviewed[1].pk], "HIRED")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("hired_on", response.data)
+        response = self.transition(
+            [self.interviewed[1].pk], "HIRED", hired_on="2999-01-01"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["hired_on"], ["The hire date cannot be in the future."]
+        )
+        self.interviewed[1].refresh_from_db()
+        self.assertEqual(self.interviewed[1].status, "INTERVIEW_SCHEDULED")
+        self.login(self.employee_user)
+        self.assertEqual(self.transition(ids, "NOT_ACCEPTED").status_code, 403)
+
+
+class EmployeePatchTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.make_company()
+        self.hr = self.make_department(self.company)
+        self.it = self.make_department(self.company, name="IT")
+        self.employees = self.make_employees(self.company, self.hr, 3)
+        self.login(self.manager)
+
+    def updates(self, queries, table):
+        return [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(f'UPDATE "{table}"')
+        ]
+
+    def test_patch_writes_changed_columns_only(self):
+        employee = self.employees[0]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f"/main/employee/{employee.pk}/", {"designation": "CTO"}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["employee"]["designation"], "CTO")
+        (update,) = self.updates(queries, "main_employee")
+        self.assertIn('SET "designation" = ', update)
+        self.assertNotIn('"name"', update)
+        self.assertEqual(self.updates(queries, "main_department"), [])
+        self.assertEqual(self.updates(queries, "main_company"), [])
+
+        response = self.client.patch(
+            f"/main/employee/{employee.pk}/", {"department": "Acme_IT"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.it.refresh_from_db()
+        self.assertEqual(self.it.no_of_employees, 1)
+
+        other = self.make_department(self.make_company("Globex"), name="Ops")
+        response = self.client.patch(
+            f"/main/employee/{employee.pk}/",
+            {"department": other.department_name},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_patch_groups_updates_by_field_set(self):
+        first, second, third = self.employees
+        rows = [
+            {"id": first.pk, "designation": "Lead"},
+            {"id": second.pk, "designation": "Lead"},
+            {"id": third.pk, "department": "Acme_IT", "status": "NOT_ACCEPTED"},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch("/main/employee/", rows, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["updated"], [first.pk, second.pk, third.pk])
+        self.assertEqual(len(self.updates(queries, "main_employee")), 2)
+
+        third.refresh_from_db()
+        self.assertEqual(
+            (third.department_id, third.status), (self.it.pk, "NOT_ACCEPTED")
+        )
+        self.assertIsNone(third.days_employed)
+        self.assertEqual(
+            dict(Department.objects.values_list("department_name", "no_of_employees")),
+            {"Acme_HR": 2, "Acme_IT": 1},
+        )
+        self.assertEqual(
+            HeadcountSummary.objects.get(
+                department=self.it, status="NOT_ACCEPTED"
+            ).count,
+            1,
+        )
+
+    def test_bulk_patch_is_all_or_nothing(self):
+        rows = [
+            {"id": self.employees[0].pk, "designation": "Lead"},
+            {"id": self.employees[1].pk, "status": "RETIRED"},
+            {"id": 999999, "name": "Ghost"},
+        ]
+        response = self.client.patch("/main/employee/", rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [entry["id"] for entry in response.data["errors"]], [rows[1]["id"], 999999]
+        )
+        self.assertFalse(Employee.objects.filter(designation="Lead").exists())
+        response = self.client.patch("/main/employee/", {"id": 1}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_patch_validates_the_hire_date_against_the_stored_row(self):
+        hired = self.employees[0]
+        (applicant,) = self.make_employees(
+            self.company, self.hr, 1, status="APPLICATION_RECEIVED", start=3
+        )
+        future = ["The hire date cannot be in the future."]
+        missing = ["A hire date must be provided if the status is 'Hired'."]
+        for pk, body, errors in [
+            (hired.pk, {"hired_on": "2099-01-01"}, future),
+            (hired.pk, {"hired_on": None}, missing),
+            (applicant.pk, {"status": "HIRED"}, missing),
+        ]:
+            response = self.client.patch(f"/main/employee/{pk}/", body, format="json")
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data["hired_on"], errors)
+
+        rows = [
+            {"id": hired.pk, "hired_on": "2099-01-01"},
+            {"id": applicant.pk, "status": "HIRED"},
+        ]
+        response = self.client.patch("/main/employee/", rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [entry["errors"]["hired_on"] for entry in response.data["errors"]],
+            [future, missing],
+        )
+        applicant.refresh_from_db()
+        self.assertEqual(applicant.status, "APPLICATION_RECEIVED")
+
+    def test_bulk_patch_rejects_duplicate_emails_in_the_batch(self):
+        first, second, third = self.employees
+        rows = [
+            {"id": first.pk, "email": "same@acme.com"},
+            {"id": second.pk, "designation": "Lead"},
+            {"id": third.pk, "email": "same@acme.com"},
+        ]
+        response = self.client.patch("/main/employee/", rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "id": pk,
+                    "errors": {
+                        "email": ["Another row of this request sets the same email."]
+                    },
+                }
+                for pk in (first.pk, third.pk)
+            ],
+        )
+        self.assertFalse(Employee.objects.filter(email="same@acme.com").exists())
+
+
+class CascadeDeleteTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.acme = self.make_company()
+        self.hr = self.make_department(self.acme)
+        self.it = self.make_department(self.acme, name="IT")
+        self.make_employees(self.acme, self.hr, 4)
+        self.make_employees(self.acme, self.it, 3, start=4)
+        self.globex = self.make_company("Globex")
+        self.ops = self.make_department(self.globex, name="Ops")
+        self.make_employees(self.globex, self.ops, 2, start=7)
+
+    def counter_updates(self, queries):
+        return [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(
+                ('UPDATE "main_company"', 'UPDATE "main_department"')
+            )
+        ]
+
+    def test_orm_cascade_skips_counters_of_deleted_parents(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.acme.delete()
+        self.assertEqual(self.counter_updates(queries), [])
+        self.assertEqual(Employee.objects.count(), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.ops.delete()
+        self.assertFalse(
+            any("main_department" in sql for sql in self.counter_updates(queries))
+        )
+        self.globex.refresh_from_db()
+        self.assertEqual((self.globex.no_of_deps, self.globex.no_of_employees), (0, 0))
+
+    def test_chunked_company_delete(self):
+        progress = []
+        deleted = delete_company(
+            self.acme.pk, chunk_size=3, progress=lambda *args: progress.append(args)
+        )
+        self.assertEqual(deleted, 7)
+        self.assertEqual(progress, [(3, 7), (6, 7), (7, 7)])
+        self.assertFalse(Company.objects.filter(pk=self.acme.pk).exists())
+        self.assertFalse(Department.objects.filter(company_id=self.acme.pk).exists())
+        self.assertFalse(
+            HeadcountSummary.objects.filter(
+                department__company_id=self.acme.pk
+            ).exists()
+        )
+        self.assertEqual(Employee.objects.count(), 2)
+        self.globex.refresh_from_db()
+        self.assertEqual(self.globex.no_of_employees, 2)
+
+    def test_chunked_department_delete_adjusts_company(self):
+        self.assertEqual(delete_department(self.hr.pk, chunk_size=3), 4)
+        self.acme.refresh_from_db()
+        self.assertEqual((self.acme.no_of_deps, self.acme.no_of_employees), (1, 3))
+        self.assertFalse(
+            HeadcountSummary.objects.filter(department_id=self.hr.pk).exists()
+        )
+
+    def test_delete_endpoint_runs_in_one_transaction(self):
+        def fail_on_departments(*names):
+            if names[0] == "department":
+                raise OperationalError("database is locked")
+
+        self.login(self.admin)
+        with mock.patch("main.signals.bump_versions", side_effect=fail_on_departments):
+            with self.assertRaises(OperationalError):
+                self.client.delete(f"/main/company/{self.acme.pk}/")
+        self.assertEqual(Employee.objects.filter(company=self.acme).count(), 7)
+        self.assertEqual(audit_counts()[1], [])
+
+    @override_settings(BACKGROUND_JOBS={"EAGER": True})
+    def test_background_delete_reports_progress(self):
+        self.login(self.admin)
+        response = self.client.delete(f"/main/company/{self.acme.pk}/?background=true")
+        self.assertEqual(response.status_code, 202)
+        job = self.client.get(response.data["url"]).data
+        self.assertEqual(
+            (job["status"], job["done"], job["total"], job["result"]),
+            ("succeeded", 7, 7, 7),
+        )
+        self.assertEqual(self.client.get("/main/jobs/unknown/").status_code, 404)
+        response = self.client.delete(f"/main/department/{self.ops.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(Employee.objects.count(), 0)
+
+
+class ReconcileCountsTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.acme = self.make_company()
+        self.hr = self.make_department(self.acme)
+        self.make_employees(self.acme, self.hr, 3)
+        self.globex = self.make_company("Globex")
+        self.ops = self.make_department(self.globex, name="Ops")
+        self.make_employees(self.globex, self.ops, 2, start=3)
+
+    def reconcile(self, *args):
+        out = StringIO()
+        call_command("reconcile_counts", *args, stdout=out)
+        return out.getvalue()
+
+    def drift(self):
+        Company.objects.filter(pk=self.acme.pk).update(no_of_deps=5, no_of_employees=9)
+        Department.objects.filter(pk=self.ops.pk).update(no_of_employees=0)
+        HeadcountSummary.objects.filter(department=self.hr).update(count=1)
+
+    def test_dry_run_reports_without_fixing(self):
+        self.drift()
+        output = self.reconcile("--dry-run")
+        self.assertIn(
+            f"company {self.acme.pk} no_of_employees: stored 9, actual 3", output
+        )
+        self.assertIn("4 discrepancies, 0 fixed", output)
+        self.acme.refresh_from_db()
+        self.assertEqual(self.acme.no_of_employees, 9)
+        run = CountReconciliation.objects.get()
+        self.assertEqual((run.dry_run, run.discrepancies, run.fixed), (True, 4, 0))
+
+    def test_repairs_all_counters(self):
+        self.drift()
+        self.assertIn("4 discrepancies, 4 fixed", self.reconcile())
+        self.acme.refresh_from_db()
+        self.ops.refresh_from_db()
+        self.assertEqual((self.acme.no_of_deps, self.acme.no_of_employees), (1, 3))
+        self.assertEqual(self.ops.no_of_employees, 2)
+        self.assertEqual(
+            HeadcountSummary.objects.get(department=self.hr, status="HIRED").count, 3
+        )
+        self.assertIn("0 discrepancies", self.reconcile())
+
+    def test_repair_keeps_writes_made_after_the_audit(self):
+        self.drift()
+        _, discrepancies = audit_counts()
+        # Written after the audit: the repair must count them.
+        self.make_employees(self.globex, self.ops, 1, start=5)
+        Employee.objects.filter(department=self.hr).first().delete()
+        self.assertEqual(repair_counts(discrepancies), 4)
+        self.acme.refresh_from_db()
+        self.ops.refresh_from_db()
+        self.assertEqual((self.acme.no_of_deps, self.acme.no_of_employees), (1, 2))
+        self.assertEqual(self.ops.no_of_employees, 3)
+        self.assertEqual(
+            HeadcountSummary.objects.get(department=self.hr, status="HIRED").count, 2
+        )
+        self.assertEqual(audit_counts()[1], [])
+
+    def test_incremental_checks_touched_parents_only(self):
+        self.reconcile()
+        CountReconciliation.objects.update(started_at=timezone.now())
+        self.drift()
+        self.make_employees(self.globex, self.ops, 1, start=5)
+        output = self.reconcile("--incremental")
+        self.assertIn(
+            f"department {self.ops.pk} no_of_employees: stored 1, actual 3", output
+        )
+        self.assertNotIn(f"company {self.acme.pk}", output)
+        self.assertIn("1 discrepancies, 1 fixed", output)
+
+
+class BenchmarkTests(TestCase):
+    def test_seeded_dataset_is_deterministic_and_counted(self):
+        self.assertEqual(
+            seed_dataset(2, 6, 60, seed=7),
+            {"companies": 2, "departments": 6, "employees": 60},
+        )
+        first = list(Employee.objects.values_list("name", "status", "hired_on"))
+        self.assertEqual(audit_counts()[1], [])
+        Company.objects.all().delete()
+        seed_dataset(2, 6, 60, seed=7)
+        self.assertEqual(
+            list(Employee.objects.values_list("name", "status", "hired_on")), first
+        )
+
+    def test_seeded_rows_are_searchable_and_match_across_workers(self):
+        seed_dataset(2, 4, 40, seed=3, chunk_size=7)
+        rows = list(Employee.objects.values_list("name", "status", "hired_on"))
+        name = rows[0][0].split()[0]
+        self.assertEqual(
+            set(search_employee_ids(build_match(name))),
+            set(
+                Employee.objects.filter(name__startswith=name).values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        # The deferred trigger is back: new rows are indexed as they are created.
+        department = Department.objects.first()
+        employee = Employee.objects.create(
+            company_id=department.company_id,
+            department=department,
+            status="APPLICATION_RECEIVED",
+            name="Zoltan Quimby",
+            email="zq@example.com",
+            mobile_number="+10000000000",
+            address="1 Main Street",
+            designation="Engineer",
+        )
+        self.assertEqual(search_employee_ids(build_match("quimby")), [employee.pk])
+        self.assertEqual(audit_counts()[1], [])
+        employee.delete()
+        Company.objects.all().delete()
+        seed_dataset(2, 4, 40, seed=3, chunk_size=7, workers=2)
+        self.assertEqual(
+            list(Employee.objects.values_list("name", "status", "hired_on")), rows
+        )
+
+    def test_operations_cover_every_route(self):
+        routes = {
+            name
+            for name in get_resolver("main.urls").reverse_dict
+            if isinstance(name, str)
+        }
+        self.assertLessEqual(routes, {operation.route for operation in OPERATIONS})
+
+    @override_settings(
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+        BACKGROUND_JOBS={"EAGER": True},
+    )
+    def test_every_operation_succeeds(self):
+        seed_dataset(2, 4, 20)
+        context = BenchmarkContext()
+        for operation in OPERATIONS:
+            result = run_operation(operation, context, iterations=2)
+            self.assertEqual(result["errors"], 0, operation.name)
+            self.assertGreater(result["ops_per_sec"], 0)
+
+
+@override_settings(REQUEST_TIMING={"SAMPLE_RATE": 1, "REPEATED_QUERY_THRESHOLD": 5})
+class RequestTimingTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.company = self.make_company()
+        self.department = self.make_department(self.company)
+        self.make_employees(self.company, self.department, 5)
+        self.headers = {
+            "Authorization": f"Token {Token.objects.create(user=self.employee_user)}"
+        }
+
+    def test_sampled_request_sends_server_timing_and_logs(self):
+        with self.assertLogs("main.timing", "INFO") as logs:
+            response = self.client.get("/main/employee/", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        metrics = [
+            metric.split(";")[0] for metric in response["Server-Timing"].split(", ")
+        ]
+        self.assertEqual(metrics, ["db", "auth", "serializer", "view"])
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, "INFO")
+        self.assertEqual(record["view"], "main:employee-list")
+        self.assertEqual(record["queries"], 3)  # token + versions + employees
+        self.assertNotIn("repeated_queries", record)
+
+    def test_repeated_queries_are_flagged_with_their_sql(self):
+        def view(request):
+            names = [e.department.department_name for e in Employee.objects.all()]
+            return HttpResponse(", ".join(names))
+
+        middleware = RequestTimingMiddleware(view)
+        with self.assertLogs("main.timing", "WARNING") as logs:
+            response = middleware(RequestFactory().get("/main/employee/"))
+        self.assertIn('desc="6 queries, 5 repeated"', response["Server-Timing"])
+        (repeated,) = json.loads(logs.records[0].getMessage())["repeated_queries"]
+        self.assertEqual(repeated["count"], 5)
+        self.assertIn('FROM "main_department"', repeated["sql"])
+
+    @override_settings(REQUEST_TIMING={"SAMPLE_RATE": 0})
+    def test_unsampled_request_is_not_recorded(self):
+        with self.assertNoLogs("main.timing"):
+            response = self.client.get("/main/employee/", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+    async def test_async_view_queries_are_recorded(self):
+        with self.assertLogs("main.timing", "INFO") as logs:
+            response = await self.async_client.get(
+                "/main/async/employee/", headers=self.headers
+            )
+        self.assertEqual(response.status_code, 200)
+        # token + employees, run by the ORM in another thread
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+        self.assertEqual(json.loads(logs.records[0].getMessage())["queries"], 2)
@@ -0,0 +1,247 @@
+"""
+Per-request instrumentation: SQL queries, database, auth, serializer and view time.
+
+`RequestTimingMiddleware` samples a share of the requests
+(`REQUEST_TIMING["SAMPLE_RATE"]`). For a sampled request it records the
+number and duration of the SQL queries, the time spent authenticating and
+serializing, and the time of the view. The totals are sent back in a
+`Server-Timing` header and logged as one JSON line on the `main.timing`
+logger. Identical SQL run `REPEATED_QUERY_THRESHOLD` times or more in one
+request, the usual sign of an N+1 pattern, is logged as a warning with the
+offending statement.
+
+The request being recorded is held in a context variable, so the queries of
+the async views, run by the ORM in another thread, are counted too. Every
+connection gets `record_query` as an execute wrapper when it is opened; on
+requests that are not sampled it only reads the context variable. The
+settings are read once, when the middleware is created.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+######################################################################
+
+
+######################################################################
+############################ T I M I N G #############################
+######################################################################
+
+logger = logging.getLogger("main.timing")
+
+# The RequestTiming of the request being recorded, if it is sampled.
+current_timing = ContextVar("current_timing", default=None)
+
+
+def timing_settings():
+    return {
+        "SAMPLE_RATE": 0.0,
+        "REPEATED_QUERY_THRESHOLD": 5,
+        **getattr(settings, "REQUEST_TIMING", {}),
+    }
+
+
+class RequestTiming:
+    """
+    The queries and timers of one request.
+
+    Durations are in seconds. `statements` maps every distinct SQL statement
+    to its number of executions and total duration.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = {}
+        self.timers = {}
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        entry = self.statements.get(sql)
+        if entry is None:
+            self.statements[sql] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+
+    def add_time(self, name, duration):
+        self.timers[name] = self.timers.get(name, 0.0) + duration
+
+    def repeated(self, threshold):
+        """
+        List the statements run at least `threshold` times, most repeated first.
+
+        Args:
+            threshold (int): The minimum number of executions.
+
+        Returns:
+            list: `{"sql", "count", "ms"}` dicts.
+        """
+        return [
+            {"sql": sql, "count": count, "ms": round(duration * 1000, 3)}
+            for sql, (count, duration) in sorted(
+                self.statements.items(), key=lambda item: -item[1][0]
+            )
+            if count >= threshold
+        ]
+
+    def server_timing(self, repeated):
+        """
+        Format the `Server-Timing` header value.
+
+        Args:
+            repeated (list): The repeated statements, from `repeated()`.
+
+        Returns:
+            str: One metric per timer, durations in milliseconds.
+        """
+        description = f"{self.queries} queries"
+        if repeated:
+            description += f", {sum(row['count'] for row in repeated)} repeated"
+        metrics = [f'db;dur={self.db_time * 1000:.3f};desc="{description}"']
+        metrics += [
+            f"{name};dur={duration * 1000:.3f}"
+            for name, duration in self.timers.items()
+        ]
+        return ", ".join(metrics)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper adding the query to the request being recorded, if any.
+    """
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(sql, time.perf_counter() - started)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """
+    `connection_created` receiver installing `record_query` on the connection.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class timed:
+    """
+    Context manager adding the duration of its block to the timer `name` of the
+    recorded request.
+
+    Does nothing when the request is not sampled.
+
+    Args:
+        name (str): The timer, e.g. `serializer` or `auth`.
+    """
+
+    __slots__ = ("name", "timing", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.timing = current_timing.get()
+        if self.timing is not None:
+            self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.timing is not None:
+            self.timing.add_time(self.name, time.perf_counter() - self.started)
+
+
+class RequestTimingMiddleware:
+    """
+    Record a share of the requests and report their queries and timers.
+
+    Place it last in MIDDLEWARE, so that `view` is the time of the view and
+    the response rendering only.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = timing_settings()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        timing.add_time("view", time.perf_counter() - started)
+        self.report(request, response, timing)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        timing.add_time("view", time.perf_counter() - started)
+        self.report(request, response, timing)
+        return response
+
+    def sampled(self):
+        rate = self.config["SAMPLE_RATE"]
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def report(self, request, response, timing):
+        """
+        Set the `Server-Timing` header and log the request.
+
+        Args:
+            request (HttpRequest): The request.
+            response (HttpResponse): Its response.
+            timing (RequestTiming): What was recorded.
+        """
+        repeated = timing.repeated(self.config["REPEATED_QUERY_THRESHOLD"])
+        response["Server-Timing"] = timing.server_timing(repeated)
+        match = request.resolver_match
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match is not None else None,
+            "status": response.status_code,
+            "queries": timing.queries,
+            "db_ms": round(timing.db_time * 1000, 3),
+            **{
+                f"{name}_ms": round(duration * 1000, 3)
+                for name, duration in timing.timers.items()
+            },
+        }
+        if repeated:
+            record["repeated_queries"] = repeated
+            logger.warning(json.dumps(record), extra={"request_timing": record})
+        else:
+            logger.info(json.dumps(record), extra={"request_timing": record})
@@ -0,0 +1,94 @@
+"""
+Bulk status transitions of Employees through the hiring pipeline.
+
+A batch of Employees is moved to a new status stage in one transaction: the
+current stages are read with one query, each Employee is checked against
+`Employee.transitions`, the allowed ones are updated with a single set-based
+UPDATE, and the headcounts are adjusted once per department and previous
+stage instead of through the per-row signals.
+
+Author: Abdelmasry
+"""
+
+######################################################################
+########################## I M P O R T S #############################
+######################################################################
+from collections import Counter
+from django.db import transaction
+from django.utils import timezone
+from .cache import bump_versions
+from .counters import adjust_headcount
+from .models import Employee
+
+######################################################################
+
+
+######################################################################
+###################### T R A N S I T I O N S #########################
+######################################################################
+
+
+def transition_employees(ids, status, hired_on=None):
+    """
+    Move Employees to a new status stage.
+
+    Employees whose current stage cannot move to `status` are left unchanged and
+    reported as failed, as are unknown ids; the others are all updated.
+
+    Args:
+        ids (list): Primary keys of the Employees to move.
+        status (str): The new status stage.
+        hired_on (date, optional): The hire date, required when moving to "HIRED".
+
+    Returns:
+        dict: The moved ids (`succeeded`) and one `{"id": pk, "errors": [...]}`
+        entry per Employee that was not moved (`failed`).
+
+    Raises:
+        ValueError: If `status` is "HIRED" and no `hired_on` is given, or if
+            `hired_on` is in the future.
+    """
+    if status == "HIRED" and not hired_on:
+        raise ValueError("A hire date must be provided if the status is 'Hired'.")
+    if hired_on and hired_on > timezone.now().date():
+        raise ValueError("The hire date cannot be in the future.")
+
+    ids = list(dict.fromkeys(ids))
+    succeeded, failed, moved = [], [], Counter()
+    with transaction.atomic():
+        current = {
+            pk: (department_id, previous)
+            for pk, department_id, previous in Employee.objects.filter(
+                pk__in=ids
+            ).values_list("id", "department_id", "status")
+        }
+        for pk in ids:
+            if pk not in current:
+                failed.append({"id": pk, "errors": ["Employee not found."]})
+                continue
+            department_id, previous = current[pk]
+            if status not in Employee.transitions[previous]:
+                failed.append(
+                    {"id": pk, "errors": [f"Cannot move from {previous} to {status}."]}
+                )
+                continue
+            succeeded.append(pk)
+            moved[department_id, previous] += 1
+
+        if succeeded:
+            changes = {"status": status, "updated_at": timezone.now()}
+            if status == "HIRED":
+                changes["hired_on"] = hired_on
+                changes["days_employed"] = (timezone.now().date() - hired_on).days
+            else:
+                changes["days_employed"] = None
+            Employee.objects.filter(pk__in=succeeded).update(**changes)
+
+            for (department_id, previous), count in moved.items():
+                adjust_headcount(department_id, previous, -count)
+                adjust_headcount(department_id, status, count)
+            bump_versions("employee")
+    return {"succeeded": succeeded, "failed": failed}
+
+
+######################################################################
@@ -3,8 +3,16 @@ from .views import (
     CompanyAPIView,
     DepartmentAPIView,
     EmployeeAPIView,
+    EmployeeExportAPIView,
+    EmployeeImportAPIView,
+    EmployeeSearchAPIView,
+    EmployeeTransitionAPIView,
+    HeadcountAPIView,
+    JobAPIView,
+    StatsAPIView,
     UserAccountsView,
 )
+from .async_views import AsyncCompanyView, AsyncDepartmentView, AsyncEmployeeView
 from rest_framework.authtoken.views import obtain_auth_token
 
 app_name = "main"
@@ -16,7 +24,44 @@ urlpatterns = [
     path("department/<int:pk>/", DepartmentAPIView.as_view(), name="department-detail"),
     path("employee/", EmployeeAPIView.as_view(), name="employee-list"),
     path("employee/<int:pk>/", EmployeeAPIView.as_view(), name="employee-detail"),
+    path("employee/import/", EmployeeImportAPIView.as_view(), name="employee-import"),
+    path("employee/export/", EmployeeExportAPIView.as_view(), name="employee-export"),
+    path("employee/search/", EmployeeSearchAPIView.as_view(), name="employee-search"),
+    path(
+        "employee/transition/",
+        EmployeeTransitionAPIView.as_view(),
+        name="employee-transition",
+    ),
     path("user/", UserAccountsView.as_view(), name="user-list"),
     path("user/<int:id>/", UserAccountsView.as_view(), name="user-detail"),
     path("token/", obtain_auth_token, name="api_token_auth"),
+    path("stats/", StatsAPIView.as_view(), name="stats"),
+    path("jobs/<str:job_id>/", JobAPIView.as_view(), name="job-detail"),
+    path(
+        "analytics/headcount/",
+        HeadcountAPIView.as_view(),
+        name="analytics-headcount",
+    ),
+    path("async/company/", AsyncCompanyView.as_view(), name="async-company-list"),
+    path(
+        "async/company/<int:pk>/",
+        AsyncCompanyView.as_view(),
+        name="async-company-detail",
+    ),
+    path(
+        "async/department/",
+        AsyncDepartmentView.as_view(),
+        name="async-department-list",
+    ),
+    path(
+        "async/department/<int:pk>/",
+        AsyncDepartmentView.as_view(),
+        name="async-department-detail",
+    ),
+    path("async/employee/", AsyncEmployeeView.as_view(), name="async-employee-list"),
+    path(
+        "async/employee/<int:pk>/",
+        AsyncEmployeeView.as_view(),
+        name="async-employee-detail",
+    ),
 ]
@@ -10,18 +10,36 @@ Author: Abdelmasry
 ######################################################################
 ########################## I M P O R T S #############################
 ######################################################################
-from django.http import Http404
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from rest_framework.response import Response
 from rest_framework import status, exceptions
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework.views import APIView
+from django_filters import rest_framework as filters
 from rest_framework.permissions import IsAuthenticated
 from .permissions import IsAdminUser, IsManagerUser, IsEmployeeUser
+from .pagination import IdCursorPagination, RankedPagination
+from .analytics import GROUPINGS, headcount_pivot
+from .bulk_patch import MAX_PATCH_ROWS, bulk_patch_employees, validate_patches
+from .importers import IMPORT_FORMATS, import_employees
+from .exporters import EXPORT_FORMATS, export_employees
+from .deletion import delete_company, delete_department
+from .jobs import get_job, start_job
+from .search import build_match, search_employee_ids
+from .transitions import transition_employees
+from .authentication import token_cache
+from .cache import cached_get, response_cache
+from .conditional import conditional_get
+from .fast_serializers import ValuesListSerializer, fast_list_serialization
+from .filters import DepartmentFilter, EmployeeFilter, FilteredListMixin
 from .models import Company, Department, Employee, UserAccounts
 from .serializers import (
     CompanySerializer,
     DepartmentSerializer,
     EmployeeSerializer,
+    EmployeeTransitionSerializer,
     UserAccountsSerializer,
 )
 
@@ -33,6 +51,34 @@ from .serializers import (
 ######################################################################
 
 
+class BackgroundJobMixin:
+    """
+    Answer a request with the background job it started.
+    """
+
+    def job_response(self, request, job_id):
+        """
+        Build the HTTP 202 response of a started job.
+
+        Args:
+            request (Request): The HTTP request.
+            job_id (str): The job id.
+
+        Returns:
+            Response: HTTP 202 response containing the job id and the URL to poll.
+        """
+        return Response(
+            {
+                "status": "accepted",
+                "job": job_id,
+                "url": request.build_absolute_uri(
+                    reverse("main:job-detail", args=[job_id])
+                ),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
 class UserAccountsView(APIView):
     """
     A view for creating, retrieving, updating, and deleting UserAccounts instances.
@@ -41,11 +87,13 @@ class UserAccountsView(APIView):
     """
 
     serializer_class = UserAccountsSerializer
+    pagination_class = IdCursorPagination
     permission_classes = [IsAuthenticated, IsAdminUser]
 
+    @conditional_get("user", model=UserAccounts, collections=("user",))
     def get(self, request, id=None):
         """
-        Retrieve a single UserAccounts instance or a list of all UserAccounts instances.
+        Retrieve a single UserAccounts instance or a page of UserAccounts instances, ordered by id.
 
         Args:
             request (Request): The HTTP request.
@@ -54,16 +102,19 @@ class UserAccountsView(APIView):
         Returns:
             Response: HTTP response containing UserAccounts data.
         """
+        fields = UserAccountsSerializer.requested_fields(request)
+        queryset = UserAccountsSerializer.prune_queryset(
+            UserAccounts.objects.all(), fields
+        )
         if id:
-            user = get_object_or_404(UserAccounts, pk=id)
-            serializer = UserAccountsSerializer(user)
+            user = get_object_or_404(queryset, pk=id)
+            serializer = UserAccountsSerializer(user, fields=fields)
             return Response(serializer.data)
         else:
-            queryset = UserAccounts.objects.all()
-            serializers = UserAccountsSerializer(queryset, many=True)
-            return Response(
-                {"status": "success", "Users": serializers.data}, status=200
-            )
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializers = UserAccountsSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializers.data, "Users")
 
     def post(self, request):
         """
@@ -109,7 +160,7 @@ class UserAccountsView(APIView):
         serializer.save()
 
 
-class CompanyAPIView(APIView):
+class CompanyAPIView(BackgroundJobMixin, APIView):
     """
     A view for viewing and editing Company instances.
 
@@ -122,32 +173,44 @@ class CompanyAPIView(APIView):
 
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
+    pagination_class = IdCursorPagination
     permission_classes = [
         IsAuthenticated,
         IsAdminUser,
     ]  # Only admin users can access this view
 
+    @conditional_get("company", model=Company)
+    @cached_get("company")
     def get(self, request, pk=None):
         """
-        Retrieve a single Company instance or a list of all Company instances.
+        Retrieve a single Company instance or a page of Company instances, ordered by id.
 
         Args:
             request (Request): The HTTP request.
             pk (int, optional): The primary key of the Company instance to retrieve. Defaults to None.
 
         Returns:
-            Response: HTTP response containing Company data.
+            Response: HTTP response containing Company data, served from the
+            response cache while no Company, Department or Employee write has committed.
         """
+        fields = CompanySerializer.requested_fields(request)
+        queryset = CompanySerializer.prune_queryset(Company.objects.all(), fields)
         if pk:
-            company = get_object_or_404(Company, pk=pk)
-            serializer = CompanySerializer(company)
+            company = get_object_or_404(queryset, pk=pk)
+            serializer = CompanySerializer(company, fields=fields)
             return Response(serializer.data)
         else:
-            queryset = Company.objects.all()
-            serializers = CompanySerializer(queryset, many=True)
-            return Response(
-                {"status": "success", "Companies": serializers.data}, status=200
-            )
+            paginator = self.pagination_class()
+            if fast_list_serialization():
+                values = ValuesListSerializer(CompanySerializer, fields)
+                queryset = values.queryset(queryset)
+                page = paginator.paginate_queryset(queryset, request, view=self)
+                return paginator.get_paginated_response(
+                    values.serialize(page), "Companies"
+                )
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializers = CompanySerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializers.data, "Companies")
 
     def post(self, request):
         """
@@ -191,21 +254,30 @@ class CompanyAPIView(APIView):
 
     def delete(self, request, pk):
         """
-        Delete a Company instance.
+        Delete a Company instance and everything under it, in one transaction.
 
         Args:
             request (Request): The HTTP request.
             pk (int): The primary key of the Company instance to delete.
 
+        Query parameters:
+            background (str, optional): "true" to delete in chunks in a background job.
+
         Returns:
-            Response: HTTP 204 No Content status code on successful deletion.
+            Response: HTTP 204 No Content status code on successful deletion, or
+            HTTP 202 Accepted with the job to poll when run in the background.
         """
         company = get_object_or_404(Company, pk=pk)
-        company.delete()
+        if request.query_params.get("background") in ("1", "true"):
+            return self.job_response(
+                request, start_job("delete_company", delete_company, company.pk)
+            )
+        with transaction.atomic():
+            company.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class DepartmentAPIView(APIView):
+class DepartmentAPIView(BackgroundJobMixin, FilteredListMixin, APIView):
     """
     A view for viewing and editing Department instances.
 
@@ -216,34 +288,59 @@ class DepartmentAPIView(APIView):
     - Retrieve a single department: /department/{id}/
     """
 
-    queryset = Department.objects.all()
+    queryset = Department.objects.select_related("company")
     serializer_class = DepartmentSerializer
+    pagination_class = IdCursorPagination
+    filterset_class = DepartmentFilter
+    ordering_fields = ["id", "department_name"]
 
     permission_classes = [
         IsManagerUser | IsAdminUser
     ]  # Admin and Manager users can access this view
 
+    @conditional_get(
+        "department",
+        model=Department,
+        fields=("updated_at", "company__updated_at"),
+    )
+    @cached_get("department")
     def get(self, request, pk=None):
         """
-        Retrieve a single Department instance or a list of all Department instances.
+        Retrieve a single Department instance or a page of Department instances, ordered by id.
 
         Args:
             request (Request): The HTTP request.
             pk (int, optional): The primary key of the Department instance to retrieve. Defaults to None.
 
+        Query parameters:
+            Any DepartmentFilter parameter, and `ordering` (id or department_name, `-` for descending).
+            fields, exclude (str, optional): Comma-separated fields to include or leave out.
+
         Returns:
-            Response: HTTP response containing Department data.
+            Response: HTTP response containing Department data, served from the
+            response cache while no Company, Department or Employee write has committed.
         """
+        fields = DepartmentSerializer.requested_fields(request)
+        queryset = DepartmentSerializer.prune_queryset(
+            self.queryset, fields, self.ordering_fields
+        )
         if pk:
-            department = get_object_or_404(Department, pk=pk)
-            serializer = DepartmentSerializer(department)
+            department = get_object_or_404(queryset, pk=pk)
+            serializer = DepartmentSerializer(department, fields=fields)
             return Response(serializer.data)
         else:
-            queryset = Department.objects.all()
-            serializers = DepartmentSerializer(queryset, many=True)
-            return Response(
-                {"status": "success", "Departments": serializers.data}, status=200
-            )
+            queryset = self.filter_queryset(queryset)
+            paginator = self.pagination_class()
+            if fast_list_serialization():
+                values = ValuesListSerializer(DepartmentSerializer, fields)
+                queryset = values.queryset(queryset, self.ordering_fields)
+                page = paginator.paginate_queryset(queryset, request, view=self)
+                return paginator.get_paginated_response(
+                    values.serialize(page), "Departments"
+                )
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializers = DepartmentSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializers.data, "Departments")
 
     def post(self, request):
         """
@@ -276,7 +373,7 @@ class DepartmentAPIView(APIView):
         Returns:
             Response: HTTP response containing updated Department data or errors.
         """
-        department = get_object_or_404(Department, pk=pk)
+        department = get_object_or_404(self.queryset, pk=pk)
         serializer = DepartmentSerializer(department, data=request.data)
         if serializer.is_valid():
             department = serializer.save()
@@ -288,21 +385,31 @@ class DepartmentAPIView(APIView):
 
     def delete(self, request, pk):
         """
-        Delete a Department instance.
+        Delete a Department instance and everything under it, in one transaction.
 
         Args:
             request (Request): The HTTP request.
             pk (int): The primary key of the Department instance to delete.
 
+        Query parameters:
+            background (str, optional): "true" to delete in chunks in a background job.
+
         Returns:
-            Response: HTTP 204 No Content status code on successful deletion.
+            Response: HTTP 204 No Content status code on successful deletion, or
+            HTTP 202 Accepted with the job to poll when run in the background.
         """
         department = get_object_or_404(Department, pk=pk)
-        department.delete()
+        if request.query_params.get("background") in ("1", "true"):
+            return self.job_response(
+                request,
+                start_job("delete_department", delete_department, department.pk),
+            )
+        with transaction.atomic():
+            department.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class EmployeeAPIView(APIView):
+class EmployeeAPIView(FilteredListMixin, APIView):
     """
     A view for viewing and editing Employee instances.
 
@@ -313,11 +420,15 @@ class EmployeeAPIView(APIView):
     - Retrieve a single employee: /employee/{id}/
     - Create a new employee: /employee/
     - Update an existing employee: /employee/{id}/
+    - Partially update one or several employees: /employee/{id}/, /employee/
     - Delete an employee: /employee/{id}/
     """
 
-    queryset = Employee.objects.all()
+    queryset = Employee.objects.select_related("company", "department")
     serializer_class = EmployeeSerializer
+    pagination_class = IdCursorPagination
+    filterset_class = EmployeeFilter
+    ordering_fields = ["id", "name", "hired_on"]
     permission_classes = [
         IsAuthenticated,
         IsAdminUser | IsManagerUser | IsEmployeeUser,
@@ -328,30 +439,53 @@ class EmployeeAPIView(APIView):
             return [IsAuthenticated(), IsEmployeeUser()]
         return [
             IsAuthenticated(),
-            IsAdminUser | IsManagerUser,
+            (IsAdminUser | IsManagerUser)(),
         ]  # Allow only Admin or Manager for other methods
 
+    @conditional_get(
+        "employee",
+        model=Employee,
+        fields=("updated_at", "company__updated_at", "department__updated_at"),
+        daily=True,
+    )
     def get(self, request, pk=None):
         """
-        Retrieve a single Employee instance or a list of all Employee instances.
+        Retrieve a single Employee instance or a page of Employee instances, ordered by id.
 
         Args:
             request (Request): The HTTP request.
             pk (int, optional): The primary key of the Employee instance to retrieve. Defaults to None.
 
+        Query parameters:
+            Any EmployeeFilter parameter, and `ordering` (id, name or hired_on, `-` for descending).
+            fields, exclude (str, optional): Comma-separated fields to include or leave out.
+
         Returns:
             Response: HTTP response containing Employee data.
         """
+        fields = EmployeeSerializer.requested_fields(request)
+        queryset = EmployeeSerializer.prune_queryset(
+            self.queryset, fields, self.ordering_fields
+        )
+        if "days_employed" in fields:
+            queryset = queryset.with_days_employed()
         if pk:
-            employee = get_object_or_404(Employee, pk=pk)
-            serializer = EmployeeSerializer(employee)
+            employee = get_object_or_404(queryset, pk=pk)
+            serializer = EmployeeSerializer(employee, fields=fields)
             return Response(serializer.data)
         else:
-            queryset = Employee.objects.all()
-            serializers = EmployeeSerializer(queryset, many=True)
-            return Response(
-                {"status": "success", "Employees": serializers.data}, status=200
-            )
+            queryset = self.filter_queryset(queryset)
+            paginator = self.pagination_class()
+            if fast_list_serialization():
+                values = ValuesListSerializer(EmployeeSerializer, fields)
+                queryset = values.queryset(queryset, self.ordering_fields)
+                page = paginator.paginate_queryset(queryset, request, view=self)
+                return paginator.get_paginated_response(
+                    values.serialize(page), "Employees"
+                )
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializers = EmployeeSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializers.data, "Employees")
 
     def post(self, request):
         """
@@ -383,7 +517,7 @@ class EmployeeAPIView(APIView):
         Returns:
             Response: HTTP response containing updated Employee data or errors.
         """
-        employee = get_object_or_404(Employee, pk=pk)
+        employee = get_object_or_404(self.queryset, pk=pk)
         serializer = EmployeeSerializer(employee, data=request.data)
         if serializer.is_valid():
             employee = serializer.save()
@@ -393,6 +527,52 @@ class EmployeeAPIView(APIView):
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def patch(self, request, pk=None):
+        """
+        Partially update an Employee instance, or several at once on the list URL.
+
+        Only the changed columns are written. A bulk PATCH body is a list of
+        objects with the `id` of the Employee and the fields to change; it is
+        applied in one transaction with batched UPDATEs, or not at all if any
+        row is invalid.
+
+        Args:
+            request (Request): The HTTP request.
+            pk (int, optional): The primary key of the Employee instance to update. Defaults to None.
+
+        Returns:
+            Response: HTTP response containing the updated Employee data, or the
+            updated ids for a bulk PATCH, or errors.
+        """
+        if pk:
+            employee = get_object_or_404(self.queryset, pk=pk)
+            serializer = EmployeeSerializer(employee, data=request.data, partial=True)
+            if serializer.is_valid():
+                employee = serializer.save()
+                return Response(
+                    {"employee": serializer.data},
+                    status=status.HTTP_200_OK,
+                )
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = request.data
+        if not isinstance(rows, list) or not 0 < len(rows) <= MAX_PATCH_ROWS:
+            raise exceptions.ValidationError(
+                [f"Expected a list of 1 to {MAX_PATCH_ROWS} employee objects."]
+            )
+        with transaction.atomic():
+            valid, errors = validate_patches(rows)
+            if errors:
+                return Response(
+                    {"status": "error", "errors": errors},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            updated = bulk_patch_employees(valid)
+        return Response(
+            {"status": "success", "updated": updated},
+            status=status.HTTP_200_OK,
+        )
+
     def delete(self, request, pk):
         """
         Delete an Employee instance.
@@ -407,3 +587,380 @@ class EmployeeAPIView(APIView):
         employee = get_object_or_404(Employee, pk=pk)
         employee.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class EmployeeImportAPIView(APIView):
+    """
+    A view for importing Employee instances in bulk.
+
+    The body is either a multipart upload with a `file` field, or the raw CSV
+    (`text/csv`) or JSON Lines (`application/x-ndjson`) document. The input is
+    streamed in chunks, validated row by row and inserted with one INSERT per chunk.
+
+    URL endpoints:
+    - Import employees: /employee/import/
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+        IsAdminUser | IsManagerUser,
+    ]  # Only Admin or Manager users can import employees
+
+    content_types = {
+        "text/csv": "csv",
+        "application/x-ndjson": "jsonl",
+        "application/jsonl": "jsonl",
+    }
+    max_chunk_size = 10000
+
+    def get_input(self, request):
+        """
+        Find the input stream and its format.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Returns:
+            tuple: The input lines and the input format.
+
+        Raises:
+            ValidationError: If no file was uploaded or the format is not supported.
+        """
+        if request.content_type.startswith("multipart/form-data"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                raise exceptions.ValidationError({"file": ["No file was submitted."]})
+            extension = upload.name.rsplit(".", 1)[-1].lower()
+            lines, input_format = upload, {"ndjson": "jsonl"}.get(extension, extension)
+        else:
+            media_type = request.content_type.split(";")[0].strip()
+            lines, input_format = request.stream or [], self.content_types.get(
+                media_type
+            )
+
+        input_format = request.query_params.get("input_format", input_format)
+        if input_format not in IMPORT_FORMATS:
+            raise exceptions.ValidationError(
+                {"input_format": [f"Expected one of: {', '.join(IMPORT_FORMATS)}."]}
+            )
+        return lines, input_format
+
+    def post(self, request):
+        """
+        Import Employee instances from CSV or JSON Lines.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Returns:
+            Response: HTTP response containing the number of created and failed rows
+            and the errors of every rejected row.
+        """
+        lines, input_format = self.get_input(request)
+        try:
+            chunk_size = int(request.query_params.get("chunk_size", 1000))
+        except ValueError:
+            chunk_size = 1000
+        chunk_size = min(max(chunk_size, 1), self.max_chunk_size)
+
+        report = import_employees(lines, input_format, chunk_size=chunk_size)
+        if not report["failed"]:
+            response_status = status.HTTP_201_CREATED
+        elif report["created"]:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"status": "error" if report["failed"] else "success", **report},
+            status=response_status,
+        )
+
+
+class EmployeeTransitionAPIView(APIView):
+    """
+    A view for moving a batch of Employee instances to a new status stage.
+
+    Only the transitions listed in `Employee.transitions` are applied. All the
+    allowed ones are applied in one transaction with a single UPDATE.
+
+    URL endpoints:
+    - Transition employees: /employee/transition/
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+        IsAdminUser | IsManagerUser,
+    ]  # Only Admin or Manager users can move employees through the pipeline
+
+    def post(self, request):
+        """
+        Move Employee instances to a new status stage.
+
+        Args:
+            request (Request): The HTTP request, with `ids`, `status` and, when
+                moving to HIRED, `hired_on`.
+
+        Returns:
+            Response: HTTP response containing the moved ids and the errors of
+            every Employee that was not moved.
+        """
+        serializer = EmployeeTransitionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        report = transition_employees(**serializer.validated_data)
+        if not report["failed"]:
+            response_status = status.HTTP_200_OK
+        elif report["succeeded"]:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"status": "error" if report["failed"] else "success", **report},
+            status=response_status,
+        )
+
+
+class EmployeeExportAPIView(FilteredListMixin, APIView):
+    """
+    A view for exporting every Employee instance as a stream.
+
+    Rows are streamed as NDJSON or CSV, optionally gzip-compressed, straight
+    from a chunked `values_list()` query, so worker memory stays flat whatever
+    the number of employees.
+
+    URL endpoints:
+    - Export employees: /employee/export/
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+        IsAdminUser | IsManagerUser,
+    ]  # Only Admin or Manager users can export employees
+
+    content_types = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv",
+    }
+    filter_backends = [filters.DjangoFilterBackend]
+    filterset_class = EmployeeFilter
+
+    def perform_content_negotiation(self, request, force=False):
+        # The stream is not rendered by DRF, so never reject the Accept header.
+        return super().perform_content_negotiation(request, force=True)
+
+    @conditional_get("employee-export", daily=True)
+    def get(self, request):
+        """
+        Stream all Employee instances.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Query parameters:
+            output (str, optional): "ndjson" (default) or "csv".
+            compress (str, optional): "gzip" to gzip the stream.
+            Any EmployeeFilter parameter, e.g. status or company.
+            fields, exclude (str, optional): Comma-separated columns to include or leave out.
+
+        Returns:
+            StreamingHttpResponse: The exported rows.
+        """
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            raise exceptions.ValidationError(
+                {"output": [f"Expected one of: {', '.join(EXPORT_FORMATS)}."]}
+            )
+        compress = request.query_params.get("compress") == "gzip"
+        columns = EmployeeSerializer.requested_fields(request)
+        queryset = self.filter_queryset(Employee.objects.all())
+
+        filename = f"employees.{output}"
+        if compress:
+            filename += ".gz"
+            response = StreamingHttpResponse(
+                export_employees(
+                    output, compress=True, queryset=queryset, columns=columns
+                ),
+                content_type="application/gzip",
+            )
+        else:
+            response = StreamingHttpResponse(
+                export_employees(output, queryset=queryset, columns=columns),
+                content_type=f"{self.content_types[output]}; charset=utf-8",
+            )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class EmployeeSearchAPIView(APIView):
+    """
+    A view for full-text search over Employee instances.
+
+    Matches every word of `q` against the name, email, designation and address
+    through the FTS5 index, the last one as a prefix of at least two characters,
+    ranked with bm25.
+
+    URL endpoints:
+    - Search employees: /employee/search/?q=
+    """
+
+    queryset = Employee.objects.select_related("company", "department")
+    pagination_class = RankedPagination
+    permission_classes = [
+        IsAuthenticated,
+        IsEmployeeUser,
+    ]  # Same access as listing employees
+
+    @conditional_get("employee-search", daily=True)
+    def get(self, request):
+        """
+        Retrieve a page of the Employee instances matching the query, best match first.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Query parameters:
+            q (str): The words to search for.
+            page (int, optional): The page number. Defaults to 1.
+            page_size (int, optional): The page size, at most 100.
+            fields, exclude (str, optional): Comma-separated fields to include or leave out.
+
+        Returns:
+            Response: HTTP response containing the matching Employee data.
+        """
+        try:
+            match = build_match(request.query_params.get("q"))
+        except ValueError as error:
+            raise exceptions.ValidationError({"q": [str(error)]})
+        fields = EmployeeSerializer.requested_fields(request)
+
+        paginator = self.pagination_class()
+        ids = paginator.paginate(
+            lambda offset, limit: search_employee_ids(match, offset, limit), request
+        )
+        queryset = EmployeeSerializer.prune_queryset(self.queryset, fields)
+        if "days_employed" in fields:
+            queryset = queryset.with_days_employed()
+        employees = queryset.in_bulk(ids)
+        serializers = EmployeeSerializer(
+            [employees[pk] for pk in ids if pk in employees], many=True, fields=fields
+        )
+        return paginator.get_paginated_response(serializers.data, "Employees")
+
+
+class HeadcountAPIView(APIView):
+    """
+    A view for the headcount per status stage of each company or department.
+
+    Read from the HeadcountSummary table with a single aggregate query.
+
+    URL endpoints:
+    - Headcount analytics: /analytics/headcount/
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+        IsAdminUser | IsManagerUser,
+    ]  # Only Admin or Manager users can read the analytics
+
+    @conditional_get("headcount")
+    def get(self, request):
+        """
+        Retrieve the number of employees per status stage.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Query parameters:
+            group_by (str, optional): "company" (default) or "department".
+            company_id (int, optional): Only count this company.
+
+        Returns:
+            Response: HTTP response containing one row per company or department
+            with its counts per stage and total, and the totals per stage.
+        """
+        group_by = request.query_params.get("group_by", "company")
+        if group_by not in GROUPINGS:
+            raise exceptions.ValidationError(
+                {"group_by": [f"Expected one of: {', '.join(GROUPINGS)}."]}
+            )
+        company_id = request.query_params.get("company_id")
+        if company_id is not None and not company_id.isdigit():
+            raise exceptions.ValidationError({"company_id": ["Enter a number."]})
+
+        rows, totals = headcount_pivot(
+            group_by, None if company_id is None else int(company_id)
+        )
+        return Response(
+            {
+                "status": "success",
+                "group_by": group_by,
+                "totals": totals,
+                "Headcount": rows,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class JobAPIView(APIView):
+    """
+    A view for polling a background job.
+
+    URL endpoints:
+    - Job state: /jobs/{id}/
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+        IsAdminUser | IsManagerUser,
+    ]  # Only Admin or Manager users start jobs
+
+    def get(self, request, job_id):
+        """
+        Retrieve the state of a background job.
+
+        Args:
+            request (Request): The HTTP request.
+            job_id (str): The job id.
+
+        Returns:
+            Response: HTTP response containing the job status, its progress
+            (`done` of `total`) and its result or error.
+        """
+        job = get_job(job_id)
+        if job is None:
+            raise Http404("No job matches the given id.")
+        return Response(job, status=status.HTTP_200_OK)
+
+
+class StatsAPIView(APIView):
+    """
+    A view for reading the in-process cache counters.
+
+    Only accessible by admin users.
+
+    URL endpoints:
+    - Cache statistics: /stats/
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        """
+        Report the hit/miss counters of the caches of this worker process.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Returns:
+            Response: HTTP response containing the cache statistics.
+        """
+        return Response(
+            {
+                "status": "success",
+                "token_cache": token_cache.stats(),
+                "response_cache": response_cache.stats(),
+            },
+            status=200,
+        )